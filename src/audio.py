@@ -0,0 +1,238 @@
+import os
+import time
+
+import pygame
+
+
+'''
+Звук игры по событиям:
+ - звуки привязываются к событиям (bind) и играют только при trigger(event) —
+   никаких play() из кода рисования
+ - повтор того же звука чаще min_interval отбрасывается (dedupe), а exclusive-звук
+   не перезапускается, пока ещё звучит
+ - фиксированный пул зарезервированных каналов mixer (set_reserved): звуки не
+   занимают каналы вне пула; если свободного нет, вытесняется самый старый звук
+   с приоритетом не выше нового, иначе новый не играет (dropped)
+ - mp3 декодируется один раз: PCM в формате mixer кэшируется на диск (cache_dir),
+   при следующих запусках Sound создаётся прямо из буфера
+ - stats_dict(): счётчики, занятые каналы и процессорное время потока микшера SDL
+Фоновая музыка — pygame.mixer.music: она потоковая (mp3 декодируется по ходу
+воспроизведения), в кэш не попадает.
+'''
+
+
+def cache_path(path, cache_dir, mixer_format):
+    """
+    Файл кэша PCM для звука: в имени — размер и время изменения исходника и формат
+    mixer (частота, формат сэмпла, каналы), поэтому устаревший кэш не подхватится.
+    """
+    stat = os.stat(path)
+    frequency, sample_format, channels = mixer_format
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f"{stem}-{stat.st_size}-{stat.st_mtime_ns}-{frequency}-{sample_format}-{channels}.pcm"
+    return os.path.join(cache_dir, name)
+
+
+def load_sound(path, cache_dir=None):
+    """
+    Sound из файла; с cache_dir — декодированный PCM берётся из кэша или пишется в него.
+    :return: (Sound, попадание в кэш)
+    """
+    if cache_dir is None:
+        return pygame.mixer.Sound(path), False
+    cached = cache_path(path, cache_dir, pygame.mixer.get_init())
+    if os.path.exists(cached):
+        with open(cached, "rb") as f:
+            return pygame.mixer.Sound(buffer=f.read()), True
+    sound = pygame.mixer.Sound(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cached + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(sound.get_raw())
+    os.replace(tmp, cached)  # другой процесс не прочитает недописанный файл
+    return sound, False
+
+
+def mixer_cpu_time():
+    """
+    Процессорное время (сек) потока микшера SDL (поток SDLAudio*), по /proc.
+    None — нет /proc (не Linux) или поток ещё не запущен.
+    """
+    task_dir = "/proc/self/task"
+    try:
+        tids = os.listdir(task_dir)
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = None
+    for tid in tids:
+        try:
+            with open(f"{task_dir}/{tid}/comm") as f:
+                if not f.read().startswith("SDLAudio"):
+                    continue
+            with open(f"{task_dir}/{tid}/stat") as f:
+                # utime и stime — 14-е и 15-е поля; имя потока в скобках может содержать пробелы
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue  # поток завершился
+        total = (total or 0.0) + (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+class SoundEntry:
+    def __init__(self, sound, priority, min_interval, exclusive):
+        self.sound = sound
+        self.priority = priority
+        self.min_interval = min_interval
+        self.exclusive = exclusive
+        self.last_played = None
+
+
+class AudioStats:
+    def __init__(self):
+        self.plays = 0
+        self.deduped = 0  # повтор отброшен (min_interval или exclusive)
+        self.stolen = 0  # вытеснен звучащий звук
+        self.dropped = 0  # все каналы заняты звуками важнее
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.play_time = 0.0  # суммарное время play() (сек)
+
+    def as_dict(self):
+        return {
+            "plays": self.plays,
+            "deduped": self.deduped,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "play_us": self.play_time / self.plays * 1e6 if self.plays else 0.0,
+        }
+
+
+class AudioManager:
+    def __init__(self, channels=6, cache_dir=None, clock=time.perf_counter):
+        """
+        mixer должен быть уже инициализирован (pygame.mixer.init()).
+        :param channels: каналов в пуле (резервируются — Sound.play() вне пула их не займёт)
+        :param cache_dir: папка кэша декодированных звуков (None — без кэша)
+        :param clock: часы для min_interval (подменяются в тестах)
+        """
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        # Что звучит в канале: (имя, приоритет, время запуска) или None
+        self.playing = [None] * channels
+        self.cache_dir = cache_dir
+        self.clock = clock
+        self.sounds = {}
+        self.bindings = {}
+        self.stats = AudioStats()
+        self._cpu_start = mixer_cpu_time()
+
+    def load(self, name, path, volume=1.0, priority=0, min_interval=0.0, exclusive=False):
+        """
+        Загружает звук (через кэш PCM).
+        :param priority: чем больше, тем важнее при нехватке каналов
+        :param min_interval: не повторять звук чаще (сек)
+        :param exclusive: не перезапускать, пока звучит
+        """
+        sound, cached = load_sound(path, self.cache_dir)
+        if cached:
+            self.stats.cache_hits += 1
+        else:
+            self.stats.cache_misses += 1
+        sound.set_volume(volume)
+        self.sounds[name] = SoundEntry(sound, priority, min_interval, exclusive)
+        return sound
+
+    def bind(self, event, name):
+        """Событие event будет играть звук name."""
+        self.bindings[event] = name
+
+    def trigger(self, event):
+        """Событие игры: играет привязанный звук (события без звука игнорируются)."""
+        name = self.bindings.get(event)
+        if name is not None:
+            return self.play(name)
+        return None
+
+    def _is_playing(self, i):
+        if self.playing[i] is not None and not self.channels[i].get_busy():
+            self.playing[i] = None
+        return self.playing[i] is not None
+
+    def _pick_channel(self, priority):
+        """Свободный канал пула или вытесняемый (самый старый из неважнее нового)."""
+        victim = None
+        for i in range(len(self.channels)):
+            if not self._is_playing(i):
+                return i
+            _, playing_priority, started = self.playing[i]
+            if playing_priority <= priority and (victim is None or started < self.playing[victim][2]):
+                victim = i
+        if victim is not None:
+            self.stats.stolen += 1
+        return victim
+
+    def play(self, name):
+        """:return: канал или None (повтор отброшен или каналов нет)"""
+        start = time.perf_counter()
+        entry = self.sounds[name]
+        now = self.clock()
+        if entry.last_played is not None and now - entry.last_played < entry.min_interval:
+            self.stats.deduped += 1
+            return None
+        if entry.exclusive and self.is_playing(name):
+            self.stats.deduped += 1
+            return None
+        i = self._pick_channel(entry.priority)
+        if i is None:
+            self.stats.dropped += 1
+            return None
+        channel = self.channels[i]
+        channel.play(entry.sound)
+        self.playing[i] = (name, entry.priority, now)
+        entry.last_played = now
+        self.stats.plays += 1
+        self.stats.play_time += time.perf_counter() - start
+        return channel
+
+    def is_playing(self, name):
+        return any(self._is_playing(i) and self.playing[i][0] == name for i in range(len(self.channels)))
+
+    def stop(self, *names):
+        """Останавливает звуки (без имён — все)."""
+        for i, channel in enumerate(self.channels):
+            if self._is_playing(i) and (not names or self.playing[i][0] in names):
+                channel.stop()
+                self.playing[i] = None
+
+    def load_music(self, path, volume=1.0):
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+
+    def play_music(self, loops=0):
+        """Запускает фоновую музыку, если она ещё не играет."""
+        if not pygame.mixer.music.get_busy():
+            pygame.mixer.music.play(loops)
+
+    def stop_music(self):
+        pygame.mixer.music.stop()
+
+    def busy_channels(self):
+        return sum(self._is_playing(i) for i in range(len(self.channels)))
+
+    def mixer_cpu(self):
+        """Процессорное время потока микшера с создания менеджера (сек) или None."""
+        now = mixer_cpu_time()
+        if now is None:
+            return None
+        return now - (self._cpu_start or 0.0)
+
+    def stats_dict(self):
+        stats = self.stats.as_dict()
+        stats["busy_channels"] = self.busy_channels()
+        stats["mixer_cpu_s"] = self.mixer_cpu()
+        return stats
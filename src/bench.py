@@ -0,0 +1,169 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+'''
+Набор бенчмарков с проверкой на регрессии:
+ - physics — шагов BallPhysics.update (и BallPhysicsBatch) в секунду (bench_physics)
+ - tracker — HandTracker.process_frame на синтетическом ролике, кадров в секунду (bench_tracker)
+ - render — мс на кадр рендера сцены под SDL dummy (bench_render)
+ - engine — розыгрышей и тиков игрового цикла без окна в секунду (bench_engine)
+ - preview — мс и аллокации на кадр превью камеры (bench_preview)
+ - rollback — шагов пересчёта при откате в бюджете кадра 16 мс (bench_rollback)
+Результаты пишутся в JSON и сравниваются с сохранённым baseline: метрика считается
+регрессией, если она хуже baseline больше, чем на threshold (0.2 = 20%).
+Что лучше — больше или меньше — определяется по имени метрики (*_per_sec, *_per_16ms — больше).
+Каждый набор прогоняется repeat раз, берётся лучший результат (меньше шума).
+
+Запуск:
+  python bench.py                      — все наборы, сравнение с bench_baseline.json
+  python bench.py physics engine       — только выбранные наборы
+  python bench.py --quick              — короткие прогоны (для CI)
+  python bench.py --save-baseline      — записать результаты как новый baseline
+Код выхода 1, если есть регрессии.
+'''
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SCRIPT_DIR, "bench_baseline.json")
+RESULTS_PATH = os.path.join(SCRIPT_DIR, "..", "bench_results.json")
+DEFAULT_THRESHOLD = 0.2
+# Изменения меньше этого не считаются регрессией (десятки байт аллокаций — шум)
+NOISE_FLOOR = {"_bytes": 4096}
+
+# набор -> (модуль, параметры run_benchmark, параметры для --quick)
+SUITES = {
+    "physics": ("bench_physics", {"budget": 2000000}, {"sizes": (1, 1000), "budget": 200000}),
+    "tracker": ("bench_tracker", {"frames": 150}, {"frames": 40}),
+    "render": ("bench_render", {"frames": 200}, {"frames": 60}),
+    "engine": ("bench_engine", {"rallies": 2000}, {"rallies": 300}),
+    "preview": ("bench_preview", {"frames": 200}, {"frames": 50}),
+    "rollback": ("bench_rollback", {"rounds": 200}, {"rounds": 50}),
+}
+
+
+def higher_is_better(metric):
+    return metric.endswith(("_per_sec", "_per_16ms"))
+
+
+def noise_floor(metric):
+    return next((floor for suffix, floor in NOISE_FLOOR.items() if metric.endswith(suffix)), 0)
+
+
+def best(metric, values):
+    return max(values) if higher_is_better(metric) else min(values)
+
+
+def run_suite(name, quick=False, repeat=1, **extra):
+    """:return: dict метрик набора (лучшее из repeat прогонов)"""
+    module_name, kwargs, quick_kwargs = SUITES[name]
+    run = importlib.import_module(module_name).run_benchmark
+    kwargs = dict(quick_kwargs if quick else kwargs, **extra)
+    runs = [run(**kwargs) for _ in range(repeat)]
+    return {metric: best(metric, [r[metric] for r in runs]) for metric in runs[0]}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает результаты с baseline (оба — {набор: {метрика: значение}}).
+    :return: {набор: {метрика: {value, baseline, change, regression}}};
+             change > 0 — стало лучше, < 0 — хуже (доля от baseline)
+    """
+    report = {}
+    for suite, metrics in results.items():
+        suite_report = report[suite] = {}
+        for metric, value in metrics.items():
+            entry = {"value": value, "baseline": None, "change": None, "regression": False}
+            old = baseline.get(suite, {}).get(metric)
+            if old:
+                change = (value - old) / old
+                if not higher_is_better(metric):
+                    change = -change
+                regression = change < -threshold and abs(value - old) > noise_floor(metric)
+                entry.update(baseline=old, change=change, regression=regression)
+            suite_report[metric] = entry
+    return report
+
+
+def regressions(report):
+    """[(набор, метрика, запись)] всех регрессий отчёта"""
+    return [(suite, metric, entry) for suite, metrics in report.items()
+            for metric, entry in metrics.items() if entry["regression"]]
+
+
+def load_baseline(path):
+    """:return: (результаты, threshold из файла или None); пустой baseline, если файла нет"""
+    if not os.path.exists(path):
+        return {}, None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("results", {}), data.get("threshold")
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()}
+
+
+def save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки с проверкой на регрессии")
+    parser.add_argument("suites", nargs="*", help=f"наборы: {', '.join(SUITES)} (по умолчанию все)")
+    parser.add_argument("--quick", action="store_true", help="короткие прогоны")
+    parser.add_argument("--repeat", type=int, default=3, help="прогонов на набор, берётся лучший")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", default=RESULTS_PATH, help="куда записать результаты (JSON)")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"допустимое ухудшение, доля (по умолчанию из baseline или {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как baseline")
+    parser.add_argument("--mediapipe", action="store_true", help="tracker: добавить прогон с Mediapipe")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"неизвестные наборы: {', '.join(unknown)}")
+    suites = args.suites or list(SUITES)
+    results = {}
+    for name in suites:
+        start = time.perf_counter()
+        extra = {"mediapipe": True} if name == "tracker" and args.mediapipe else {}
+        results[name] = run_suite(name, args.quick, args.repeat, **extra)
+        print(f"{name}: {time.perf_counter() - start:.1f} с")
+
+    baseline, baseline_threshold = load_baseline(args.baseline)
+    threshold = args.threshold if args.threshold is not None else baseline_threshold or DEFAULT_THRESHOLD
+    report = compare(results, baseline, threshold)
+    for suite, metrics in report.items():
+        for metric, entry in metrics.items():
+            line = f"  {suite}.{metric}: {entry['value']:,.3f}"
+            if entry["change"] is not None:
+                line += f" ({entry['change']:+.1%} к baseline{', РЕГРЕССИЯ' if entry['regression'] else ''})"
+            print(line)
+
+    save_json(args.output, {"machine": machine_info(), "quick": args.quick, "threshold": threshold,
+                            "report": report})
+    if args.save_baseline:
+        merged = dict(baseline, **results)
+        save_json(args.baseline, {"machine": machine_info(), "threshold": threshold, "results": merged})
+        print(f"baseline записан: {args.baseline}")
+        return 0
+
+    found = regressions(report)
+    if found:
+        print(f"Регрессий: {len(found)} (порог {threshold:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
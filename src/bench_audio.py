@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+
+import pygame
+
+from audio import AudioManager, mixer_cpu_time
+
+
+'''
+Бенчмарк звука: меню после конца партии, frames кадров по 60 Гц.
+ - legacy: как раньше — Sound.play() звука поражения в каждом кадре меню
+ - events: AudioManager — звук по событию конца партии, один раз
+Меряется процессорное время потока микшера SDL (по /proc, только Linux),
+сколько каналов занято в конце и сколько раз звук запущен; а также
+декодирование звуков без кэша и из кэша PCM.
+Запуск: python bench_audio.py (без звуковой карты — SDL_AUDIODRIVER=dummy)
+'''
+
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "sound")
+SOUNDS = ("2.mp3", "3.mp3", "4.mp3", "11w.mp3", "11l.mp3")
+
+
+def menu_frames(frames, play):
+    """frames кадров по 1/60 сек, play(кадр) в каждом; :return: (сек CPU микшера, запусков)"""
+    cpu_start = mixer_cpu_time()
+    plays = 0
+    for frame in range(frames):
+        plays += play(frame) is not None
+        time.sleep(1 / 60)
+    cpu = mixer_cpu_time()
+    return (None if cpu is None else cpu - cpu_start), plays
+
+
+def bench_decode(cache_dir):
+    """:return: мс на загрузку всех звуков (первый раз — декодирование и запись кэша, затем из кэша)"""
+    times = []
+    for _ in range(2):
+        manager = AudioManager(cache_dir=cache_dir)
+        start = time.perf_counter()
+        for name in SOUNDS:
+            manager.load(name, os.path.join(SOUND_DIR, name))
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_benchmark(frames=300, cache_dir=None):
+    pygame.mixer.init()
+    results = {}
+    path = os.path.join(SOUND_DIR, "11l.mp3")
+
+    sound = pygame.mixer.Sound(path)
+    cpu, plays = menu_frames(frames, lambda frame: sound.play())
+    results["legacy_mixer_cpu_ms"] = None if cpu is None else cpu * 1000
+    results["legacy_plays"] = plays
+    results["legacy_busy_channels"] = sum(pygame.mixer.Channel(i).get_busy()
+                                          for i in range(pygame.mixer.get_num_channels()))
+    pygame.mixer.stop()
+
+    manager = AudioManager()
+    manager.load("match_lost", path, exclusive=True)
+    manager.bind("match_lost", "match_lost")
+    cpu, plays = menu_frames(frames, lambda frame: manager.trigger("match_lost") if frame == 0 else None)
+    results["events_mixer_cpu_ms"] = None if cpu is None else cpu * 1000
+    results["events_plays"] = plays
+    results["events_busy_channels"] = manager.busy_channels()
+    pygame.mixer.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results["decode_ms"], results["cached_decode_ms"] = bench_decode(cache_dir or tmp)
+    pygame.mixer.quit()
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,140 @@
+import math
+import time
+
+import numpy as np
+
+from capture import SyntheticCapture
+from engine import HEIGHT, WIDTH
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from input_filter import create_filter
+
+
+'''
+Кривая "точность / задержка / CPU" для редкого инференса (HandTracker.inference_rate):
+камера 60 кадров в секунду, инференс на 60, 30, 20, 15 и 10 Гц по времени захвата,
+позиция ракетки в каждом кадре — из фильтра ввода:
+ - one_euro — как в игре: сглаживание и экстраполяция
+ - extrapolate — линейно по двум последним замерам
+ - interpolate — между двумя последними замерами, показ отстаёт на интервал инференса
+Меряется:
+ - мс HandTracker.process_frame на кадр и инференсов на кадр
+ - ошибка позиции ракетки (RMSE, пиксели окна игры) против инференса на каждом кадре
+ - отставание (сдвиг во времени, при котором ошибка минимальна), мс
+Квадрат синтетической камеры делает оборот за 2 секунды (рука быстро водит по кругу).
+К результатам инференса добавляется дрожание landmarks (noise, нормализованные ед. —
+как у Mediapipe на живой руке): без него фильтры сравниваются на идеальных замерах.
+Запуск: python bench_decimation.py
+'''
+
+CAMERA_FPS = 60.0
+RATES = (60, 30, 20, 15, 10)
+MODES = ("one_euro", "extrapolate", "interpolate")
+
+
+class TimestampedFrames:
+    """Готовые кадры с временем захвата (как камера 60 FPS), без декодирования."""
+
+    def __init__(self, frames, fps):
+        self.frames = frames
+        self.fps = fps
+        self.frame_index = 0
+        self.last_timestamp = None
+
+    def isOpened(self):
+        return self.frame_index < len(self.frames)
+
+    def read(self):
+        if self.frame_index >= len(self.frames):
+            return False, None
+        self.last_timestamp = self.frame_index / self.fps
+        frame = self.frames[self.frame_index]
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self.frame_index = len(self.frames)
+
+
+def make_filter(mode, rate):
+    if mode == "extrapolate":
+        return create_filter("interpolate")
+    if mode == "interpolate":
+        return create_filter("interpolate", delay=1.0 / rate)
+    return create_filter(mode)
+
+
+def run_rate(frames, rate, noise=0.0, seed=0):
+    """
+    :param noise: СКО дрожания координат результата (нормализованные ед.)
+    :return: (мс на кадр, инференсов на кадр, [(время захвата, координаты результата)])
+    """
+    rng = np.random.default_rng(seed)
+    tracker = HandTracker(hands_factory=FakeHands, inference_rate=rate)
+    tracker.start_capture(TimestampedFrames(frames, CAMERA_FPS))
+    samples = []
+    elapsed = 0.0
+    capture_time = None
+    for _ in range(len(frames)):
+        start = time.perf_counter()
+        _, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+        elapsed += time.perf_counter() - start
+        if coords is not None and noise:
+            if tracker.last_capture_time != capture_time:
+                jitter = rng.normal(0.0, noise, 2)  # новый замер — новое дрожание
+            coords = (coords[0] + jitter[0], coords[1] + jitter[1])
+        capture_time = tracker.last_capture_time
+        samples.append((tracker.last_capture_time, coords))
+    calls = tracker.inference.hands.calls
+    tracker.stop_capture()
+    return elapsed / len(frames) * 1000, calls / len(frames), samples
+
+
+def track_error(samples, truth, input_filter, skip=30):
+    """RMSE (пиксели окна) и отставание (мс) позиции фильтра против truth в каждом кадре."""
+    outputs = []
+    for k, (capture_time, coords) in enumerate(samples):
+        now = k / CAMERA_FPS
+        input_filter.update(capture_time, coords)
+        predicted = input_filter.predict(now)
+        if k >= skip and predicted is not None:
+            outputs.append((k, predicted))
+
+    def error(shift):
+        total = 0.0
+        for k, (x, y) in outputs:
+            tx, ty = truth[max(0, k - shift)]
+            total += ((x - tx) * WIDTH) ** 2 + ((y - ty) * HEIGHT) ** 2
+        return math.sqrt(total / len(outputs))
+
+    best_shift = min(range(0, 13), key=error)  # до 200 мс
+    return error(0), best_shift / CAMERA_FPS * 1000
+
+
+def run_benchmark(frames=600, rates=RATES, width=640, height=480, noise=0.004):
+    synthetic = SyntheticCapture(width=width, height=height, fps=2 * CAMERA_FPS, realtime=False)
+    video = [synthetic.frame_at(i) for i in range(frames)]
+    _, _, full = run_rate(video, None)
+    truth = [coords for _, coords in full]
+
+    results = {}
+    for rate in rates:
+        ms, inferences, samples = run_rate(video, rate, noise)
+        results[f"rate_{rate}hz_ms_per_frame"] = ms
+        results[f"rate_{rate}hz_inferences_per_frame"] = inferences
+        for mode in MODES:
+            rmse, lag = track_error(samples, truth, make_filter(mode, rate))
+            results[f"rate_{rate}hz_{mode}_rmse_px"] = rmse
+            results[f"rate_{rate}hz_{mode}_lag_ms"] = lag
+    return results
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    print(f"{'Гц':>4}{'мс/кадр':>9}{'инф./кадр':>11}" + "".join(f"{mode + ' px / мс':>24}" for mode in MODES))
+    for rate in RATES:
+        row = f"{rate:>4}{results[f'rate_{rate}hz_ms_per_frame']:>9.2f}" \
+              f"{results[f'rate_{rate}hz_inferences_per_frame']:>11.2f}"
+        for mode in MODES:
+            row += f"{results[f'rate_{rate}hz_{mode}_rmse_px']:>16.1f} / {results[f'rate_{rate}hz_{mode}_lag_ms']:>5.0f}"
+        print(row)
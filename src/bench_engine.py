@@ -0,0 +1,27 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from engine import run_headless
+
+
+'''
+Бенчмарк игровой логики без окна: розыгрышей и шагов симуляции в секунду
+(бот вместо руки, по каждому уровню сложности босса).
+Запуск: python bench_engine.py
+'''
+
+
+def run_benchmark(rallies=2000, difficulties=("easy", "normal", "hard")):
+    """:return: dict розыгрышей и шагов в секунду по уровням сложности"""
+    results = {}
+    for difficulty in difficulties:
+        stats = run_headless(rallies, seed=0, difficulty=difficulty)
+        results[f"{difficulty}_rallies_per_sec"] = stats["rallies_per_sec"]
+        results[f"{difficulty}_steps_per_sec"] = stats["steps_per_sec"]
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.0f}")
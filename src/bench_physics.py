@@ -0,0 +1,48 @@
+import time
+
+from physics import BallPhysics, BallPhysicsBatch
+
+
+'''
+Бенчмарк физики мяча: шагов в секунду (мяч-шагов) у BallPhysics и BallPhysicsBatch
+при N = 1, 1 000 и 1 000 000 мячей.
+Запуск: python bench_physics.py
+'''
+
+
+def bench_scalar(steps=20000, dt=0.1):
+    ball = BallPhysics(800, 600, 50)
+    start = time.perf_counter()
+    for _ in range(steps):
+        ball.update(dt)
+        if ball.is_out():
+            ball.reset_ball()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_batch(n, steps, dt=0.1):
+    batch = BallPhysicsBatch(n, 800, 600, 50, seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        batch.update(dt)
+        out = batch.is_out()
+        if out.any():
+            batch.reset_ball(out)
+    return n * steps / (time.perf_counter() - start)
+
+
+def run_benchmark(sizes=(1, 1000, 1000000), budget=200000):
+    """
+    :param budget: примерное число мяч-шагов на каждый размер (от 5 до 20 000 шагов)
+    :return: dict мяч-шагов в секунду
+    """
+    results = {"scalar_steps_per_sec": bench_scalar()}
+    for n in sizes:
+        steps = min(max(5, budget // n), 20000)
+        results[f"batch_{n}_steps_per_sec"] = bench_batch(n, steps)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark(budget=2000000).items():
+        print(f"{name}: {value:,.0f}")
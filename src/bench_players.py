@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from players import PlayerAssigner
+from profiler import Profiler
+from sources import LandmarkReplay, Recording, RecordingSource, SessionRecorder
+
+
+'''
+Бенчмарк игры вдвоём перед одной камерой (SyntheticCapture, 640x480, FakeHands):
+ - single — HandTracker с одной рукой, как в игре с ботом
+ - two — max_num_hands=2 (обе руки за один инференс) и PlayerAssigner
+ - players — время самого PlayerAssigner.update на результат
+Подмены игроков считаются по записанной сессии (landmarks без инференса) против
+истинных позиций квадратов: руки раз в секунду скрещиваются по x. Подмена — рука
+игрока оказалась другой настоящей рукой, чем в его прошлом кадре. Варианты:
+ - labels — handedness, как в записи (у рук разные метки)
+ - same_labels — у обеих рук одна метка (оба игрока играют правой)
+ - noisy_labels — 20% меток перевёрнуты
+ - by_x — для сравнения: левая по x рука — левому игроку
+Запуск: python bench_players.py
+'''
+
+WIDTH, HEIGHT = 640, 480
+
+
+def record_clip(path, frames, hands):
+    """Записывает синтетический ролик с hands руками и landmarks от FakeHands."""
+    recorder = SessionRecorder(path)
+    tracker = HandTracker(max_num_hands=hands, hands_factory=FakeHands, recorder=recorder)
+    tracker.start_capture(SyntheticCapture(width=WIDTH, height=HEIGHT, max_frames=frames,
+                                           realtime=False, hands=hands))
+    while tracker.process_frame(draw_point=False, draw_landmarks=False)[0] is not None:
+        pass
+    tracker.stop_capture()
+    return recorder.save()
+
+
+def run_clip(tracker, source):
+    """:return: мс на кадр process_frame (с рисованием точек и скелета, как с открытым превью)"""
+    tracker.start_capture(source)
+    frames = 0
+    start = time.perf_counter()
+    while tracker.process_frame()[0] is not None:
+        frames += 1
+    elapsed = time.perf_counter() - start
+    tracker.stop_capture()
+    return elapsed / frames * 1000
+
+
+def true_palms(frames):
+    """Истинные позиции ладоней (frames, 2 руки, 2) в координатах HandTracker (после отражения)."""
+    capture = SyntheticCapture(width=WIDTH, height=HEIGHT, hands=2)
+    centers = np.array([capture.hand_centers(i) for i in range(frames)], dtype=np.float64)
+    return np.stack([(WIDTH - centers[..., 0]) / WIDTH, centers[..., 1] / HEIGHT], axis=-1)
+
+
+def count_swaps(player_coords, truth):
+    """
+    :param player_coords: по кадрам — список координат игроков (None — руки нет)
+    :return: (подмен, кадров с рукой у игрока)
+    """
+    swaps = present = 0
+    previous = [None] * len(player_coords[0])
+    for coords, palms in zip(player_coords, truth):
+        for j, xy in enumerate(coords):
+            if xy is None:
+                continue
+            present += 1
+            hand = int(np.argmin(np.hypot(palms[:, 0] - xy[0], palms[:, 1] - xy[1])))
+            swaps += previous[j] is not None and previous[j] != hand
+            previous[j] = hand
+    return swaps, present
+
+
+def replay_players(recording):
+    """Записанные landmarks через HandTracker + PlayerAssigner: (координаты игроков по кадрам, assigner)."""
+    replay = LandmarkReplay(recording)
+    assigner = PlayerAssigner()
+    tracker = HandTracker(max_num_hands=2, hands_factory=replay.hands_factory, assigner=assigner)
+    tracker.start_capture(replay.source)
+    coords = []
+    while tracker.process_frame(draw_point=False, draw_landmarks=False)[0] is not None:
+        coords.append([slot.coords for slot in assigner.slots])
+    tracker.stop_capture()
+    return coords, assigner
+
+
+def by_x(recording):
+    """Без трекинга: рука левее — левому игроку."""
+    coords = []
+    for i in range(len(recording)):
+        palms = sorted(tuple(map(float, recording.landmarks[i, k, 0, :2])) for k in range(recording.num_hands[i]))
+        coords.append(palms + [None] * (2 - len(palms)))
+    return coords
+
+
+def run_benchmark(frames=300, seed=0):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        single = record_clip(os.path.join(tmp, "single.npz"), frames, hands=1)
+        two = record_clip(os.path.join(tmp, "two.npz"), frames, hands=2)
+        results["single_ms_per_frame"] = run_clip(HandTracker(hands_factory=FakeHands), RecordingSource(single))
+        profiler = Profiler()
+        results["two_ms_per_frame"] = run_clip(
+            HandTracker(max_num_hands=2, hands_factory=FakeHands, assigner=PlayerAssigner(), profiler=profiler),
+            RecordingSource(two))
+        results["players_us_per_update"] = profiler.summary()["players"]["mean_ms"] * 1000
+
+        truth = true_palms(frames)
+        rng = np.random.default_rng(seed)
+        for variant in ("labels", "same_labels", "noisy_labels"):
+            recording = Recording(two)
+            if variant == "same_labels":
+                recording.handedness[:] = 1
+            elif variant == "noisy_labels":
+                flip = rng.random(recording.handedness.shape) < 0.2
+                recording.handedness[flip] = 1 - recording.handedness[flip]
+            coords, assigner = replay_players(recording)
+            swaps, present = count_swaps(coords, truth)
+            results[f"{variant}_swap_rate"] = swaps / present if present else 0.0
+            results[f"{variant}_dropout_rate"] = assigner.stats.dropout_rate
+        swaps, present = count_swaps(by_x(Recording(two)), truth)
+        results["by_x_swap_rate"] = swaps / present if present else 0.0
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.4f}")
@@ -0,0 +1,75 @@
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from preview import CameraPreview
+
+
+'''
+Микробенчмарк превью камеры: старый путь (flip, BGR->RGB->BGR, BGR->RGB, swapaxes,
+make_surface, scale) против CameraPreview. Меряется время и объём новых аллокаций на кадр.
+Запуск: python bench_preview.py
+'''
+
+
+def legacy_preview(frame):
+    """Путь кадра до превью, как он был в game.py и HandTracker.process_frame"""
+    frame = cv2.flip(frame, 1)
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
+    return pygame.transform.scale(surface, (320, 240))
+
+
+def new_preview(preview, flip_buf):
+    """Новый путь: flip в готовый буфер (как в HandTracker) и CameraPreview"""
+    def run(frame):
+        cv2.flip(frame, 1, dst=flip_buf)
+        return preview.update(flip_buf)
+    return run
+
+
+def measure(fn, frame, frames):
+    """(мс на кадр, байт новых аллокаций на кадр)"""
+    fn(frame)  # прогрев
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn(frame)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(frames):
+        fn(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Пиковая память за серию: если на кадр что-то выделяется, пик будет не меньше этого
+    return elapsed / frames * 1000, (peak - before)
+
+
+def run_benchmark(frames=200, width=640, height=480):
+    pygame.init()
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    preview = CameraPreview((320, 240))
+    flip_buf = np.empty_like(frame)
+
+    legacy_ms, legacy_bytes = measure(legacy_preview, frame, frames)
+    new_ms, new_bytes = measure(new_preview(preview, flip_buf), frame, frames)
+    return {
+        "legacy_ms_per_frame": legacy_ms,
+        "legacy_peak_alloc_bytes": legacy_bytes,
+        "preview_ms_per_frame": new_ms,
+        "preview_peak_alloc_bytes": new_bytes,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from engine import WIDTH
+from net import PvpClient, PvpServer
+from profiler import percentile
+from protocol import FULL_STATE_SIZE, INPUT
+
+
+'''
+Нагрузочный тест сетевой игры на localhost: сервер и rooms комнат по два бота.
+Боты шлют ввод с частотой input_rate (ракетка/босс под мячом) и пинг каждые
+ping_interval секунд. Меряется:
+ - байт в секунду от сервера к клиенту и от клиента к серверу (полезная нагрузка
+   сообщений, без заголовков websocket/TCP) и всего через сервер
+ - средний размер снимка против полного (эффект дельта-сжатия)
+ - RTT (пинг-понг через websocket) p50/p95/p99
+Запуск: python bench_pvp.py
+'''
+
+
+async def bot(client, duration, input_rate, ping_interval):
+    receiver = asyncio.create_task(client.receive())
+    end = time.perf_counter() + duration
+    next_ping = 0.0
+    while time.perf_counter() < end and not client.closed:
+        ball_x = client.state.ball_pos[0] / WIDTH
+        await client.send_input((ball_x, 0.75))
+        now = time.perf_counter()
+        if now >= next_ping:
+            await client.ping()
+            next_ping = now + ping_interval
+        await asyncio.sleep(1 / input_rate)
+    await client.close()
+    await receiver
+
+
+async def run_load(rooms=8, duration=3.0, snapshot_rate=30, input_rate=60, ping_interval=0.1):
+    server = await PvpServer("localhost", 0, snapshot_rate=snapshot_rate, seed=0, rematch=True).start()
+    url = f"ws://localhost:{server.port}"
+    clients = []
+    for _ in range(rooms * 2):
+        clients.append(await PvpClient(url).connect())
+    start = time.perf_counter()
+    await asyncio.gather(*(bot(c, duration, input_rate, ping_interval) for c in clients))
+    elapsed = time.perf_counter() - start
+    await server.close()
+
+    down = sum(c.stats.bytes_received for c in clients)
+    up = sum(c.stats.bytes_sent for c in clients)
+    states = sum(c.acked for c in clients)
+    rtt = sorted(v for c in clients for v in c.rtt.samples())
+    return {
+        "clients": len(clients),
+        "down_bytes_per_sec_per_client": down / elapsed / len(clients),
+        "up_bytes_per_sec_per_client": up / elapsed / len(clients),
+        "server_bytes_per_sec": (server.stats.bytes_sent + server.stats.bytes_received) / elapsed,
+        "state_messages_per_sec_per_client": states / elapsed / len(clients),
+        "full_state_bytes": FULL_STATE_SIZE,
+        "input_bytes": INPUT.size,
+        "corrections": sum(c.corrections for c in clients),
+        "rtt_p50_ms": percentile(rtt, 50) * 1000,
+        "rtt_p95_ms": percentile(rtt, 95) * 1000,
+        "rtt_p99_ms": percentile(rtt, 99) * 1000,
+    }
+
+
+def run_benchmark(rooms=8, duration=3.0, snapshot_rate=30):
+    """:return: dict трафика и RTT (см. run_load)"""
+    return asyncio.run(run_load(rooms, duration, snapshot_rate))
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,69 @@
+import math
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from engine import HEIGHT, TABLE_TOP_Y, WIDTH
+from renderer import SceneRenderer
+
+
+'''
+Бенчмарк рендера сцены: мс на кадр
+ - legacy — статическая сцена (фон, стол, сетка) рисуется каждый кадр, как раньше
+ - cached — статический слой из кэша одним blit
+ - dirty — кэш + восстановление и отправка на экран только изменившихся областей
+Динамика во всех режимах одинаковая: босс, мяч, ракетка, счёт.
+Запуск: python bench_render.py
+'''
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "image")
+
+
+def load_sprites():
+    def load(name, size):
+        return pygame.transform.scale(pygame.image.load(os.path.join(ASSETS, name)).convert_alpha(), size)
+    background = pygame.transform.scale(pygame.image.load(os.path.join(ASSETS, "background.jpg")).convert(),
+                                        (WIDTH, HEIGHT))
+    return background, load("ball.png", (40, 40)), load("boss.png", (132, 200)), load("paddle.png", (140, 140))
+
+
+def render_frames(renderer, sprites, frames):
+    _, ball, boss, paddle = sprites
+    font = pygame.font.SysFont("arial", 40)
+    score = font.render("3:5", True, (255, 255, 255))
+    start = time.perf_counter()
+    for i in range(frames):
+        t = i / 60
+        renderer.begin()
+        renderer.blit(boss, (WIDTH // 2 - 66 + 80 * math.sin(t), TABLE_TOP_Y - 200))
+        renderer.blit(ball, (WIDTH // 2 + 200 * math.sin(2 * t), 300 + 200 * abs(math.sin(t))))
+        renderer.blit(paddle, (WIDTH // 2 - 70 + 300 * math.sin(t / 2), 520))
+        renderer.blit(score, (WIDTH // 2 - 30, 30))
+        renderer.present()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def run_benchmark(frames=200):
+    """:return: dict мс на кадр для режимов legacy, cached и dirty"""
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    sprites = load_sprites()
+    modes = {
+        "legacy": {"cache_static": False},
+        "cached": {},
+        "dirty": {"dirty_rects": True},
+    }
+    results = {}
+    for name, options in modes.items():
+        renderer = SceneRenderer(screen, sprites[0], **options)
+        render_frames(renderer, sprites, 5)  # прогрев и сборка кэша
+        results[f"{name}_ms_per_frame"] = render_frames(renderer, sprites, frames)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:.3f}")
@@ -0,0 +1,57 @@
+import time
+
+from physics import BallPhysics
+from rollback import RollbackSimulation
+
+
+'''
+Бенчмарк отката: сколько шагов пересчёта (rollback frames) помещается в бюджет
+одного кадра (16 мс), для обычной и continuous (swept) физики.
+Дополнительно: стоимость записи шага в кольцо (write_state) против get_state().
+Запуск: python bench_rollback.py
+'''
+
+FRAME_BUDGET = 0.016
+
+
+def bench_rollback(continuous, depth=60, rounds=200):
+    """:return: мкс на пересчитанный шаг"""
+    physics = BallPhysics(800, 600, 50, seed=0, continuous=continuous)
+    sim = RollbackSimulation(physics, capacity=depth * 2)
+    for _ in range(depth):
+        sim.step()
+    start = time.perf_counter()
+    for i in range(rounds):
+        sim.rollback(sim.tick - depth, (0.0, -8.0 - i % 3, 6.0))
+    return (time.perf_counter() - start) / (depth * rounds) * 1e6
+
+
+def bench_snapshot(steps=100000):
+    """:return: (мкс на get_state(), мкс на write_state())"""
+    physics = BallPhysics(800, 600, 50, seed=0)
+    ring = RollbackSimulation(physics).ring
+    buf = ring.states
+    offsets = [ring.state_offset(tick) for tick in range(ring.capacity)]  # раскладка — как у кольца
+    start = time.perf_counter()
+    for _ in range(steps):
+        physics.get_state()
+    tuple_us = (time.perf_counter() - start) / steps * 1e6
+    start = time.perf_counter()
+    for i in range(steps):
+        physics.write_state(buf, offsets[i % ring.capacity])
+    return tuple_us, (time.perf_counter() - start) / steps * 1e6
+
+
+def run_benchmark(depth=60, rounds=200):
+    results = {}
+    for name, continuous in (("discrete", False), ("continuous", True)):
+        us = bench_rollback(continuous, depth, rounds)
+        results[f"{name}_us_per_frame"] = us
+        results[f"{name}_rollback_frames_per_16ms"] = FRAME_BUDGET * 1e6 / us
+    results["get_state_us"], results["write_state_us"] = bench_snapshot()
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.2f}")
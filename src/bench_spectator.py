@@ -0,0 +1,157 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from engine import Engine, tracking_player
+from profiler import percentile
+from spectator import FRAME_SIZE, SpectatorServer, decode_frames
+
+
+'''
+Нагрузочный тест трансляции зрителям: игровой цикл (Engine с ботом, 60 шагов в
+секунду) публикует каждый шаг, а в отдельных процессах подключаются spectators
+зрителей; часть из них медленные (читают раз в slow_delay секунд).
+Меряется:
+ - задержка раздачи: от publish() до получения кадра зрителем, p50/p95/p99
+   (time.perf_counter() общий для процессов одной машины)
+ - сколько стоит publish() в игровом потоке (по часам и процессорное время потока —
+   на одном ядре по часам в него попадает и работа разбуженного сервера) и
+   насколько игровой цикл отстаёт от 60 Гц
+ - процессорное время потока сервера (доля одного ядра)
+ - кадров получено быстрыми и медленными зрителями, кадров выброшено
+   (задержку медленного зрителя ограничивают снизу буферы сокетов: пока они не
+   заполнены — а кадр всего 46 байт — сервер не видит, что зритель отстаёт)
+Запуск: python bench_spectator.py
+'''
+
+
+async def _spectate(url, slow_delay, latencies, counts, stopped):
+    """
+    Зритель до закрытия соединения сервером; медленный читает раз в slow_delay сек.
+    Считается только полученное до конца трансляции (stopped): после неё медленный
+    зритель дочитывает то, что осталось в буферах сокетов.
+    """
+    sock = None
+    if slow_delay:
+        # Медленный экран: маленький буфер приёма, иначе отставание копится в ядре клиента
+        host, port = url.rsplit("/", 1)[-1].split(":")
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)  # до connect: окно TCP
+        sock.connect((host, int(port)))
+    received = 0
+    async with connect(url, compression=None, max_queue=1 if slow_delay else None, sock=sock) as websocket:
+        try:
+            async for data in websocket:
+                now = time.perf_counter()
+                frames = decode_frames(data)
+                if stopped.is_set():
+                    continue
+                received += len(frames)
+                latencies.append(now - frames[-1][1])
+                if slow_delay:
+                    await asyncio.sleep(slow_delay)
+        except ConnectionClosed:
+            pass
+    counts.append(received)
+
+
+async def _spectators(url, count, slow, slow_delay, stopped):
+    fast_latencies, slow_latencies, fast_counts, slow_counts = [], [], [], []
+    tasks = []
+    for i in range(count):
+        is_slow = i < slow
+        tasks.append(_spectate(url, slow_delay if is_slow else 0,
+                               slow_latencies if is_slow else fast_latencies,
+                               slow_counts if is_slow else fast_counts, stopped))
+    await asyncio.gather(*tasks)
+    return fast_latencies, slow_latencies, fast_counts, slow_counts
+
+
+def _worker(url, count, slow, slow_delay, stopped, results):
+    results.put(asyncio.run(_spectators(url, count, slow, slow_delay, stopped)))
+
+
+def run_benchmark(spectators=200, slow_fraction=0.1, duration=10.0, processes=None, slow_delay=0.1,
+                  queue_size=4):
+    processes = processes or min(4, os.cpu_count() or 1)
+    server = SpectatorServer("localhost", 0, queue_size=queue_size).start()
+    url = f"ws://localhost:{server.port}"
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    stopped = context.Event()
+    per_process = spectators // processes
+    slow_per_process = round(per_process * slow_fraction)
+    workers = [context.Process(target=_worker, args=(url, per_process, slow_per_process, slow_delay,
+                                                     stopped, results))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    # Ждём, пока зрители подключатся
+    deadline = time.perf_counter() + 20
+    while server.stats()["spectators"] < per_process * processes and time.perf_counter() < deadline:
+        time.sleep(0.05)
+
+    engine = Engine(seed=0)
+    engine.reset()
+    player = tracking_player(seed=0)
+    cpu_start = server.cpu_time()
+    start = time.perf_counter()
+    next_time = start
+    ticks = 0
+    late = 0
+    while time.perf_counter() - start < duration:
+        engine.step(player(engine.state))
+        if engine.state.winner is not None:
+            engine.reset()
+        server.publish(engine.state)
+        ticks += 1
+        next_time += 1 / 60
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            late += 1
+    elapsed = time.perf_counter() - start
+    stopped.set()
+    cpu = server.cpu_time() - cpu_start
+    stats = server.stats()
+    server.stop()  # закрывает соединения — зрители завершаются
+
+    fast, slow, fast_counts, slow_counts = [], [], [], []
+    for _ in workers:
+        a, b, c, d = results.get()
+        fast += a
+        slow += b
+        fast_counts += c
+        slow_counts += d
+    for worker in workers:
+        worker.join()
+    fast.sort()
+    result = {
+        "spectators": stats["spectators"],
+        "ticks_per_sec": ticks / elapsed,
+        "late_ticks": late,
+        "publish_us": stats["publish_us"],
+        "publish_cpu_us": stats["publish_cpu_us"],
+        "server_cpu_percent": cpu / elapsed * 100,
+        "fanout_p50_ms": percentile(fast, 50) * 1000,
+        "fanout_p95_ms": percentile(fast, 95) * 1000,
+        "fanout_p99_ms": percentile(fast, 99) * 1000,
+        "fast_frames_per_sec": sum(fast_counts) / len(fast_counts) / elapsed,
+        "dropped": stats["dropped"],
+        "frame_bytes": FRAME_SIZE,
+    }
+    if slow_counts:
+        result["slow_frames_per_sec"] = sum(slow_counts) / len(slow_counts) / elapsed
+        result["slow_latency_p50_ms"] = percentile(sorted(slow), 50) * 1000
+    return result
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,39 @@
+import time
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from inference import HandResult
+from swing import LandmarkHistory
+
+
+'''
+Бенчмарк признаков руки на кадр (бюджет — доли миллисекунды):
+ - convert — HandResult.from_mediapipe: 21 landmark из объектов Mediapipe в массив (21, 3)
+ - push — копия landmarks руки в кольцевую историю
+ - swing — скорость взмаха по истории (МНК по всем точкам сразу)
+Запуск: python bench_swing.py
+'''
+
+
+def per_call_us(function, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run_benchmark(calls=5000):
+    frame = SyntheticCapture(realtime=False).frame_at(0)[:, :, ::-1].copy()
+    results = FakeHands().process(frame)  # объект той же формы, что у Mediapipe
+    landmarks = HandResult.from_mediapipe(results).landmarks[0]
+    history = LandmarkHistory()
+    return {
+        "convert_us": per_call_us(lambda i: HandResult.from_mediapipe(results), calls),
+        "push_us": per_call_us(lambda i: history.push(i / 60, landmarks), calls),
+        "swing_us": per_call_us(lambda i: history.swing(now=(calls - 1) / 60), calls),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.1f}")
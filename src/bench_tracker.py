@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from inference import create_hands
+from sources import LandmarkReplay, RecordingSource, SessionRecorder
+
+
+'''
+Бенчмарк HandTracker.process_frame на синтетическом ролике (SyntheticCapture, 640x480):
+ - fake — захват из записи, отражение, BGR->RGB и FakeHands вместо Mediapipe
+ - replay — записанные landmarks без инференса (стоимость самого конвейера трекера)
+ - mediapipe — настоящий Mediapipe (только с mediapipe=True: медленно и зависит от машины)
+Ролик один раз записывается во временный .npz и затем воспроизводится без пауз,
+поэтому все прогоны обрабатывают одни и те же кадры.
+Запуск: python bench_tracker.py
+'''
+
+
+def record_clip(path, frames, width=640, height=480):
+    """Записывает синтетический ролик с landmarks от FakeHands."""
+    recorder = SessionRecorder(path)
+    tracker = HandTracker(hands_factory=FakeHands, recorder=recorder)
+    tracker.start_capture(SyntheticCapture(width=width, height=height, max_frames=frames, realtime=False))
+    while tracker.process_frame(draw_point=False, draw_landmarks=False)[0] is not None:
+        pass
+    tracker.stop_capture()
+    return recorder.save()
+
+
+def run_clip(tracker, source):
+    """Кадров в секунду у process_frame на всём ролике."""
+    tracker.start_capture(source)
+    frames = 0
+    start = time.perf_counter()
+    while tracker.process_frame()[0] is not None:
+        frames += 1
+    elapsed = time.perf_counter() - start
+    tracker.stop_capture()
+    return frames / elapsed
+
+
+def run_benchmark(frames=150, mediapipe=False):
+    """:return: dict кадров в секунду для режимов fake, replay (и mediapipe)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = record_clip(os.path.join(tmp, "clip.npz"), frames)
+        results = {"fake_frames_per_sec": run_clip(HandTracker(hands_factory=FakeHands), RecordingSource(path))}
+        replay = LandmarkReplay(path)
+        results["replay_frames_per_sec"] = run_clip(HandTracker(hands_factory=replay.hands_factory),
+                                                    replay.source)
+        if mediapipe:
+            results["mediapipe_frames_per_sec"] = run_clip(HandTracker(hands_factory=create_hands),
+                                                           RecordingSource(path))
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:,.1f}")
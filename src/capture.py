@@ -0,0 +1,233 @@
+import threading
+import time
+
+import numpy as np
+
+
+'''
+Фоновый захват кадров:
+ - ThreadedCapture оборачивает любой источник с интерфейсом cv2.VideoCapture
+   (isOpened / read / release) и читает его в отдельном потоке-производителе
+ - Хранится только последний кадр ("побеждает самый свежий"): если игра не успела
+   забрать кадр, он перезаписывается и учитывается как пропущенный
+ - Игровой цикл никогда не ждёт камеру, кроме самого первого кадра
+ - Если read() источника бросил исключение, поток останавливается, а исключение
+   передаётся владельцу из следующего read() (а не "замерзает" последний кадр)
+
+SyntheticCapture — фейковая камера для тестов: выдаёт синтетические кадры
+с заданной частотой, без веб-камеры.
+'''
+
+
+class CaptureStats:
+    """Счётчики фонового захвата"""
+
+    def __init__(self):
+        self.frames_captured = 0  # кадров прочитано из источника
+        self.frames_consumed = 0  # кадров отдано потребителю (новых)
+        self.frames_dropped = 0   # кадров перезаписано до того, как их забрали
+        self.frames_reused = 0    # повторных чтений без нового кадра
+        self.wait_time = 0.0      # суммарное время ожидания потребителя (сек)
+
+    def as_dict(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_consumed": self.frames_consumed,
+            "frames_dropped": self.frames_dropped,
+            "frames_reused": self.frames_reused,
+            "wait_time": self.wait_time,
+        }
+
+
+class ThreadedCapture:
+    def __init__(self, source, first_frame_timeout=2.0):
+        """
+        :param source: объект с интерфейсом cv2.VideoCapture
+        :param first_frame_timeout: сколько ждать первый кадр (сек)
+        """
+        self.source = source
+        self.first_frame_timeout = first_frame_timeout
+        self.stats = CaptureStats()
+
+        self._cond = threading.Condition()
+        self._frame = None        # последний кадр (один слот)
+        self._frame_id = 0        # номер последнего кадра
+        self._timestamp = None    # time.perf_counter() момента захвата
+        self._consumed_id = 0     # номер последнего отданного кадра
+        self._running = False
+        self._thread = None
+        self._thread_done = False     # поток-производитель вышел из цикла
+        self._release_pending = False  # источник освободит сам поток, когда выйдет из read()
+        self.error = None  # исключение, на котором упал поток-производитель
+
+        # Номер и время кадра, возвращённого последним вызовом read()
+        self.last_frame_id = 0
+        self.last_timestamp = None
+
+    def start(self):
+        """Запускает поток-производитель."""
+        if self._running:
+            return self
+        self._running = True
+        self._thread_done = False
+        self._thread = threading.Thread(target=self._run, name="ThreadedCapture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        error = None
+        try:
+            while self._running:
+                ret, frame = self.source.read()
+                timestamp = time.perf_counter()
+                with self._cond:
+                    if not ret:
+                        # Источник закончился или отвалился
+                        self._running = False
+                        self._cond.notify_all()
+                        break
+                    if self._frame_id > self._consumed_id:
+                        self.stats.frames_dropped += 1
+                    self._frame = frame
+                    self._frame_id += 1
+                    self._timestamp = timestamp
+                    self.stats.frames_captured += 1
+                    self._cond.notify_all()
+        except Exception as exc:
+            error = exc  # владелец получит её из read()
+        finally:
+            with self._cond:
+                self.error = error
+                self._running = False
+                self._thread_done = True
+                self._cond.notify_all()
+                release = self._release_pending
+            if release:
+                self.source.release()
+
+    def isOpened(self):
+        with self._cond:
+            # Ошибка источника — открыт, пока владелец не заберёт её из read()
+            return self._running or self.error is not None or self._frame_id > self._consumed_id
+
+    def read(self):
+        """
+        Возвращает самый свежий кадр, не блокируя игровой цикл.
+        Ждёт только до появления самого первого кадра.
+        Returns:
+            tuple: (ret, frame) — как у cv2.VideoCapture.read()
+        Raises:
+            RuntimeError: источник бросил исключение в фоновом потоке
+        """
+        with self._cond:
+            if self.error is not None:
+                raise RuntimeError("Фоновый захват кадров остановился с ошибкой") from self.error
+            if self._frame is None:
+                start = time.perf_counter()
+                self._cond.wait_for(lambda: self._frame is not None or not self._running,
+                                    timeout=self.first_frame_timeout)
+                self.stats.wait_time += time.perf_counter() - start
+                if self._frame is None:
+                    return False, None
+
+            if self._frame_id > self._consumed_id:
+                self._consumed_id = self._frame_id
+                self.stats.frames_consumed += 1
+            else:
+                self.stats.frames_reused += 1
+
+            self.last_frame_id = self._frame_id
+            self.last_timestamp = self._timestamp
+            return True, self._frame
+
+    def release(self):
+        """
+        Останавливает поток и освобождает источник. Если поток ещё висит в read()
+        источника, источник освобождается не из-под него, а самим потоком после выхода.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            with self._cond:
+                if self._release_pending:
+                    return  # уже отдано потоку
+                if not self._thread_done:
+                    self._release_pending = True
+                    return
+            self._thread = None
+        self.source.release()
+
+
+class SyntheticCapture:
+    def __init__(self, width=640, height=480, fps=30.0, max_frames=None, realtime=True, hands=1):
+        """
+        Фейковая камера: светлый квадрат движется по кругу на тёмном фоне.
+        :param fps: частота кадров
+        :param max_frames: после стольких кадров read() вернёт (False, None)
+        :param realtime: выдерживать паузу 1/fps между кадрами
+        :param hands: 2 — два квадрата ("руки" двух игроков) ходят навстречу друг другу
+                      по x и раз за оборот скрещиваются; второй — голубоватый (FakeHands
+                      помечает его как "Left")
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.max_frames = max_frames
+        self.realtime = realtime
+        self.hands = hands
+        self.frame_index = 0
+        self._opened = True
+        self._next_time = None
+
+    def isOpened(self):
+        return self._opened
+
+    @property
+    def hand_size(self):
+        """Половина стороны квадрата (пиксели)."""
+        return max(8, min(self.width, self.height) // (8 if self.hands == 1 else 10))
+
+    def hand_centers(self, index):
+        """Центры квадратов в кадре с заданным номером (пиксели, до отражения HandTracker)."""
+        angle = index * 2 * np.pi / max(self.fps, 1.0)
+        w, h = self.width, self.height
+        if self.hands == 1:
+            return [(int(w / 2 + np.cos(angle) * w / 4), int(h / 2 + np.sin(angle) * h / 4))]
+        # Навстречу по x, разнесены по y — при скрещивании квадраты не сливаются
+        return [(int(w / 2 + np.cos(angle) * w / 3), int(h / 2 - h / 5 + np.sin(angle) * h / 12)),
+                (int(w / 2 - np.cos(angle) * w / 3), int(h / 2 + h / 5 - np.sin(angle) * h / 12))]
+
+    def frame_at(self, index):
+        """Детерминированный кадр с заданным номером (BGR, uint8)."""
+        frame = np.full((self.height, self.width, 3), 40, dtype=np.uint8)
+        size = self.hand_size
+        colors = ((220, 220, 220), (245, 225, 210))
+        for (cx, cy), color in zip(self.hand_centers(index), colors):
+            frame[max(0, cy - size):cy + size, max(0, cx - size):cx + size] = color
+        # Номер кадра в первом пикселе — удобно проверять порядок в тестах
+        frame[0, 0, 0] = index % 256
+        return frame
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self.max_frames is not None and self.frame_index >= self.max_frames:
+            return False, None
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            delay = self._next_time - now
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time += 1.0 / self.fps
+
+        frame = self.frame_at(self.frame_index)
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
@@ -0,0 +1,54 @@
+'''
+Непрерывные (swept) столкновения:
+ - вместо проверки "пересекается ли мяч с объектом в конце шага" проверяется весь
+   отрезок движения за шаг, поэтому быстрый мяч не "проскакивает" ракетку или сетку
+ - sweep_box — отрезок против прямоугольного параллелепипеда (метод слэбов), любое число осей;
+   границы могут быть бесконечными (стена = полупространство)
+ - мяч радиуса r против прямоугольника = точка против прямоугольника, раздутого на r
+'''
+
+
+def sweep_box(start, delta, box_min, box_max):
+    """
+    Первое касание отрезка start -> start + delta с боксом [box_min, box_max].
+    :return: (t, axis, normal) — доля пути до касания (0..1), ось грани и направление
+             нормали грани (-1 или 1); (0.0, -1, 0), если start уже внутри бокса;
+             None, если касания нет
+    """
+    t_enter, t_exit = 0.0, 1.0
+    axis, normal = -1, 0
+    for i in range(len(start)):
+        if delta[i] == 0:
+            if start[i] < box_min[i] or start[i] > box_max[i]:
+                return None
+            continue
+        inv = 1.0 / delta[i]
+        t0 = (box_min[i] - start[i]) * inv
+        t1 = (box_max[i] - start[i]) * inv
+        face_normal = -1  # входим через нижнюю грань — нормаль смотрит в минус
+        if t0 > t1:
+            t0, t1 = t1, t0
+            face_normal = 1
+        if t0 > t_enter:
+            t_enter, axis, normal = t0, i, face_normal
+        if t1 < t_exit:
+            t_exit = t1
+        if t_enter > t_exit:
+            return None
+    return t_enter, axis, normal
+
+
+def sweep_rect(start, end, rect, radius=0):
+    """
+    Мяч радиуса radius летит из start в end (2D) — когда он впервые касается rect?
+    :param rect: (x, y, w, h) — например, pygame.Rect
+    :return: (t, axis, normal) как у sweep_box или None
+    """
+    x, y, w, h = rect
+    delta = (end[0] - start[0], end[1] - start[1])
+    return sweep_box(start, delta, (x - radius, y - radius), (x + w + radius, y + h + radius))
+
+
+def point_at(start, end, t):
+    """Точка на отрезке start -> end в доле пути t."""
+    return [a + (b - a) * t for a, b in zip(start, end)]
@@ -0,0 +1,316 @@
+import math
+import os
+import random
+import time
+
+from collision import point_at, sweep_rect
+from trajectory import BossAI, TrajectoryPredictor
+
+
+'''
+Игровая логика без окна, камеры и звука:
+ - GameState — всё состояние партии (мяч, ракетка, босс, счёт, кулдауны, таймеры)
+ - Engine.step(inputs) — один шаг симуляции (1/60 сек): движение мяча, столкновения,
+   очки, подача, движение босса; возвращает список событий (для звуков и статистики)
+ - все случайности — из генератора с seed, поэтому при одинаковом seed и потоке
+   ввода партия повторяется бит в бит
+ - run_headless() гоняет партии с ботом вместо руки быстрее реального времени
+game.py только читает ввод, вызывает step() и рисует состояние.
+'''
+
+# --- Геометрия поля (в пикселях окна) ---
+WIDTH, HEIGHT = 1200, 800
+TABLE_TOP_WIDTH = WIDTH * 0.25  # Верхняя часть стола (узкая)
+TABLE_BOTTOM_WIDTH = WIDTH * 0.6  # Нижняя часть стола
+TABLE_TOP_Y = 250
+TABLE_BOTTOM_Y = HEIGHT - int(0.2 * HEIGHT)
+BALL_TOP_Y = 175  # Верхняя граница полёта мяча (выше стола)
+MIN_BALL_ANGLE = math.pi / 6  # минимальный угол подачи от горизонтали
+MAX_BALL_ANGLE = math.pi / 3  # максимальный угол подачи от горизонтали
+
+PADDLE_SIZE = 140
+PADDLE_HITBOX = (35, 35, 70, 70)  # зона удара относительно paddle_pos (центр ракетки 140x140)
+BALL_RADIUS = 12  # половина стороны хитбокса мяча 24x24
+BOSS_WIDTH, BOSS_HEIGHT = 132, 200
+WIN_SCORE = 11
+STEP_TIME = 1 / 60  # длительность шага симуляции (сек)
+
+# --- Удар с взмахом (скорость кисти — swing.LandmarkHistory) ---
+SWING_TRANSFER = 0.35  # доля скорости взмаха по x (пиксели за шаг), передаваемая мячу
+SWING_POWER = 0.03  # прибавка к силе удара за 1 пиксель за шаг взмаха вверх
+MAX_SWING_BONUS = 0.5  # сильнее удар не становится (1.2 * 1.5 от скорости мяча)
+MAX_HIT_VX = 16  # горизонтальная скорость мяча после удара (пиксели за шаг)
+
+# --- События шага ---
+PADDLE_HIT = "paddle_hit"
+BOSS_HIT = "boss_hit"
+PLAYER_POINT = "player_point"  # мяч прошёл мимо босса
+OPPONENT_POINT = "opponent_point"  # мяч ушёл за нижнюю границу
+
+
+def paddle_in_zone(paddle_pos):
+    """Ракетка в зоне удара (вне её ракетка полупрозрачная и мяч не отбивает)."""
+    x, y = paddle_pos
+    return 350 <= y <= 650 and 100 <= x <= 1000
+
+
+def apply_paddle(state, coords):
+    """Ставит ракетку по нормализованным координатам ладони (None — ракетка на месте)."""
+    if coords is None:
+        return  # рука потерялась — ракетка остаётся на месте
+    x, y = coords
+    state.paddle_pos[0] = int(x * WIDTH - 70)
+    state.paddle_pos[1] = int(y * HEIGHT - 70)
+    state.paddle_active = paddle_in_zone(state.paddle_pos)
+    state.paddle_pos[0] = max(0, min(state.paddle_pos[0], WIDTH - PADDLE_SIZE))
+
+
+def clamp_boss(boss_x):
+    """Босс двигается только в пределах верхней части стола."""
+    left_bound = WIDTH // 2 - TABLE_TOP_WIDTH // 2
+    right_bound = WIDTH // 2 + TABLE_TOP_WIDTH // 2 - BOSS_WIDTH
+    return max(left_bound, min(right_bound, boss_x))
+
+
+def apply_boss(state, x):
+    """Ставит босса (второго игрока в PvP) центром в нормализованную координату x (None — на месте)."""
+    if x is None:
+        return
+    state.boss_x = clamp_boss(x * WIDTH - BOSS_WIDTH // 2)
+
+
+class Inputs:
+    def __init__(self, paddle=None, boss=None, swing=None):
+        """
+        :param paddle: (x, y) нормализованные координаты ладони или None (рука не найдена)
+        :param boss: нормализованная координата x второго игрока (только PvP) или None
+        :param swing: взмах руки с ракеткой (vx, vy) в нормализованных ед./сек или None (не менялся)
+        """
+        self.paddle = paddle
+        self.boss = boss
+        self.swing = swing
+
+
+class GameState:
+    def __init__(self):
+        self.ball_pos = [WIDTH // 2, HEIGHT // 3]
+        self.ball_velocity = [5, 5]
+        self.ball_direction = 1  # 1: к противнику (вверх), -1: к игроку (вниз)
+        self.paddle_pos = [WIDTH // 2 - 70, HEIGHT - 140]  # x, y левого верхнего угла
+        self.paddle_active = True  # ракетка в зоне удара
+        self.paddle_swing = (0.0, 0.0)  # скорость взмаха (пиксели за шаг)
+        self.player_score = 0
+        self.opponent_score = 0
+        self.paddle_collision_cooldown = 0  # задержка между ударами ракеткой (шаги)
+        self.wall_collision_cooldown = 0  # задержка между отскоками от босса (шаги)
+        self.boss_x = WIDTH // 2 - BOSS_WIDTH // 2
+        self.boss_flip_state = 0  # 0 (обычное), 1 (отзеркаленное)
+        self.boss_rotation_timer = 0  # таймер анимации отзеркаливания
+        self.tick = 0
+        # Состояние на прошлом шаге: для интерполяции рендера и swept-столкновений ракетки
+        self.prev_ball_pos = list(self.ball_pos)
+        self.prev_boss_x = self.boss_x
+        self.prev_paddle_pos = list(self.paddle_pos)
+
+    @property
+    def winner(self):
+        """"player", "opponent" или None, пока партия идёт."""
+        if self.player_score >= WIN_SCORE:
+            return "player"
+        if self.opponent_score >= WIN_SCORE:
+            return "opponent"
+        return None
+
+    def ball_state(self):
+        """Мяч как состояние BallPhysics (x, y, z, vx, vy, vz) — для прогноза траектории."""
+        return (self.ball_pos[0], self.ball_pos[1], 0, self.ball_velocity[0], self.ball_velocity[1], 0)
+
+
+class Engine:
+    def __init__(self, seed=None, difficulty="normal", pvp=False):
+        """
+        :param seed: зерно всех случайностей партии (подача, ошибки босса)
+        :param difficulty: сложность босса: "easy", "normal" или "hard"
+        :param pvp: боссом управляет второй игрок (Inputs.boss), а не BossAI
+        """
+        self.seed = seed
+        self.pvp = pvp
+        self.rng = random.Random(seed)
+        predictor = TrajectoryPredictor(WIDTH, HEIGHT, 0, gravity=0, drag=1.0, side_walls=False)
+        self.boss_ai = BossAI.with_difficulty(predictor, BALL_TOP_Y, difficulty, seed=self.rng.random())
+        self.state = GameState()
+
+    def reset(self):
+        """Новая партия: счёт 0:0, ракетка и босс на месте, подача."""
+        self.state = GameState()
+        self.serve()
+
+    def reset_boss(self):
+        self.state.boss_x = self.state.prev_boss_x = WIDTH // 2 - BOSS_WIDTH // 2
+
+    def serve(self):
+        """Подача: мяч в центре, случайные угол и скорость в сторону босса"""
+        s = self.state
+        s.ball_pos = [WIDTH // 2, BALL_TOP_Y + 100]  # Сброс позиции дальше от верхней границы
+        reset_angle = self.rng.uniform(MIN_BALL_ANGLE, MAX_BALL_ANGLE)
+        speed = self.rng.uniform(6, 8)
+        s.ball_velocity = [
+            speed * math.cos(reset_angle) * self.rng.choice([-1, 1]),
+            speed * math.sin(reset_angle)
+        ]
+        s.ball_direction = 1
+        # Мяч телепортировался — не интерполируем через всё поле
+        s.prev_ball_pos = list(s.ball_pos)
+        self.boss_ai.on_hit()
+
+    def set_paddle(self, coords):
+        """Ставит ракетку по нормализованным координатам ладони."""
+        apply_paddle(self.state, coords)
+
+    def set_swing(self, velocity):
+        """Скорость взмаха (vx, vy) в нормализованных ед./сек — от неё сила и угол следующего удара."""
+        self.state.paddle_swing = (velocity[0] * WIDTH * STEP_TIME, velocity[1] * HEIGHT * STEP_TIME)
+
+    def step(self, inputs=None):
+        """
+        Один шаг игровой логики (1/60 сек).
+        :param inputs: Inputs или None (ввод не изменился)
+        :return: список событий шага (PADDLE_HIT, BOSS_HIT, PLAYER_POINT, OPPONENT_POINT)
+        """
+        s = self.state
+        events = []
+        s.prev_ball_pos = list(s.ball_pos)
+        s.prev_boss_x = s.boss_x
+        if inputs is not None:
+            self.set_paddle(inputs.paddle)
+            if inputs.swing is not None:
+                self.set_swing(inputs.swing)
+            if self.pvp:
+                apply_boss(s, inputs.boss)
+        s.tick += 1
+
+        # Обновление физики мяча
+        start = list(s.ball_pos)
+        s.ball_pos[0] += s.ball_velocity[0]
+        s.ball_pos[1] += s.ball_velocity[1]
+        s.ball_direction = -1 if s.ball_velocity[1] > 0 else 1
+
+        if s.paddle_collision_cooldown > 0:
+            s.paddle_collision_cooldown -= 1
+        if s.wall_collision_cooldown > 0:
+            s.wall_collision_cooldown -= 1
+
+        # Столкновение с ракеткой: swept в системе отсчёта ракетки (она тоже двигается),
+        # поэтому быстрый мяч или резкий взмах не проскакивают сквозь неё
+        rel_start = (start[0] - s.prev_paddle_pos[0], start[1] - s.prev_paddle_pos[1])
+        rel_end = (s.ball_pos[0] - s.paddle_pos[0], s.ball_pos[1] - s.paddle_pos[1])
+        s.prev_paddle_pos = list(s.paddle_pos)
+        paddle_hit = sweep_rect(rel_start, rel_end, PADDLE_HITBOX, BALL_RADIUS)
+        if paddle_hit and s.paddle_collision_cooldown == 0 and s.paddle_active:
+            events.append(PADDLE_HIT)
+            contact = point_at(rel_start, rel_end, paddle_hit[0])
+            s.ball_pos = [contact[0] + s.paddle_pos[0], contact[1] + s.paddle_pos[1]]  # мяч в точке касания
+            relative_x = (s.ball_pos[0] - (s.paddle_pos[0] + 70)) / 70
+            # Угол — от точки удара и взмаха вбок, сила — от взмаха вверх
+            swing_x, swing_y = s.paddle_swing
+            vx = relative_x * 12 + swing_x * SWING_TRANSFER
+            s.ball_velocity[0] = max(-MAX_HIT_VX, min(MAX_HIT_VX, vx))
+            bonus = min(MAX_SWING_BONUS, max(0.0, -swing_y) * SWING_POWER)
+            s.ball_velocity[1] = -abs(s.ball_velocity[1]) * 1.2 * (1 + bonus)
+            s.paddle_collision_cooldown = 20
+            s.ball_direction = 1
+            self.boss_ai.on_hit()  # траектория изменилась — старый прогноз не годится
+
+        # Отскок от верхней границы (стенка): попал ли босс на пути мяча
+        if s.ball_pos[1] <= BALL_TOP_Y and s.wall_collision_cooldown == 0:
+            boss_rect = (s.boss_x, TABLE_TOP_Y - BOSS_HEIGHT, BOSS_WIDTH, BOSS_HEIGHT)
+            if sweep_rect(start, s.ball_pos, boss_rect, BALL_RADIUS):
+                events.append(BOSS_HIT)
+                if abs(s.ball_velocity[1]) < 3:  # Если скорость слишком мала
+                    s.ball_velocity[1] = 8  # Устанавливаем достаточную скорость
+                else:
+                    s.ball_velocity[1] = -s.ball_velocity[1] * 0.95
+                s.ball_direction = -1
+                s.boss_rotation_timer = 30  # 0.5 сек
+                s.boss_flip_state = 1  # Начинаем с отзеркаленного состояния
+                s.wall_collision_cooldown = 20  # ~0.33 сек
+                self.boss_ai.on_hit()
+            else:
+                s.player_score += 1
+                events.append(PLAYER_POINT)
+                self.serve()
+
+        # Пропадание мяча за нижнюю границу
+        if s.ball_pos[1] >= TABLE_BOTTOM_Y:
+            s.opponent_score += 1
+            events.append(OPPONENT_POINT)
+            self.serve()
+
+        # Центр босса плавно идёт к прогнозу перехвата (пока босс реагирует — за мячом)
+        if s.ball_direction == 1 and not self.pvp:
+            s.boss_x = clamp_boss(self.boss_ai.move(s.boss_x + BOSS_WIDTH // 2, s.ball_state()) - BOSS_WIDTH // 2)
+
+        # Анимация отзеркаливания босса
+        if s.boss_rotation_timer > 0:
+            if s.boss_rotation_timer % 10 == 0:
+                s.boss_flip_state = 1 - s.boss_flip_state
+            s.boss_rotation_timer -= 1
+            if s.boss_rotation_timer == 0:
+                s.boss_flip_state = 0
+        return events
+
+
+def tracking_player(aim_error=25.0, seed=None, paddle_y=0.75):
+    """
+    Бот вместо руки: держит центр ракетки под мячом с ошибкой, новой на каждый розыгрыш.
+    :return: функция state -> Inputs
+    """
+    rng = random.Random(seed)
+    offset = [0.0]
+    last_direction = [None]
+
+    def player(state):
+        if state.ball_direction != last_direction[0]:
+            offset[0] = rng.gauss(0, aim_error)
+            last_direction[0] = state.ball_direction
+        return Inputs(((state.ball_pos[0] + offset[0]) / WIDTH, paddle_y))
+    return player
+
+
+def run_headless(rallies=1000, seed=0, player=None, difficulty="normal", max_steps=10 ** 7):
+    """
+    Гоняет игру без окна: партии до WIN_SCORE подряд, пока не сыграно rallies розыгрышей.
+    :param player: функция state -> Inputs (по умолчанию tracking_player)
+    :return: dict со статистикой и скоростью (розыгрышей и шагов в секунду)
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    if player is None:
+        player = tracking_player(seed=seed)
+    engine = Engine(seed=seed, difficulty=difficulty)
+    engine.reset()
+    counts = {PADDLE_HIT: 0, BOSS_HIT: 0, PLAYER_POINT: 0, OPPONENT_POINT: 0}
+    played = matches = steps = 0
+    start = time.perf_counter()
+    while played < rallies and steps < max_steps:
+        for event in engine.step(player(engine.state)):
+            counts[event] += 1
+            if event in (PLAYER_POINT, OPPONENT_POINT):
+                played += 1
+        steps += 1
+        if engine.state.winner is not None:
+            matches += 1
+            engine.reset()
+    elapsed = time.perf_counter() - start
+    return {
+        "rallies": played,
+        "matches": matches,
+        "steps": steps,
+        "events": counts,
+        "rallies_per_sec": played / elapsed,
+        "steps_per_sec": steps / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run_headless().items():
+        print(f"{name}: {value}")
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+
+'''
+Подмена mp.solutions.hands.Hands для тестов и бенчмарков без Mediapipe/веб-камеры.
+"Рукой" считается яркое пятно (все каналы > 200), как в кадрах SyntheticCapture:
+landmark 0 — центр пятна, остальные 20 точек раскладываются вокруг него.
+При max_num_hands > 1 каждое связное пятно — отдельная рука (самые крупные);
+пятно с синим каналом заметно выше красного — рука "Left", иначе "Right".
+Возвращает объект той же формы, что и hands.process() у Mediapipe.
+'''
+
+
+class FakeHands:
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 threshold=200, **kwargs):
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.threshold = threshold
+        self.calls = 0
+        self.pixels_processed = 0  # "стоимость" инференса — число обработанных пикселей
+
+    def process(self, frame_rgb):
+        self.calls += 1
+        h, w = frame_rgb.shape[:2]
+        self.pixels_processed += h * w
+
+        mask = np.all(frame_rgb > self.threshold, axis=2)
+        ys, xs = np.nonzero(mask)
+        if len(xs) == 0:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+        if self.max_num_hands == 1:
+            hand = self._hand(xs.min(), xs.max(), ys.min(), ys.max(), w, h)
+            if hand is None:
+                return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+            return SimpleNamespace(multi_hand_landmarks=[hand[0]], multi_handedness=[hand[1]])
+
+        count, labels, boxes, _ = cv2.connectedComponentsWithStats(mask.view(np.uint8), connectivity=4)
+        # Компонента 0 — фон; руки — самые крупные пятна (в порядке развёртки кадра)
+        blobs = sorted(range(1, count), key=lambda i: -boxes[i, cv2.CC_STAT_AREA])[:self.max_num_hands]
+        hands, handedness = [], []
+        for i in sorted(blobs):
+            x, y, bw, bh = boxes[i, :4]
+            patch = frame_rgb[y:y + bh, x:x + bw][labels[y:y + bh, x:x + bw] == i]
+            label = "Left" if patch[:, 2].mean() > patch[:, 0].mean() + 10 else "Right"
+            hand = self._hand(x, x + bw - 1, y, y + bh - 1, w, h, label)
+            if hand is not None:
+                hands.append(hand[0])
+                handedness.append(hand[1])
+        if not hands:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+    def _hand(self, x0, x1, y0, y1, w, h, label="Right"):
+        """Рука по рамке пятна (пиксели включительно): (landmarks, handedness) или None."""
+        cx = (x0 + x1 + 1) / 2 / w
+        cy = (y0 + y1 + 1) / 2 / h
+        # Уверенность падает, если пятно обрезано краем кадра
+        touches_edge = x0 == 0 or y0 == 0 or x1 == w - 1 or y1 == h - 1
+        score = 0.6 if touches_edge else 0.95
+        if score < self.min_detection_confidence:
+            return None
+
+        landmark = []
+        for i in range(21):
+            angle = i * 2 * np.pi / 21
+            radius = 0.0 if i == 0 else 0.02
+            landmark.append(SimpleNamespace(x=float(cx + radius * np.cos(angle)),
+                                            y=float(cy - abs(radius * np.sin(angle))),
+                                            z=0.0))
+        hand = SimpleNamespace(landmark=landmark)
+        handedness = SimpleNamespace(classification=[SimpleNamespace(label=label, score=score)])
+        return hand, handedness
+
+    def close(self):
+        pass
@@ -1,448 +1,532 @@
-import cv2
-import pygame
-import os
-from hand_tracker import HandTracker
-import random
-import math
 import time
 
-random.seed(time.time())
+# Отсчёт времени запуска — до тяжёлых импортов
+STARTUP_START = time.perf_counter()
 
-# --- Настройки экрана ---
-WIDTH, HEIGHT = 1200, 800
+import argparse
+import pygame
+import os
+from hand_tracker import HandTracker
+from preview import CameraPreview
+from input_filter import InterpolatingFilter, OneEuroFilter
+from simulation import FixedTimestep, lerp
+from renderer import NET_Y, SceneRenderer
+from sprites import SpriteCache, mip_levels, quantize
+from ui import Button, DynamicLabel, Label, TextCache
+from profiler import Profiler, ProfilerHud
+from net import NetClientThread
+from spectator import SpectatorServer
+from startup import Startup
+from audio import AudioManager
+from quality import QualityController
+from players import PlayerAssigner, strip_coords
+from websockets.exceptions import WebSocketException
+from engine import (Engine, Inputs, STEP_TIME, WIDTH, HEIGHT, TABLE_TOP_WIDTH, TABLE_BOTTOM_WIDTH,
+                    TABLE_TOP_Y, TABLE_BOTTOM_Y, PADDLE_HIT, BOSS_HIT, PLAYER_POINT, OPPONENT_POINT)
+
+# Все случайности игры — из генератора движка: с фиксированным seed партия воспроизводима
+GAME_SEED = time.time()
+BOSS_DIFFICULTY = "normal"  # "easy", "normal" или "hard"
+# Игра вдвоём по сети: адрес сервера net.py ("ws://host:8765"), None — игра с ботом
+PVP_SERVER = None
+# Игра вдвоём перед одной камерой: левый игрок — ракетка, правый — босс (PVP_SERVER не используется)
+LOCAL_PVP = False
+# Трансляция матча на экраны зрителей (spectator.py): порт websockets, None — выключена
+SPECTATOR_PORT = None
+# Качество трекинга подстраивается под 60 FPS (разрешение, шаг инференса, модель)
+ADAPTIVE_QUALITY = True
+# Инференс руки не чаще стольких раз в секунду (15-30), ракетка между замерами
+# экстраполируется в каждом кадре; None — инференс на каждом кадре камеры
+INFERENCE_RATE = None
 
 # --- Цвета ---
 BG_COLOR = (30, 30, 30)
-TABLE_COLOR = (1, 101, 163)  # Сине-голубой цвет стола
-NET_COLOR = (255, 255, 255)
 BALL_COLOR = (255, 255, 0)
 BUTTON_COLOR = (175, 238, 27)  # Зеленый для кнопок
 BUTTON_HOVER_COLOR = (45, 62, 71)  # Серый при наведении
 BUTTON_TEXT_COLOR = (255, 255, 255)  # Белый текст на кнопках
 SCORE_COLOR = (255, 255, 255)  # Белый для счёта
 SHADOW_COLOR = (100, 100, 100)  # Серый для тени мяча
-MIN_BALL_ANGLE = math.pi / 6  # 20 градусов (минимальный угол от горизонтали)
-MAX_BALL_ANGLE = math.pi / 3  # 70 градусов (максимальный угол от горизонтали)
-ball_top_y = 175  # Верхняя граница полёта мяча (выше стола)
 
 WIN_COLOR = (0, 255, 0)  # Зеленый для победы
 LOSE_COLOR = (255, 0, 0)  # Красный для поражения
 
-
-# --- Инициализация pygame ---
+# --- Командная строка ---
+arg_parser = argparse.ArgumentParser(description="Table Tennis Wall")
+arg_parser.add_argument("--startup-report", action="store_true",
+                        help="вывести время стадий запуска (первый кадр, готовность к игре)")
+args, _ = arg_parser.parse_known_args()
+
+# --- Сервер зрителей: каждый шаг симуляции уходит на экраны площадки ---
+# fork — game.py выполняется без защиты __main__, и при spawn процесс сервера заново
+# запустил бы игру. Поэтому сервер запускается до pygame.init() и микшера (дочерний
+# процесс не наследует окно и аудиоустройство) и до фоновых потоков загрузки
+spectators = None
+if SPECTATOR_PORT:
+    spectators = SpectatorServer("0.0.0.0", SPECTATOR_PORT,
+                                 start_method="fork" if hasattr(os, "fork") else "spawn").start()
+
+# --- Инициализация pygame и заставка: первый кадр — до загрузки всего остального ---
+startup = Startup(STARTUP_START)
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Table Tennis Wall")
 clock = pygame.time.Clock()
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+load_image_path = os.path.join(script_dir, "..", "assets", "image", "load_image.jpg")
+load_image = pygame.image.load(load_image_path).convert()
+load_image = pygame.transform.scale(load_image, (WIDTH, HEIGHT))
+screen.blit(load_image, (0, 0))
+pygame.display.flip()
+startup.mark("first_frame")
+
 # --- Шрифты ---
 font_menu = pygame.font.SysFont("arial", 48)
 font = pygame.font.SysFont("arial", 40)  # Шрифт для счёта и кнопок
 
 pygame.mixer.init()
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# --- Фоновая музыка ---
-bg_music_path = os.path.join(script_dir, "..", "assets", "sound", "1.mp3")
-pygame.mixer.music.load(bg_music_path)
-pygame.mixer.music.set_volume(0.4)
-
-# --- Звук удара (2.mp3) ---
-hit_sound_path = os.path.join(script_dir, "..", "assets", "sound", "2.mp3")
-hit_sound = pygame.mixer.Sound(hit_sound_path)
-hit_sound.set_volume(0.4)
-
-# --- Звук поражения (3.mp3) ---
-hit_lose_path = os.path.join(script_dir, "..", "assets", "sound", "3.mp3")
-hit_lose = pygame.mixer.Sound(hit_lose_path)
-hit_lose.set_volume(0.4)             # при желании
-
-# --- Звук поражения (4.mp3) ---
-hit_win_path = os.path.join(script_dir, "..", "assets", "sound", "4.mp3")
-hit_win = pygame.mixer.Sound(hit_win_path)
-hit_win.set_volume(0.4)             # при желании
-
-# --- Звук поражения 11w.mp3) ---
-win_path = os.path.join(script_dir, "..", "assets", "sound", "11w.mp3")
-win = pygame.mixer.Sound(win_path)
-win.set_volume(0.4)             # при желании
-
-# --- Звук поражения (11l.mp3) ---
-lose_path = os.path.join(script_dir, "..", "assets", "sound", "11l.mp3")
-lose = pygame.mixer.Sound(lose_path)
-lose.set_volume(0.4)             # при желании
-
-boss_flip_state = 0  # Состояние отзеркаливания: 0 (обычное), 1 (отзеркаленное)
-boss_rotation_timer = 0  # Таймер для анимации отзеркаливания
-
-# --- Параметры стола (глобальные) ---
-table_top_width = WIDTH * 0.25  # Верхняя часть стола (узкая)
-table_bottom_width = WIDTH * 0.6  # Нижняя часть стола
-table_top_y = 250
-table_bottom_y = HEIGHT - int(0.2 * HEIGHT)
-
-# --- Начальные позиции и состояние ---
-ball_pos = [WIDTH // 2, HEIGHT // 3]
-ball_velocity = [5, 5]  # Начальная скорость мяча
-ball_direction = 1  # 1: к противнику (вверх), -1: к игроку (вниз)
-paddle_pos = [WIDTH // 2 - 70, HEIGHT - 140]  # x, y (смещено для центрирования ракетки)
-player_score = 0  # Счёт игрока
-opponent_score = 0  # Счёт стенки/противника
-paddle_collision_cooldown = 0  # Таймер для задержки между столкновениями
-wall_collision_cooldown = 0  # Таймер для задержки отскока от верхней границы
-boss_x = WIDTH // 2 - 132 // 2  # Начальная позиция X босса (центр, с учётом ширины 132)
-boss_flip_state = 0  # Состояние отзеркаливания: 0 (обычное), 1 (отзеркаленное)
-boss_rotation_timer = 0  # Таймер для анимации отзеркаливания
-
-# --- Загрузка изображения ракетки ---
-paddle_image_path = os.path.join(script_dir, "..", "assets", "image", "paddle.png")
-paddle_image = pygame.image.load(paddle_image_path).convert_alpha()
-paddle_image = pygame.transform.scale(paddle_image, (140, 140))
-
-# --- Загрузка фонового изображения стола ---
-table_bg_image_path = os.path.join(script_dir, "..", "assets", "image", "boss.png")
-table_bg_image = pygame.image.load(table_bg_image_path).convert_alpha()
-
-# --- Загрузка изображения мяча ---
-ball_image_path = os.path.join(script_dir, "..", "assets", "image", "ball.png")
-ball_image = pygame.image.load(ball_image_path).convert_alpha()
-ball_image = pygame.transform.scale(ball_image, (50, 50))  # Базовый размер мяча
-
-# --- Загрузка фонового изображения для всего окна ---
-background_image_path = os.path.join(script_dir, "..", "assets", "image", "background.jpg")
-background_image = pygame.image.load(background_image_path).convert()
-background_image = pygame.transform.scale(background_image, (WIDTH, HEIGHT))
+def sound_path(name):
+    return os.path.join(script_dir, "..", "assets", "sound", name)
+
+
+def image_path(name):
+    return os.path.join(script_dir, "..", "assets", "image", name)
+
+
+# События конца партии (события шага симуляции — из engine)
+MATCH_WON = "match_won"
+MATCH_LOST = "match_lost"
+# Декодированные звуки (PCM) — следующие запуски не декодируют mp3
+AUDIO_CACHE = os.path.join(script_dir, "..", ".cache", "audio")
+
+
+def load_sounds():
+    """Фоновая задача: звуки (mp3 -> PCM через кэш) и их события."""
+    manager = AudioManager(channels=6, cache_dir=AUDIO_CACHE)
+    manager.load_music(sound_path("1.mp3"), volume=0.4)  # фоновая музыка
+    # Удары — не чаще раза в 50 мс; очки и конец партии важнее ударов при нехватке каналов
+    manager.load("hit", sound_path("2.mp3"), volume=0.4, priority=1, min_interval=0.05)
+    manager.load("point_lost", sound_path("3.mp3"), volume=0.4, priority=2)
+    manager.load("point_won", sound_path("4.mp3"), volume=0.4, priority=2)
+    manager.load("match_won", sound_path("11w.mp3"), volume=0.4, priority=3, exclusive=True)
+    manager.load("match_lost", sound_path("11l.mp3"), volume=0.4, priority=3, exclusive=True)
+    for event, name in ((PADDLE_HIT, "hit"), (BOSS_HIT, "hit"), (PLAYER_POINT, "point_won"),
+                        (OPPONENT_POINT, "point_lost"), (MATCH_WON, "match_won"), (MATCH_LOST, "match_lost")):
+        manager.bind(event, name)
+    return manager
+
+
+def load_images():
+    """
+    Фоновая задача: чтение и масштабирование картинок. convert()/convert_alpha()
+    (формат экрана) — в главном потоке, когда задача готова.
+    """
+    paddle = pygame.transform.scale(pygame.image.load(image_path("paddle.png")), (140, 140))
+    boss = pygame.image.load(image_path("boss.png"))
+    ball = pygame.transform.scale(pygame.image.load(image_path("ball.png")), (50, 50))  # Базовый размер мяча
+    background = pygame.transform.scale(pygame.image.load(image_path("background.jpg")), (WIDTH, HEIGHT))
+    return paddle, boss, ball, background
+
+
+def start_tracker():
+    """Фоновая задача: модель Mediapipe, пробный инференс и открытие камеры."""
+    # Вдвоём — обе руки за один инференс, руки закрепляются за игроками
+    hand_tracker = HandTracker(max_num_hands=2 if LOCAL_PVP else 1, threaded_capture=True, profiler=profiler,
+                               inference_rate=INFERENCE_RATE, assigner=PlayerAssigner() if LOCAL_PVP else None)
+    hand_tracker.warm_up()
+    hand_tracker.start_capture()
+    return hand_tracker
+
+
+# Надписи заставки по задачам, которые ещё идут
+LOADING_LABELS = {"sounds": "звуки", "images": "картинки", "tracker": "камера и модель руки"}
 
-load_image_path = os.path.join(script_dir, "..", "assets", "image", "load_image.jpg")
-load_image = pygame.image.load(load_image_path).convert()
-load_image = pygame.transform.scale(load_image, (WIDTH, HEIGHT))
 
-# --- Инициализация HandTracker ---
-tracker = HandTracker(max_num_hands=1)
-tracker.start_capture()
+def draw_loading():
+    """Заставка с полосой прогресса загрузки."""
+    screen.blit(load_image, (0, 0))
+    bar = pygame.Rect(WIDTH // 4, HEIGHT - 80, WIDTH // 2, 16)
+    pygame.draw.rect(screen, BUTTON_HOVER_COLOR, bar)
+    pygame.draw.rect(screen, BUTTON_COLOR, (bar.x, bar.y, int(bar.width * startup.progress()), bar.height))
+    pending = ", ".join(LOADING_LABELS.get(name, name) for name in startup.pending())
+    if pending:
+        text = font_menu.render(f"Загрузка: {pending}", True, BUTTON_TEXT_COLOR)
+        screen.blit(text, text.get_rect(midbottom=(WIDTH // 2, bar.y - 10)))
+
+
+# --- Профайлер стадий кадра (F3 — таблица на экране, сводка пишется при выходе) ---
+profiler = Profiler(capacity=600)
+profiler_hud = ProfilerHud(profiler, pygame.font.SysFont("couriernew", 18))
+PROFILE_DUMP = os.path.join(script_dir, "..", "profile")  # profile.json и profile.csv
+
+# --- Фоновая загрузка; главный поток рисует заставку с прогрессом ---
+startup.run("sounds", load_sounds)
+startup.run("images", load_images)
+startup.run("tracker", start_tracker)
+loading = True
+while not startup.poll():
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            loading = False
+    if not loading:
+        break
+    draw_loading()
+    pygame.display.flip()
+    clock.tick(30)
+if not loading:
+    # Окно закрыли во время загрузки: потоки daemon, камера закроется вместе с процессом
+    if spectators is not None:
+        spectators.stop()
+    pygame.quit()
+    raise SystemExit
+
+# --- Звук: только по событиям игры ---
+audio = startup.result("sounds")
+
+paddle_image, table_bg_image, ball_image, background_image = startup.result("images")
+paddle_image = paddle_image.convert_alpha()
+table_bg_image = table_bg_image.convert_alpha()
+ball_image = ball_image.convert_alpha()
+background_image = background_image.convert()
+
+# --- HandTracker: модель загружена, камера открыта ---
+tracker = startup.result("tracker")
+
+
+def on_quality_change(level_index, level, reason):
+    tracker.apply_quality(level)
+    print(f"Качество трекинга: {level} — {reason}")
+
+
+quality = QualityController(on_change=on_quality_change) if ADAPTIVE_QUALITY else None
+quality_result = None  # последний HandResult, учтённый контроллером
+
+# --- Параметры стола (для рендера; геометрия задана в engine) ---
+table_top_width = TABLE_TOP_WIDTH  # Верхняя часть стола (узкая)
+table_bottom_width = TABLE_BOTTOM_WIDTH  # Нижняя часть стола
+table_top_y = TABLE_TOP_Y
+table_bottom_y = TABLE_BOTTOM_Y
+
+# --- Игровая логика: мяч, ракетка, босс, счёт (без окна и камеры) ---
+engine = Engine(seed=GAME_SEED, difficulty=BOSS_DIFFICULTY, pvp=LOCAL_PVP)
+state = engine.state
+
+# --- Рендер: статический слой (фон, стол, сетка) собирается один раз ---
+# DIRTY_RECTS=True — на экран отправляются только изменившиеся области
+DIRTY_RECTS = False
+renderer = SceneRenderer(screen, background_image, dirty_rects=DIRTY_RECTS)
+
+# --- Кэш спрайтов: мяч (11 уровней размера), тень (11 уровней Z), босс и его отражение ---
+BALL_LEVELS = 11
+SHADOW_LEVELS = 11
+sprite_cache = SpriteCache(max_entries=64)
+sprite_cache.preload("boss", table_bg_image, [(132, 200)], flips=(False, True), smooth=False)
+sprite_cache.preload("ball", ball_image, [(size, size) for size in mip_levels(30, 50, BALL_LEVELS)])
+
+# --- Фильтр ввода: сглаживание руки и компенсация задержки камеры/инференса ---
+# При редком инференсе — линейная экстраполяция по двум последним замерам: по
+# bench_decimation (с дрожанием landmarks) точнее и One Euro, и интерполяции с задержкой
+paddle_filter = OneEuroFilter() if INFERENCE_RATE is None else InterpolatingFilter()
+boss_filter = OneEuroFilter() if INFERENCE_RATE is None else InterpolatingFilter()
+DISPLAY_DELAY = 1 / 60  # кадр попадёт на экран примерно через один кадр
+
+# --- Превью камеры (клавиша C — показать/скрыть) ---
+camera_preview = CameraPreview((320, 240))
 
 # --- Состояния игры ---
 MENU = "menu"
 GAME = "game"
 game_state = MENU
 
+# --- UI: раскладка один раз, текст из кэша ---
+text_cache = TextCache()
+start_button = Button((WIDTH // 2 - 100, HEIGHT // 2 - 50, 200, 100), "Начать", font_menu,
+                      BUTTON_COLOR, BUTTON_HOVER_COLOR, BUTTON_TEXT_COLOR)
+win_label = Label("ПОБЕДА!", font_menu, WIN_COLOR, (WIDTH // 2, HEIGHT // 2 - 100))
+lose_label = Label("ПОРАЖЕНИЕ", font_menu, LOSE_COLOR, (WIDTH // 2, HEIGHT // 2 - 100))
+menu_button = Button((20, 20, 150, 50), "Меню", font, BUTTON_COLOR, BUTTON_HOVER_COLOR,
+                     BUTTON_TEXT_COLOR, text_offset=(20, 5))
+restart_button = Button((190, 20, 150, 50), "Начать", font, BUTTON_COLOR, BUTTON_HOVER_COLOR,
+                        BUTTON_TEXT_COLOR, text_offset=(15, 5))
+score_label = DynamicLabel(font, SCORE_COLOR, (WIDTH // 2, 50))
+
+
+def local_winner():
+    """Победитель с точки зрения этого игрока: "player", "opponent" или None."""
+    if state.winner is None or net_client is None or net_client.role == "bottom":
+        return state.winner
+    # В сетевой игре верхний игрок — это босс: его победа — "opponent" в счёте движка
+    return "player" if state.winner == "opponent" else "opponent"
+
+
 def draw_menu():
     screen.blit(load_image, (0, 0))
     # Кнопка "Начать"
-    button_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 - 50, 200, 100)  # Было HEIGHT // 2
-    mouse_pos = pygame.mouse.get_pos()
-    if button_rect.collidepoint(mouse_pos):
-        pygame.draw.rect(screen, BUTTON_HOVER_COLOR, button_rect)
-    else:
-        pygame.draw.rect(screen, BUTTON_COLOR, button_rect)
-
-    # Текст кнопки
-    text = font_menu.render("Начать", True, BUTTON_TEXT_COLOR)
-    text_rect = text.get_rect(center=button_rect.center)
-    screen.blit(text, text_rect)
-
-    if player_score >= 11:
-        win_text = font_menu.render("ПОБЕДА!", True, WIN_COLOR)
-        win_rect = win_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
-        screen.blit(win_text, win_rect)
-        pygame.mixer.music.stop()
-        win.play()
-    elif opponent_score >= 11:
-        lose_text = font_menu.render("ПОРАЖЕНИЕ", True, LOSE_COLOR)
-        lose_rect = lose_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
-        screen.blit(lose_text, lose_rect)
-        pygame.mixer.music.stop()
-        lose.play()
-
-def draw_scene(frame_surface=None):
-    screen.blit(background_image, (0, 0))
+    start_button.draw(screen, text_cache, pygame.mouse.get_pos())
+
+    winner = local_winner()
+    if winner == "player":
+        win_label.draw(screen, text_cache)
+    elif winner == "opponent":
+        lose_label.draw(screen, text_cache)
+
+
+def make_shadow(width, height, alpha):
+    """Поверхность тени мяча (эллипс с прозрачностью)"""
+    shadow_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.ellipse(shadow_surface, (*SHADOW_COLOR, alpha), (0, 0, width, height))
+    return shadow_surface
+
+
+def draw_scene(frame_surface=None, ball_draw_pos=None, boss_draw_x=None):
+    """
+    Рисует игровую сцену.
+    ball_draw_pos/boss_draw_x — интерполированные позиции между шагами симуляции
+    (по умолчанию — текущие позиции из состояния движка).
+    """
+    if ball_draw_pos is None:
+        ball_draw_pos = state.ball_pos
+    if boss_draw_x is None:
+        boss_draw_x = state.boss_x
+
+    # Фон, стол, ножки и сетка — один blit готового слоя
+    renderer.begin()
 
     # Окно камеры
     if frame_surface:
         camera_rect = pygame.Rect(WIDTH - 330, 10, 320, 240)
-        screen.blit(frame_surface, camera_rect)
-
-    # Левая половина стола
-    left_table_points = [
-        (WIDTH // 2, table_top_y),
-        (WIDTH // 2 - table_top_width // 2, table_top_y),
-        (WIDTH // 2 - table_bottom_width // 2, table_bottom_y),
-        (WIDTH // 2, table_bottom_y)
-    ]
-    pygame.draw.polygon(screen, TABLE_COLOR, left_table_points)
-
-    # Правая половина стола
-    right_table_points = [
-        (WIDTH // 2, table_top_y),
-        (WIDTH // 2 + table_top_width // 2, table_top_y),
-        (WIDTH // 2 + table_bottom_width // 2, table_bottom_y),
-        (WIDTH // 2, table_bottom_y)
-    ]
-    pygame.draw.polygon(screen, TABLE_COLOR, right_table_points)
-
-    # Центральная линия
-    pygame.draw.line(screen, NET_COLOR, (WIDTH // 2, table_top_y), (WIDTH // 2, table_bottom_y), 3)
-
-    # --- Ножки стола ---
-    leg_width = 20
-    leg_color = (50, 50, 50)  # Тёмно-серый цвет ножек
-    # Левая ножка
-    left_leg_x = WIDTH // 2 - table_bottom_width // 2 + 100
-    left_leg_y = table_bottom_y
-    left_leg_height = HEIGHT - table_bottom_y
-    pygame.draw.rect(screen, leg_color, (left_leg_x, left_leg_y, leg_width, left_leg_height))
-
-    # Правая ножка
-    right_leg_x = WIDTH // 2 + table_bottom_width // 2 - leg_width - 100
-    right_leg_y = table_bottom_y
-    right_leg_height = HEIGHT - table_bottom_y
-    pygame.draw.rect(screen, leg_color, (right_leg_x, right_leg_y, leg_width, right_leg_height))
+        renderer.blit(frame_surface, camera_rect)
 
     # --- Второй игрок (boss) ---
     boss_width = 132
     boss_height = 200
     boss_y = table_top_y - boss_height
-    boss_image_scaled = pygame.transform.scale(table_bg_image, (boss_width, boss_height))
-    if boss_rotation_timer > 0:
-        flipped_boss = pygame.transform.flip(boss_image_scaled, boss_flip_state == 1, False)
-        screen.blit(flipped_boss, (boss_x, boss_y))
-    else:
-        screen.blit(boss_image_scaled, (boss_x, boss_y))
-
-    # --- Сетка ---
-    net_y = table_top_y + int((table_bottom_y - table_top_y) * 0.38)
-    net_width = (table_top_width + (table_bottom_width - table_top_width) *
-                 ((net_y - table_top_y) / (table_bottom_y - table_top_y))) * 1.07
-    net_half_width = net_width // 2
-    for y in range(net_y - 25, net_y + 25, 6):
-        for x in range(-int(net_half_width), int(net_half_width), 6):
-            pygame.draw.rect(screen, NET_COLOR, (WIDTH // 2 + x, y, 2, 2))
+    flip_boss = state.boss_rotation_timer > 0 and state.boss_flip_state == 1
+    boss_image_scaled = sprite_cache.scaled("boss", table_bg_image, (boss_width, boss_height),
+                                            flip_x=flip_boss, smooth=False)
+    renderer.blit(boss_image_scaled, (boss_draw_x, boss_y))
 
     # --- Тень мяча ---
     # Параболическая интерполяция для Z: максимум у net_y, минимум у table_top_y и table_bottom_y
-    distance_from_net = abs(ball_pos[1] - net_y)
-    max_distance = max(net_y - table_top_y, table_bottom_y - net_y)
+    distance_from_net = abs(ball_draw_pos[1] - NET_Y)
+    max_distance = max(NET_Y - table_top_y, table_bottom_y - NET_Y)
     z = 1 - (distance_from_net / max_distance) ** 2
     z = max(0, min(1, z))  # Ограничиваем Z в [0, 1]
-    # Размер тени: от 30x20 (Z=0) до 15x10 (Z=1)
-    shadow_width = int(30 - 15 * z)
-    shadow_height = int(20 - 10 * z)
     # Смещение тени вниз: от 0 (Z=0) до 40 (Z=1)
     shadow_offset_y = int(40 * z)
+    # Размер и прозрачность тени — по квантованному Z, чтобы поверхности брались из кэша
+    z_level = quantize(z, 0, 1, SHADOW_LEVELS)
+    # Размер тени: от 30x20 (Z=0) до 15x10 (Z=1)
+    shadow_width = int(30 - 15 * z_level)
+    shadow_height = int(20 - 10 * z_level)
     # Прозрачность тени: от 180 (Z=0) до 40 (Z=1)
-    shadow_alpha = int(180 - 140 * z)
-    # Создаём поверхность для тени
+    shadow_alpha = int(180 - 140 * z_level)
     if shadow_alpha > 0:  # Рисуем тень только если она видима
-        shadow_surface = pygame.Surface((shadow_width, shadow_height), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surface, (*SHADOW_COLOR, shadow_alpha), (0, 0, shadow_width, shadow_height))
-        shadow_pos = (ball_pos[0] - shadow_width // 2, ball_pos[1] + shadow_offset_y - shadow_height // 2)
-        screen.blit(shadow_surface, shadow_pos)
+        shadow_surface = sprite_cache.get(("shadow", shadow_width, shadow_height, shadow_alpha),
+                                          lambda: make_shadow(shadow_width, shadow_height, shadow_alpha))
+        shadow_pos = (ball_draw_pos[0] - shadow_width // 2, ball_draw_pos[1] + shadow_offset_y - shadow_height // 2)
+        renderer.blit(shadow_surface, shadow_pos)
 
     # --- Мяч с текстурой и масштабированием ---
-    z_ball = (table_bottom_y - ball_pos[1]) / (table_bottom_y - table_top_y)
+    z_ball = (table_bottom_y - ball_draw_pos[1]) / (table_bottom_y - table_top_y)
     z_ball = max(0, min(1, z_ball))  # Ограничиваем Z в [0, 1]
-    ball_scale = 50 - 20 * z_ball  # От 50x50 (Z=0) до 30x30 (Z=1)
-    scaled_ball = pygame.transform.smoothscale(ball_image, (int(ball_scale), int(ball_scale)))
-    ball_rect = scaled_ball.get_rect(center=ball_pos)
-    screen.blit(scaled_ball, ball_rect)
+    ball_scale = quantize(50 - 20 * z_ball, 30, 50, BALL_LEVELS)  # От 50x50 (Z=0) до 30x30 (Z=1)
+    scaled_ball = sprite_cache.scaled("ball", ball_image, (ball_scale, ball_scale))
+    ball_rect = scaled_ball.get_rect(center=ball_draw_pos)
+    renderer.blit(scaled_ball, ball_rect)
 
     # --- Ракетка ---
-    screen.blit(paddle_image, paddle_pos)
+    renderer.blit(paddle_image, state.paddle_pos)
 
-    # --- Счёт ---
-    score_text = font.render(f"{player_score}:{opponent_score}", True, SCORE_COLOR)
-    score_rect = score_text.get_rect(center=(WIDTH // 2, 50))
-    screen.blit(score_text, score_rect)
+    # --- Счёт (рендер текста только при смене счёта) ---
+    renderer.mark(score_label.draw(screen, f"{state.player_score}:{state.opponent_score}"))
 
     # --- Кнопки ---
-    menu_button_rect = pygame.Rect(20, 20, 150, 50)
-    restart_button_rect = pygame.Rect(190, 20, 150, 50)
     mouse_pos = pygame.mouse.get_pos()
-    if menu_button_rect.collidepoint(mouse_pos):
-        pygame.draw.rect(screen, BUTTON_HOVER_COLOR, menu_button_rect)
-    else:
-        pygame.draw.rect(screen, BUTTON_COLOR, menu_button_rect)
-    menu_text = font.render("Меню", True, BUTTON_TEXT_COLOR)
-    screen.blit(menu_text, menu_button_rect.move(20, 5))
-    if restart_button_rect.collidepoint(mouse_pos):
-        pygame.draw.rect(screen, BUTTON_HOVER_COLOR, restart_button_rect)
-    else:
-        pygame.draw.rect(screen, BUTTON_COLOR, restart_button_rect)
-    restart_text = font.render("Начать", True, BUTTON_TEXT_COLOR)
-    screen.blit(restart_text, restart_button_rect.move(15, 5))
+    renderer.mark(menu_button.draw(screen, text_cache, mouse_pos))
+    renderer.mark(restart_button.draw(screen, text_cache, mouse_pos))
+
+
+# --- Фиксированный шаг симуляции ---
+# Скорости, кулдауны и таймеры заданы в шагах симуляции, поэтому игра идёт с одной
+# скоростью при любом FPS рендера; рендер интерполирует позиции между шагами.
+# Длина шага — engine.STEP_TIME (не настройка: движок считает шаги по 1/60 сек)
+RENDER_FPS = 60  # ограничение FPS рендера (30, 60, 144 — на скорость игры не влияет)
+sim_clock = FixedTimestep(STEP_TIME)
+
+# Клиент сетевой игры (PVP_SERVER): состояние приходит с сервера, своя ракетка предсказывается
+net_client = None
+
+
+def start_match():
+    """Новая партия: счёт 0:0, подача (в сетевой игре — подключение к серверу)"""
+    global state, net_client
+    leave_match()
+    if PVP_SERVER and not LOCAL_PVP:
+        try:
+            net_client = NetClientThread(PVP_SERVER).start()
+            state = net_client.latest()
+            return
+        except (OSError, WebSocketException) as e:
+            net_client = None
+            print(f"Сервер {PVP_SERVER} недоступен ({e}), игра с ботом")
+    engine.reset()
+    state = engine.state
+    sim_clock.accumulator = 0.0
+
+
+def leave_match():
+    """Отключается от сервера сетевой игры (если подключены)."""
+    global net_client
+    if net_client is not None:
+        net_client.close()
+        net_client = None
 
-    return menu_button_rect, restart_button_rect
 
 # --- Главный игровой цикл ---
+startup.mark("playable")
+if args.startup_report:
+    print(startup.format_report())
 running = True
 while running:
+    frame_time = clock.tick(RENDER_FPS) / 1000.0
+    profiler.record("frame", frame_time)
+
     # События
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+            camera_preview.toggle()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            profiler_hud.toggle()
+            renderer.invalidate()  # убрать оверлей с экрана целиком
         elif event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = event.pos
             if game_state == MENU:
                 # Кнопка "Начать" в меню
-                button_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 - 50, 200, 100)
-                if button_rect.collidepoint(mouse_pos):
+                if start_button.hit(mouse_pos):
                     game_state = GAME
-                    player_score = 0  # Сбрасываем счёт игрока
-                    opponent_score = 0  # Сбрасываем счёт противника
-                    ball_pos = [WIDTH // 2, ball_top_y + 100]  # Сброс позиции мяча
-                    reset_angle = random.uniform(MIN_BALL_ANGLE, MAX_BALL_ANGLE)
-                    speed = random.uniform(6, 8)
-                    ball_velocity = [
-                        speed * math.cos(reset_angle) * random.choice([-1, 1]),
-                        speed * math.sin(reset_angle)
-                    ]
-                    ball_direction = 1  # Сброс направления (вверх)
-                    boss_x = WIDTH // 2 - 132 // 2  # Сбрасываем позицию босса
+                    start_match()
             elif game_state == GAME:
                 # Кнопки в игре
-                pygame.mixer.music.play()
-                menu_button_rect, restart_button_rect = draw_scene()
-                if menu_button_rect.collidepoint(mouse_pos):
+                audio.play_music()
+                if menu_button.hit(mouse_pos):
                     game_state = MENU  # Возврат в меню
-                    boss_x = WIDTH // 2 - 132 // 2  # Сбрасываем позицию босса
-                elif restart_button_rect.collidepoint(mouse_pos):
-                    player_score = 0  # Сброс счёта игрока
-                    opponent_score = 0  # Сброс счёта противника
-                    ball_pos = [WIDTH // 2, ball_top_y + 100]  # Сброс позиции мяча
-                    paddle_pos = [WIDTH // 2 - 70, HEIGHT - 140]  # Сброс позиции ракетки
-                    reset_angle = random.uniform(MIN_BALL_ANGLE, MAX_BALL_ANGLE)
-                    speed = random.uniform(6, 8)
-                    ball_velocity = [
-                        speed * math.cos(reset_angle) * random.choice([-1, 1]),
-                        speed * math.sin(reset_angle)
-                    ]
-                    ball_direction = 1  # Сброс направления (вверх)
-                    boss_x = WIDTH // 2 - 132 // 2  # Сбрасываем позицию босса
+                    leave_match()
+                    engine.reset_boss()
+                elif restart_button.hit(mouse_pos):
+                    start_match()
 
     # --- Обновление состояния ---
     if game_state == GAME:
-        if player_score >= 11 or opponent_score >= 11:
-            hit_sound.stop()
-            hit_lose.stop()
+        if state.winner is not None:
+            # Конец партии: звук победы/поражения — один раз, при переходе в меню
+            audio.stop("hit", "point_lost")
+            audio.stop_music()
+            audio.trigger(MATCH_WON if local_winner() == "player" else MATCH_LOST)
             game_state = MENU
-            boss_x = WIDTH // 2 - 132 // 2  # Сбрасываем позицию босса
+            engine.reset_boss()
         # Получаем координаты руки и кадр
-        frame, coords = tracker.process_frame(draw_point=True)
-        if frame is not None:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-            frame_surface = pygame.transform.scale(frame_surface, (320, 240))
-        else:
-            frame_surface = None
-
+        # Если превью скрыто, landmarks на кадре не рисуем
+        frame, coords = tracker.process_frame(draw_point=camera_preview.visible,
+                                              draw_landmarks=camera_preview.visible)
+        if quality is not None:
+            # Время работы прошлого кадра без ожидания в tick; инференс — если был новый
+            inference_time = None
+            if tracker.last_hand_result is not None and tracker.last_hand_result is not quality_result:
+                quality_result = tracker.last_hand_result
+                inference_time = quality_result.inference_time
+            quality.observe(clock.get_rawtime() / 1000, inference_time)
+        with profiler.measure("preview"):
+            frame_surface = camera_preview.update(frame)
+
+        # Сглаживаем и экстраполируем позицию ладони на момент показа кадра
+        now = time.perf_counter()
+        boss_coords = None
+        # Взмах руки с ракеткой — по истории landmarks (сила и угол удара)
+        latency = paddle_filter.latency or 0.0  # от захвата кадра до результата
+        swing = tracker.history.swing(now=now, latency=latency)
+        swing = (swing.vx, swing.vy)
+        if tracker.assigner is not None:
+            # Вдвоём: каждый игрок водит рукой в своей половине кадра
+            players = tracker.assigner.coords
+            coords = strip_coords(players["left"], 0)
+            boss_coords = strip_coords(players["right"], 1)
+            if boss_coords:
+                boss_filter.update(tracker.last_capture_time, boss_coords, now=now)
+            boss_coords = boss_filter.predict(now + DISPLAY_DELAY)
+            left_swing = tracker.assigner.slot("left").history.swing(now=now, latency=latency)
+            swing = (left_swing.vx * 2, left_swing.vy)  # половина кадра растянута на всё поле
         if coords:
-            x, y = coords
-            paddle_pos[0] = int(x * WIDTH - 70)
-            paddle_pos[1] = int(y * HEIGHT - 70)
-            if (paddle_pos[1] < 350) or (paddle_pos[1] > 650) or (paddle_pos[0] < 100) or (paddle_pos[0] > 1000):
-                paddle_image.set_alpha(120)
-            else:
-                paddle_image.set_alpha(255)
-            paddle_pos[0] = max(0, min(paddle_pos[0], WIDTH - 140))
-
-        # Обновление физики мяча
-        ball_pos[0] += ball_velocity[0]
-        ball_pos[1] += ball_velocity[1]
-
-        # Обновление направления мяча
-        ball_direction = -1 if ball_velocity[1] > 0 else 1
-
-        # Уменьшаем таймер кулдауна
-        if paddle_collision_cooldown > 0:
-            paddle_collision_cooldown -= 1
-
-        # Уменьшаем таймер кулдауна для стены
-        if wall_collision_cooldown > 0:
-            wall_collision_cooldown -= 1
-
-        # Отскок от верхней границы (стенка)
-        if ball_pos[1] <= ball_top_y and wall_collision_cooldown == 0:
-            boss_rect = pygame.Rect(boss_x, table_top_y - 200, 132, 200)
-            ball_rect = pygame.Rect(ball_pos[0] - 12, ball_pos[1] - 12, 24, 24)
-            if boss_rect.colliderect(ball_rect):
-                hit_sound.play()
-                if abs(ball_velocity[1]) < 3:  # Если скорость слишком мала
-                    ball_velocity[1] = 8  # Устанавливаем достаточную скорость
-                else:
-                    ball_velocity[1] = -ball_velocity[1] * 0.95
-                ball_direction = -1  # Направление вниз после отскока
-                boss_rotation_timer = 30  # ~0.5 сек при 60 FPS
-                boss_flip_state = 1  # Начинаем с отзеркаленного состояния
-                wall_collision_cooldown = 20  # ~0.33 сек при 60 FPS
+            paddle_filter.update(tracker.last_capture_time, coords, now=now)
+        coords = paddle_filter.predict(now + DISPLAY_DELAY)
+
+        if net_client is not None:
+            # Сетевая игра: ввод — на сервер, состояние — последний снимок с предсказанием
+            with profiler.measure("physics"):
+                net_client.send_input(coords)
+                state = net_client.latest()
+                for event in net_client.drain_events():
+                    audio.trigger(event)
+                if spectators is not None:
+                    spectators.publish(state)
+            if net_client.closed and state.winner is None:
+                game_state = MENU  # соперник отключился
+                leave_match()
+        else:
+            # Ракетка вне зоны удара полупрозрачная (и мяч не отбивает)
+            inputs = None
+            if LOCAL_PVP:
+                # Вдвоём ввод обоих игроков (и взмах) применяется в шаге симуляции
+                inputs = Inputs(coords, boss_coords[0] if boss_coords else None, swing)
             else:
-                player_score += 1
-                hit_win.play()
-                ball_pos = [WIDTH // 2, ball_top_y + 100]  # Сброс позиции дальше от верхней границы
-                reset_angle = random.uniform(MIN_BALL_ANGLE, MAX_BALL_ANGLE)
-                speed = random.uniform(6, 8)
-                ball_velocity = [
-                    speed * math.cos(reset_angle) * random.choice([-1, 1]),
-                    speed * math.sin(reset_angle)
-                ]
-                ball_direction = 1  # Сброс направления (вверх)
-                random.seed(time.time() + random.random())
-
-        # Пропадание мяча за нижнюю границу
-        if ball_pos[1] >= table_bottom_y:
-            opponent_score += 1
-            hit_lose.play()
-            ball_pos = [WIDTH // 2, ball_top_y + 100]  # Сброс позиции дальше от верхней границы
-            reset_angle = random.uniform(MIN_BALL_ANGLE, MAX_BALL_ANGLE)
-            speed = random.uniform(6, 8)
-            ball_velocity = [
-                speed * math.cos(reset_angle) * random.choice([-1, 1]),
-                speed * math.sin(reset_angle)
-            ]
-            ball_direction = 1  # Сброс направления (вверх)
-            random.seed(time.time() + random.random())
-
-        # Столкновение с ракеткой
-        paddle_rect = pygame.Rect(paddle_pos[0], paddle_pos[1], 140, 140)
-        collision_rect = paddle_rect.inflate(-paddle_rect.width // 2, -paddle_rect.height // 2)
-        ball_rect = pygame.Rect(ball_pos[0] - 12, ball_pos[1] - 12, 24, 24)
-        if collision_rect.colliderect(ball_rect) and paddle_collision_cooldown == 0 and paddle_image.get_alpha() == 255:
-            hit_sound.play()
-            relative_x = (ball_pos[0] - (paddle_pos[0] + 70)) / 70
-            ball_velocity[0] = relative_x * 12
-            ball_velocity[1] = -abs(ball_velocity[1]) * 1.2
-            # player_score += 1
-            paddle_collision_cooldown = 20
-            ball_direction = 1  # Направление вверх после удара
-
-        # Обновление позиции босса по X
-        if ball_direction == 1:  # Мяч движется к боссу
-            target_x = ball_pos[0] - 136 // 2  # Цель: центр босса совпадает с мячом
-            # Ограничиваем движение в пределах верхней части стола
-            left_bound = WIDTH // 2 - table_top_width // 2
-            right_bound = WIDTH // 2 + table_top_width // 2 - 132
-            target_x = max(left_bound, min(right_bound, target_x))
-            # Плавное движение (lerp)
-            boss_x = boss_x * 0.9 + target_x * 0.1
-
-        # Обновление анимации отзеркаливания оппонента
-        if boss_rotation_timer > 0:
-            if boss_rotation_timer % 10 == 0:
-                boss_flip_state = 1 - boss_flip_state  # Чередуем 0 и 1
-            boss_rotation_timer -= 1
-            if boss_rotation_timer == 0:
-                boss_flip_state = 0  # Возвращаем обычное состояние
+                engine.set_paddle(coords)
+                engine.set_swing(swing)
+
+            # 0..N шагов симуляции за кадр рендера
+            with profiler.measure("physics"):
+                for _ in range(sim_clock.advance(frame_time)):
+                    for event in engine.step(inputs):
+                        audio.trigger(event)
+                    if spectators is not None:
+                        spectators.publish(state)
+        paddle_image.set_alpha(255 if state.paddle_active else 120)
 
     # --- Рендер ---
     if game_state == MENU:
-        draw_menu()
+        with profiler.measure("render"):
+            draw_menu()
+            profiler_hud.draw(screen)
+        renderer.invalidate()  # меню закрыло всю сцену — после него кадр целиком
+        with profiler.measure("flip"):
+            pygame.display.flip()
     else:
-        draw_scene(frame_surface)
-
-    pygame.display.set_caption(f"Table Tennis Wall - FPS: {clock.get_fps():.2f}")
-    pygame.display.flip()
-    clock.tick(60)
+        alpha = sim_clock.alpha if net_client is None else net_client.alpha()
+        # Своего босса (верхний игрок в сети) рисуем без интерполяции — он предсказан
+        boss_x = state.boss_x if net_client is not None and net_client.role == "top" \
+            else lerp(state.prev_boss_x, state.boss_x, alpha)
+        with profiler.measure("render"):
+            draw_scene(frame_surface, lerp(state.prev_ball_pos, state.ball_pos, alpha), boss_x)
+            hud_rect = profiler_hud.draw(screen)
+            if hud_rect:
+                renderer.mark(hud_rect)
+        with profiler.measure("flip"):
+            renderer.present()
+
+    pygame.display.set_caption(f"Table Tennis Wall - FPS: {clock.get_fps():.2f} "
+                               f"render {renderer.stats.last_time * 1000:.1f} ms"
+                               + (f" quality {quality.current.name}" if quality is not None else ""))
 
 # --- Очистка ---
+leave_match()
+if spectators is not None:
+    spectators.stop()
 tracker.stop_capture()
+profiler.dump_json(PROFILE_DUMP + ".json")
+profiler.dump_csv(PROFILE_DUMP + ".csv")
 pygame.quit()
\ No newline at end of file
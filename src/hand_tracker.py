@@ -1,77 +1,407 @@
+import threading
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from capture import ThreadedCapture
+from inference import NUM_LANDMARKS, LocalInference, ProcessInference, create_hands, draw_hand
+from profiler import Profiler
+from roi import RoiTracker
+from sources import open_source
+from swing import LandmarkHistory
+
+# Цвета точек ладоней игроков на превью (BGR): левый — зелёный, правый — оранжевый
+PLAYER_COLORS = ((0, 255, 0), (0, 140, 255))
+
 
 class HandTracker:
-    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5):
-        # Инициализация Mediapipe
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5,
+                 threaded_capture=False, inference="local", hands_factory=create_hands, roi=False,
+                 profiler=None, recorder=None, model_complexity=1, input_scale=1.0, inference_stride=1,
+                 inference_rate=None, assigner=None):
+        """
+        Args:
+            threaded_capture: читать камеру в фоновом потоке
+            inference: "local" — Mediapipe в этом же процессе,
+                       "process" — в отдельном процессе через shared memory
+            hands_factory: функция, создающая mp.solutions.hands.Hands (подменяется в тестах)
+            roi: искать руку только вокруг её прошлой позиции (только для inference="local")
+            profiler: Profiler для замеров стадий capture/convert/inference/draw (по умолчанию выключен)
+            recorder: SessionRecorder — записывать кадры с камеры и результаты инференса
+            model_complexity: сложность модели Mediapipe Hands (0 — лёгкая, 1 — полная)
+            input_scale: доля разрешения камеры, в которой кадр идёт в трекинг и превью
+            inference_stride: инференс на каждом N-м кадре, между ними — последний результат
+            inference_rate: инференс не чаще стольких раз в секунду по времени захвата кадров
+                            (None — на каждом кадре); позицию между замерами даёт фильтр ввода
+            assigner: players.PlayerAssigner — закреплять найденные руки за игроками
+                      (игра вдвоём, max_num_hands=2); координаты — в assigner.coords
+        """
+        self.max_num_hands = max_num_hands
+        self.hands_kwargs = dict(
             max_num_hands=max_num_hands,
             min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
+            min_tracking_confidence=min_tracking_confidence,
+            model_complexity=model_complexity,
         )
+        self.hands_factory = hands_factory
+        self.inference_mode = inference
+        # Новая модель при смене параметров собирается в фоновом потоке (set_hands_options)
+        self._builder = None
+        self._built = None  # (hands_kwargs, LocalInference), ещё не подставленная
+        self._built_lock = threading.Lock()
+        if inference == "local":
+            self.inference = LocalInference(hands_factory, **self.hands_kwargs)
+        elif inference == "process":
+            # Процесс запускается при первом кадре, когда известен его размер
+            self.inference = None
+        else:
+            raise ValueError(f"Неизвестный режим инференса: {inference}")
+
+        if roi and max_num_hands > 1:
+            # ROI строится вокруг одной руки
+            raise ValueError("Режим ROI поддерживается только с max_num_hands=1")
+        if roi and inference != "local":
+            # Результат process-режима приходит с задержкой, и его нельзя сопоставить с ROI кадра
+            raise ValueError("Режим ROI поддерживается только с inference=\"local\"")
+        self.roi = RoiTracker() if roi else None
+        # Вырезки ROI — своей моделью: в видеорежиме Mediapipe переносит прямоугольник руки
+        # с прошлого входа, и прямоугольник с вырезки 192px сбил бы поиск по полному кадру
+        # (и наоборот) — при каждом переключении рука терялась бы
+        self.roi_inference = LocalInference(hands_factory, **self.hands_kwargs) if roi else None
         self.cap = None
+        # Фоновый поток захвата: игра всегда получает самый свежий кадр без ожидания
+        self.threaded_capture = threaded_capture
 
-    def start_capture(self):
-        """Запускает захват видео с веб-камеры."""
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
+        # Последний обработанный кадр (для повторного использования в threaded-режиме)
+        self._last_frame_id = None
+        self._last_result = (None, None)
+        # Последний HandResult (все landmarks в виде numpy-массива)
+        self.last_hand_result = None
+        # Рука, по которой считаются координаты: её 21 landmark последнего результата
+        # (массив выделен один раз и перезаписывается) и короткая история для взмаха
+        self.landmarks = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.hand_found = False
+        self.history = LandmarkHistory()
+        self._flip_buf = None
+        self._rgb_buf = None
+        self._scale_buf = None
+        # Качество трекинга (меняется на ходу — quality.QualityController)
+        self.input_scale = input_scale
+        self.inference_stride = inference_stride
+        self.inference_rate = inference_rate
+        self._stride_count = 0
+        self._next_inference = None  # время захвата, к которому нужен следующий инференс
+        self._prev_capture_time = None
+        self._frame_interval = None  # оценка интервала кадров камеры (сек)
+        # Время захвата кадра, по которому получен последний результат (time.perf_counter())
+        self.last_capture_time = None
+        self._frame_times = {}
+        self.assigner = assigner
+        self._assigned_result = None  # последний HandResult, разобранный assigner
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.recorder = recorder
+
+    def start_capture(self, source=None):
+        """
+        Запускает захват видео.
+        Args:
+            source: объект с интерфейсом cv2.VideoCapture (по умолчанию веб-камера 0)
+                    или описание для sources.open_source: номер камеры, видеофайл,
+                    папка с кадрами, "synthetic", запись сессии (.npz)
+        """
+        if source is None:
+            source = cv2.VideoCapture(0)
+        elif isinstance(source, (int, str)):
+            source = open_source(source)
+        if not source.isOpened():
             raise RuntimeError("Не удалось открыть веб-камеру")
+        if self.threaded_capture:
+            source = ThreadedCapture(source).start()
+        self.cap = source
+        self._last_frame_id = None
+        if self.roi is not None:
+            self.roi.reset()
+        self._last_result = (None, None)
+
+    def warm_up(self, frame_shape=(480, 640, 3)):
+        """
+        Пробный инференс на чёрном кадре: первый вызов Mediapipe загружает граф и
+        выделяет буферы (сотни мс) — лучше сделать это на заставке, а не в первом кадре игры.
+        В process-режиме запускает воркер и ждёт загрузки модели.
+        """
+        if self.inference_mode == "process":
+            self._ensure_inference(frame_shape)
+            self.inference.wait_ready()
+            return
+        self.inference.submit(np.zeros(frame_shape, dtype=np.uint8))
+        if self.roi_inference is not None:
+            size = self.roi.roi_resolution
+            self.roi_inference.submit(np.zeros((size, size, frame_shape[2]), dtype=np.uint8))
+
+    def capture_stats(self):
+        """Счётчики фонового захвата (или None, если захват синхронный)."""
+        if isinstance(self.cap, ThreadedCapture):
+            return self.cap.stats.as_dict()
+        return None
+
+    def roi_stats(self):
+        """Счётчики режима ROI, включая долю fallback (или None, если ROI выключен)."""
+        if self.roi is not None:
+            return self.roi.stats.as_dict()
+        return None
 
     def stop_capture(self):
         """Останавливает захват и освобождает ресурсы."""
         if self.cap:
             self.cap.release()
         cv2.destroyAllWindows()
-        self.hands.close()
+        if self._builder is not None:
+            self._builder.join()
+            self._builder = None
+        if self._built is not None:
+            for built in self._built[1:]:
+                if built is not None:
+                    built.close()
+            self._built = None
+        if self.inference:
+            self.inference.close()
+            self.inference = None
+        if self.roi_inference is not None:
+            self.roi_inference.close()
+            self.roi_inference = None
+
+    def set_hands_options(self, **options):
+        """
+        Меняет параметры Mediapipe Hands (model_complexity, пороги уверенности) без паузы
+        в игре: новая модель создаётся в фоновом потоке, а до её готовности кадры идут
+        через старую; в process-режиме модель пересоздаёт сам воркер.
+        """
+        hands_kwargs = dict(self.hands_kwargs, **options)
+        if hands_kwargs == self.hands_kwargs:
+            return
+        self.hands_kwargs = hands_kwargs
+        if self.inference_mode == "process":
+            if self.inference is not None:
+                self.inference.set_options(**hands_kwargs)
+            return
+        self._builder = threading.Thread(target=self._build_inference, args=(hands_kwargs,),
+                                         name="HandsBuilder", daemon=True)
+        self._builder.start()
+
+    def _build_inference(self, hands_kwargs):
+        """Фоновый поток: создание модели Mediapipe (сотни мс) вне игрового цикла."""
+        built = (hands_kwargs, LocalInference(self.hands_factory, **hands_kwargs),
+                 LocalInference(self.hands_factory, **hands_kwargs) if self.roi is not None else None)
+        with self._built_lock:
+            if hands_kwargs != self.hands_kwargs:
+                stale = built  # параметры уже сменились ещё раз — соберёт следующий поток
+            else:
+                stale, self._built = self._built, built
+        if stale is not None:
+            for inference in stale[1:]:
+                if inference is not None:
+                    inference.close()
+
+    def _swap_inference(self):
+        """Подставляет модель, собранную в фоне, если она готова."""
+        if self._built is None:
+            return
+        with self._built_lock:
+            hands_kwargs, inference, roi_inference = self._built
+            self._built = None
+        if hands_kwargs != self.hands_kwargs:
+            inference.close()
+            if roi_inference is not None:
+                roi_inference.close()
+            return
+        if self.inference is not None:
+            inference.frame_id = self.inference.frame_id  # номера кадров продолжаются (_frame_times)
+            self.inference.close()
+        self.inference = inference
+        if self.roi is not None:
+            if self.roi_inference is not None:
+                self.roi_inference.close()
+            self.roi_inference = roi_inference
+            self.roi.reset()
+
+    def apply_quality(self, level):
+        """Настройки уровня quality.QualityLevel: разрешение, шаг инференса, параметры модели."""
+        self.input_scale = level.input_scale
+        self.inference_stride = level.inference_stride
+        self.set_hands_options(**level.hands_options())
 
-    def process_frame(self, draw_point=True):
+    def _ensure_inference(self, frame_shape):
+        """Для process-режима (пере)запускает воркер под размер кадра."""
+        if self.inference_mode != "process":
+            return
+        if self.inference is not None and self.inference.frame_shape == frame_shape:
+            return
+        if self.inference is not None:
+            self.inference.close()
+        self._frame_times.clear()
+        self.inference = ProcessInference(frame_shape, hands_factory=self.hands_factory, **self.hands_kwargs)
+
+    def _submit_roi(self, roi_rgb):
+        """Инференс вырезки ROI её моделью; номера кадров — общие с полным поиском (_track_capture_time)."""
+        self.roi_inference.frame_id = self.inference.frame_id
+        self.inference.frame_id += 1
+        return self.roi_inference.submit(roi_rgb)
+
+    def _should_infer(self, capture_time):
+        """
+        Нужен ли инференс на кадре: inference_stride — по номеру кадра,
+        inference_rate — по времени захвата (кадр берётся, если он ближе к сроку,
+        чем следующий: допуск — половина интервала кадров камеры).
+        """
+        if self._prev_capture_time is not None and capture_time > self._prev_capture_time:
+            dt = capture_time - self._prev_capture_time
+            self._frame_interval = dt if self._frame_interval is None else \
+                self._frame_interval + 0.1 * (dt - self._frame_interval)
+        self._prev_capture_time = capture_time
+
+        count = self._stride_count
+        self._stride_count += 1
+        if count % self.inference_stride:
+            return False
+        if not self.inference_rate:
+            return True
+        period = 1.0 / self.inference_rate
+        tolerance = (self._frame_interval or 0.0) / 2
+        if self._next_inference is not None and capture_time + tolerance < self._next_inference:
+            return False
+        if self._next_inference is None or capture_time - self._next_inference > period:
+            self._next_inference = capture_time + period  # после паузы — отсчёт заново
+        else:
+            self._next_inference += period  # ровная сетка, без накопления сдвига
+        return True
+
+    def _scaled(self, frame):
+        """Кадр в input_scale от исходного разрешения (буфер переиспользуется)."""
+        h, w = frame.shape[:2]
+        shape = (max(1, round(h * self.input_scale)), max(1, round(w * self.input_scale)), frame.shape[2])
+        if self._scale_buf is None or self._scale_buf.shape != shape:
+            self._scale_buf = np.empty(shape, dtype=np.uint8)
+        return cv2.resize(frame, (shape[1], shape[0]), dst=self._scale_buf, interpolation=cv2.INTER_AREA)
+
+    def _frame_buffers(self, shape):
+        """Буферы под отражённый BGR-кадр и его RGB-версию (выделяются один раз)."""
+        if self._flip_buf is None or self._flip_buf.shape != shape:
+            self._flip_buf = np.empty(shape, dtype=np.uint8)
+            self._rgb_buf = np.empty(shape, dtype=np.uint8)
+        return self._flip_buf, self._rgb_buf
+
+    def _track_capture_time(self, capture_time, result):
+        """Запоминает время захвата кадра, по которому получен результат (нужно фильтрам ввода)."""
+        frame_id = self.inference.frame_id
+        self._frame_times[frame_id] = capture_time
+        # В process-режиме результат может отставать на несколько кадров — храним короткую историю
+        for old_id in [i for i in self._frame_times if i < frame_id - 16]:
+            del self._frame_times[old_id]
+        if result is None:
+            self.last_capture_time = None
+        else:
+            self.last_capture_time = self._frame_times.get(result.frame_id, capture_time)
+
+    def process_frame(self, draw_point=True, draw_landmarks=True):
         """
         Обрабатывает текущий кадр, возвращает нормализованные координаты центра ладони.
+        Возвращаемый кадр живёт до следующего вызова (буфер переиспользуется).
         Args:
             draw_point: bool, рисовать ли точку в центре ладони
+            draw_landmarks: bool, рисовать ли скелет руки (не нужно, если превью скрыто)
         Returns:
             tuple: (frame, normalized_coords), где normalized_coords - (x, y) или None
         """
         if not self.cap or not self.cap.isOpened():
             return None, None
 
-        ret, frame = self.cap.read()
+        profiler = self.profiler
+        with profiler.measure("capture"):
+            ret, frame = self.cap.read()
         if not ret:
             return None, None
+        # Источники-записи отдают исходное время захвата: воспроизведение детерминировано
+        capture_time = getattr(self.cap, "last_timestamp", None)
+        if capture_time is None:
+            capture_time = time.perf_counter()
+        raw_frame = frame
 
-        frame = cv2.flip(frame, 1)
-        # Конвертация BGR в RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # В threaded-режиме кадр мог не обновиться с прошлого вызова — не гоняем его повторно
+        if isinstance(self.cap, ThreadedCapture):
+            if self.cap.last_frame_id == self._last_frame_id:
+                return self._last_result
+            self._last_frame_id = self.cap.last_frame_id
+            capture_time = self.cap.last_timestamp
 
-        # Обработка кадра
-        results = self.hands.process(frame_rgb)
+        # Инференс не на каждом кадре (inference_stride, inference_rate) — между ними последний результат
+        infer = self._should_infer(capture_time)
+        with profiler.measure("convert"):
+            if self.input_scale != 1.0:
+                frame = self._scaled(frame)
+            flip_buf, rgb_buf = self._frame_buffers(frame.shape)
+            frame = cv2.flip(frame, 1, dst=flip_buf)
+            if infer:
+                # Конвертация BGR в RGB (только для Mediapipe, кадр для отображения остаётся в BGR)
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
 
-        # Конвертация обратно в BGR для отображения
-        frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+        if infer:
+            # Обработка кадра (в process-режиме — результат по одному из предыдущих кадров)
+            self._ensure_inference(frame_rgb.shape)
+            self._swap_inference()
+            with profiler.measure("inference"):
+                if self.roi is not None:
+                    result = self.roi.process(frame_rgb, self.inference.submit, self._submit_roi)
+                else:
+                    result = self.inference.submit(frame_rgb)
+            self.last_hand_result = result
+            self._track_capture_time(capture_time, result)
+            self.hand_found = result is not None and result.num_hands > 0
+            if self.hand_found:
+                np.copyto(self.landmarks, result.landmarks[-1])
+                self.history.push(self.last_capture_time, self.landmarks)
+        else:
+            # last_capture_time не меняется: фильтр ввода не примет старый результат за новый
+            result = self.last_hand_result
+        if self.assigner is not None and result is not None and result is not self._assigned_result:
+            # Руки нового результата — игрокам (в process-режиме результат может повторяться)
+            self._assigned_result = result
+            with profiler.measure("players"):
+                self.assigner.update(result, self.last_capture_time)
+        if self.recorder is not None:
+            # В process-режиме result относится к одному из предыдущих кадров
+            self.recorder.add(capture_time, raw_frame, result)
 
         normalized_coords = None
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Рисуем landmarks на руке
-                self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-
-                # Получаем координаты центра ладони (landmark 0 - основание ладони)
-                palm_center = hand_landmarks.landmark[0]
+        with profiler.measure("draw"):
+            if result is not None:
                 h, w, _ = frame.shape
-                cx = int(palm_center.x * w)
-                cy = int(palm_center.y * h)
+                for landmarks in result.landmarks:
+                    # Рисуем landmarks на руке
+                    if draw_landmarks:
+                        draw_hand(frame, landmarks)
+
+                    # Получаем координаты центра ладони (landmark 0 - основание ладони)
+                    palm_x, palm_y = float(landmarks[0, 0]), float(landmarks[0, 1])
+                    cx = int(palm_x * w)
+                    cy = int(palm_y * h)
+
+                    # Рисуем точку в центре ладони, если требуется (игроков — ниже, своими цветами)
+                    if draw_point and self.assigner is None:
+                        cv2.circle(frame, (cx, cy), 10, (0, 255, 0), -1)
 
-                # Рисуем точку в центре ладони, если требуется
-                if draw_point:
-                    cv2.circle(frame, (cx, cy), 10, (0, 255, 0), -1)
+                    # Сохраняем нормализованные координаты
+                    normalized_coords = (palm_x, palm_y)
+                if draw_point and self.assigner is not None:
+                    for slot in self.assigner.slots:
+                        if slot.coords is not None:
+                            center = (int(slot.coords[0] * w), int(slot.coords[1] * h))
+                            cv2.circle(frame, center, 10, PLAYER_COLORS[slot.index % len(PLAYER_COLORS)], -1)
 
-                # Сохраняем нормализованные координаты
-                normalized_coords = (palm_center.x, palm_center.y)
+        if self.roi is not None and infer:
+            self.roi.update(normalized_coords)
 
+        self._last_result = (frame, normalized_coords)
         return frame, normalized_coords
 
     def run(self):
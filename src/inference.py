@@ -0,0 +1,324 @@
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+'''
+Бэкенды инференса руки:
+ - LocalInference — Mediapipe Hands в том же процессе (как раньше), синхронно
+ - ProcessInference — Mediapipe Hands в отдельном процессе:
+    - кадры кладутся в кольцевой буфер в multiprocessing.shared_memory
+    - воркер всегда берёт самый свежий кадр, старые просто перезаписываются
+    - результат (landmarks) возвращается через слот в общей памяти под seqlock:
+      писатель делает счётчик нечётным на время записи, читатель повторяет
+      чтение, если счётчик изменился — без блокировок с обеих сторон
+    - новые параметры модели (set_options) воркер получает через pipe и сам
+      пересоздаёт Hands между кадрами: процесс и общая память остаются прежними
+
+Оба бэкенда возвращают HandResult с landmarks в виде numpy-массива (n, 21, 3),
+поэтому HandTracker не зависит от объектов Mediapipe.
+'''
+
+NUM_LANDMARKS = 21
+
+# Соединения landmarks (как mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),          # большой палец
+    (0, 5), (5, 6), (6, 7), (7, 8),          # указательный
+    (5, 9), (9, 10), (10, 11), (11, 12),     # средний
+    (9, 13), (13, 14), (14, 15), (15, 16),   # безымянный
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # мизинец и ладонь
+)
+
+HANDEDNESS_LABELS = ("Left", "Right")
+
+
+def create_hands(**hands_kwargs):
+    """Создаёт mp.solutions.hands.Hands (импорт Mediapipe — только здесь, он тяжёлый)."""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**hands_kwargs)
+
+
+class HandResult:
+    def __init__(self, landmarks, handedness, scores, frame_id=0, inference_time=0.0):
+        """
+        :param landmarks: np.ndarray (n, 21, 3) float32, нормализованные координаты
+        :param handedness: список "Left"/"Right" для каждой руки
+        :param scores: уверенность классификатора для каждой руки
+        :param frame_id: номер кадра, по которому получен результат
+        :param inference_time: время инференса (сек)
+        """
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.scores = scores
+        self.frame_id = frame_id
+        self.inference_time = inference_time
+
+    @property
+    def num_hands(self):
+        return len(self.landmarks)
+
+    @classmethod
+    def empty(cls, frame_id=0, inference_time=0.0):
+        return cls(np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32), [], [], frame_id, inference_time)
+
+    @classmethod
+    def from_mediapipe(cls, results, frame_id=0, inference_time=0.0):
+        """Переводит результат hands.process() в массивы."""
+        if not results.multi_hand_landmarks:
+            return cls.empty(frame_id, inference_time)
+
+        hands = results.multi_hand_landmarks
+        landmarks = np.empty((len(hands), NUM_LANDMARKS * 3), dtype=np.float32)
+        for i, hand_landmarks in enumerate(hands):
+            # Одна запись в массив на руку, а не на каждую из 21 точки
+            landmarks[i] = [value for lm in hand_landmarks.landmark for value in (lm.x, lm.y, lm.z)]
+        landmarks = landmarks.reshape(len(hands), NUM_LANDMARKS, 3)
+
+        handedness = []
+        scores = []
+        for classification in (results.multi_handedness or []):
+            handedness.append(classification.classification[0].label)
+            scores.append(classification.classification[0].score)
+        # Mediapipe может не вернуть handedness — считаем уверенность полной
+        while len(handedness) < len(hands):
+            handedness.append("Right")
+            scores.append(1.0)
+        return cls(landmarks, handedness, scores, frame_id, inference_time)
+
+
+def draw_hand(frame, landmarks, line_color=(255, 255, 255), point_color=(0, 0, 255)):
+    """Рисует скелет руки по нормализованным landmarks (21, 3) на BGR-кадре."""
+    h, w = frame.shape[:2]
+    points = [(int(x * w), int(y * h)) for x, y, _ in landmarks]
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(frame, points[a], points[b], line_color, 2)
+    for p in points:
+        cv2.circle(frame, p, 3, point_color, -1)
+
+
+class LocalInference:
+    def __init__(self, hands_factory=create_hands, **hands_kwargs):
+        self.hands = hands_factory(**hands_kwargs)
+        self.frame_id = 0
+
+    def submit(self, frame_rgb):
+        """Синхронный инференс. Возвращает HandResult по этому же кадру."""
+        self.frame_id += 1
+        start = time.perf_counter()
+        results = self.hands.process(frame_rgb)
+        elapsed = time.perf_counter() - start
+        return HandResult.from_mediapipe(results, self.frame_id, elapsed)
+
+    def close(self):
+        self.hands.close()
+
+
+# --- Раскладка управляющего блока (int64) ---
+# Номер последнего кадра и его слот — одно слово seq * slots + slot: если хранить их
+# отдельно, воркер может прочитать старый номер вместе с новым слотом
+_CTRL_LATEST = 0
+_CTRL_READING_SLOT = 1  # слот, который сейчас читает воркер (-1 — никакой)
+_CTRL_STOP = 2          # флаг остановки воркера
+_CTRL_SIZE = 3
+
+# --- Раскладка слота результата (float64) ---
+_RES_SEQ = 0            # seqlock: нечётный — идёт запись
+_RES_FRAME_ID = 1
+_RES_NUM_HANDS = 2
+_RES_INFERENCE_TIME = 3
+_RES_HEADER = 4
+_RES_PER_HAND = NUM_LANDMARKS * 3 + 2  # landmarks + handedness + score
+
+
+def _result_size(max_hands):
+    return _RES_HEADER + max_hands * _RES_PER_HAND
+
+
+def _write_result(slot, result, max_hands):
+    """Запись результата под seqlock (единственный писатель — воркер)."""
+    slot[_RES_SEQ] += 1  # нечётный: запись началась
+    n = min(result.num_hands, max_hands)
+    slot[_RES_FRAME_ID] = result.frame_id
+    slot[_RES_NUM_HANDS] = n
+    slot[_RES_INFERENCE_TIME] = result.inference_time
+    for i in range(n):
+        base = _RES_HEADER + i * _RES_PER_HAND
+        slot[base:base + NUM_LANDMARKS * 3] = result.landmarks[i].ravel()
+        slot[base + NUM_LANDMARKS * 3] = HANDEDNESS_LABELS.index(result.handedness[i]) \
+            if result.handedness[i] in HANDEDNESS_LABELS else 1
+        slot[base + NUM_LANDMARKS * 3 + 1] = result.scores[i]
+    slot[_RES_SEQ] += 1  # чётный: запись закончена
+
+
+def _read_result(slot):
+    """
+    Чтение под seqlock. Возвращает (seq, HandResult) или (seq, None),
+    если результата ещё нет.
+    """
+    while True:
+        seq = slot[_RES_SEQ]
+        if seq % 2:
+            continue
+        data = slot.copy()
+        if slot[_RES_SEQ] == seq:
+            break
+
+    if seq == 0:
+        return 0, None
+    n = int(data[_RES_NUM_HANDS])
+    landmarks = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+    handedness = []
+    scores = []
+    for i in range(n):
+        base = _RES_HEADER + i * _RES_PER_HAND
+        landmarks[i] = data[base:base + NUM_LANDMARKS * 3].reshape(NUM_LANDMARKS, 3)
+        handedness.append(HANDEDNESS_LABELS[int(data[base + NUM_LANDMARKS * 3])])
+        scores.append(float(data[base + NUM_LANDMARKS * 3 + 1]))
+    return seq, HandResult(landmarks, handedness, scores,
+                           int(data[_RES_FRAME_ID]), float(data[_RES_INFERENCE_TIME]))
+
+
+def _inference_worker(names, shape, slots, max_hands, hands_factory, hands_kwargs, frame_event, ready_event,
+                      options):
+    """Основной цикл процесса-воркера."""
+    frames_shm = shared_memory.SharedMemory(name=names[0])
+    ctrl_shm = shared_memory.SharedMemory(name=names[1])
+    result_shm = shared_memory.SharedMemory(name=names[2])
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=frames_shm.buf)
+    ctrl = np.ndarray((_CTRL_SIZE,), dtype=np.int64, buffer=ctrl_shm.buf)
+    result_slot = np.ndarray((_result_size(max_hands),), dtype=np.float64, buffer=result_shm.buf)
+
+    hands = hands_factory(**hands_kwargs)
+    ready_event.set()
+    last_seq = 0
+    try:
+        while not ctrl[_CTRL_STOP]:
+            if options.poll():
+                # Новые параметры: старая модель работает, пока не готова новая
+                new_hands = hands_factory(**options.recv())
+                hands.close()
+                hands = new_hands
+            if not frame_event.wait(0.1):
+                continue
+            frame_event.clear()
+
+            seq, slot = divmod(int(ctrl[_CTRL_LATEST]), slots)
+            if seq == last_seq:
+                continue
+            ctrl[_CTRL_READING_SLOT] = slot
+            # Если за это время записали ещё два кадра — слот мог быть перезаписан
+            if int(ctrl[_CTRL_LATEST]) // slots - seq >= 2:
+                ctrl[_CTRL_READING_SLOT] = -1
+                frame_event.set()
+                continue
+
+            start = time.perf_counter()
+            results = hands.process(frames[slot])
+            elapsed = time.perf_counter() - start
+            ctrl[_CTRL_READING_SLOT] = -1
+
+            _write_result(result_slot, HandResult.from_mediapipe(results, seq, elapsed), max_hands)
+            last_seq = seq
+    finally:
+        hands.close()
+        del frames, ctrl, result_slot
+        frames_shm.close()
+        ctrl_shm.close()
+        result_shm.close()
+
+
+class ProcessInference:
+    def __init__(self, frame_shape, max_num_hands=1, slots=3, hands_factory=create_hands,
+                 start_method="spawn", **hands_kwargs):
+        """
+        :param frame_shape: (h, w, 3) — размер RGB-кадров
+        :param slots: размер кольцевого буфера кадров (не меньше 3)
+        :param hands_factory: picklable-функция, создающая объект с методом process()
+        :param start_method: способ запуска процесса (spawn безопасен после pygame.init)
+        """
+        if slots < 3:
+            raise ValueError("Нужно минимум 3 слота: последний, читаемый воркером и записываемый")
+        self.frame_shape = tuple(frame_shape)
+        self.max_num_hands = max_num_hands
+        self.slots = slots
+        self.frame_id = 0
+        self._last_result_seq = 0
+        self._last_result = None
+
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._frames_shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+        self._ctrl_shm = shared_memory.SharedMemory(create=True, size=_CTRL_SIZE * 8)
+        self._result_shm = shared_memory.SharedMemory(create=True, size=_result_size(max_num_hands) * 8)
+        self._frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self._frames_shm.buf)
+        self._ctrl = np.ndarray((_CTRL_SIZE,), dtype=np.int64, buffer=self._ctrl_shm.buf)
+        self._result = np.ndarray((_result_size(max_num_hands),), dtype=np.float64, buffer=self._result_shm.buf)
+        self._ctrl[:] = 0
+        self._ctrl[_CTRL_READING_SLOT] = -1
+        self._result[:] = 0
+
+        hands_kwargs.setdefault("max_num_hands", max_num_hands)
+        context = multiprocessing.get_context(start_method)
+        self._frame_event = context.Event()
+        self._ready_event = context.Event()
+        options_reader, self._options = context.Pipe(duplex=False)
+        names = (self._frames_shm.name, self._ctrl_shm.name, self._result_shm.name)
+        self._process = context.Process(
+            target=_inference_worker,
+            args=(names, self.frame_shape, slots, max_num_hands, hands_factory, hands_kwargs,
+                  self._frame_event, self._ready_event, options_reader),
+            name="HandInference",
+            daemon=True,
+        )
+        self._process.start()
+
+    def wait_ready(self, timeout=None):
+        """Ждёт, пока воркер загрузит модель."""
+        return self._ready_event.wait(timeout)
+
+    def set_options(self, **hands_kwargs):
+        """Передаёт воркеру новые параметры Hands (max_num_hands менять нельзя — от него зависит общая память)."""
+        hands_kwargs.setdefault("max_num_hands", self.max_num_hands)
+        if hands_kwargs["max_num_hands"] != self.max_num_hands:
+            raise ValueError("max_num_hands воркера менять нельзя")
+        self._options.send(hands_kwargs)
+
+    def submit(self, frame_rgb):
+        """
+        Кладёт кадр в кольцевой буфер и возвращает самый свежий готовый результат
+        (по одному из предыдущих кадров) или None, если результатов ещё нет.
+        Никогда не ждёт воркер.
+        """
+        latest = int(self._ctrl[_CTRL_LATEST]) % self.slots
+        reading = int(self._ctrl[_CTRL_READING_SLOT])
+        slot = (latest + 1) % self.slots
+        while slot == latest or slot == reading:
+            slot = (slot + 1) % self.slots
+
+        np.copyto(self._frames[slot], frame_rgb)
+        self.frame_id += 1
+        self._ctrl[_CTRL_LATEST] = self.frame_id * self.slots + slot  # номер и слот — одной записью
+        self._frame_event.set()
+        return self.latest()
+
+    def latest(self):
+        """Последний результат воркера (или None)."""
+        if self._result[_RES_SEQ] != self._last_result_seq:
+            self._last_result_seq, self._last_result = _read_result(self._result)
+        return self._last_result
+
+    def close(self):
+        self._ctrl[_CTRL_STOP] = 1
+        self._frame_event.set()
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._options.close()
+        del self._frames, self._ctrl, self._result
+        for shm in (self._frames_shm, self._ctrl_shm, self._result_shm):
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,308 @@
+import math
+import random
+
+
+'''
+Фильтры ввода между HandTracker и ракеткой:
+ - update(t, coords) — новый замер ладони; t — время захвата кадра (time.perf_counter()),
+   повторные замеры с тем же t игнорируются
+ - predict(t) — позиция ладони на момент t (обычно — ожидаемое время показа кадра):
+   сглаженная позиция + скорость * (t - время последнего замера)
+ - между результатами инференса predict() продолжает плавно экстраполировать,
+   но не дальше max_extrapolation секунд
+
+Реализации:
+ - PassthroughFilter — как раньше: последний замер без сглаживания
+ - OneEuroFilter — 1€ filter (Casiez et al.): сглаживает сильно на медленных
+   движениях и слабо на быстрых, отдельно оценивает скорость
+ - KalmanFilter — фильтр Калмана с моделью постоянной скорости
+ - InterpolatingFilter — для редкого инференса (inference_rate): позиция на момент t
+   линейно интерполируется между двумя последними замерами, показ отстаёт на delay
+   (без delay — линейная экстраполяция по ним же)
+
+evaluate_filter() прогоняет фильтр по траектории с шумом и задержкой конвейера
+и считает ошибку и отставание — для тестов и подбора параметров.
+'''
+
+
+class InputFilter:
+    def __init__(self, max_extrapolation=0.1, velocity_deadzone=0.5, latency_smoothing=0.1):
+        """
+        :param max_extrapolation: на сколько секунд вперёд можно экстраполировать
+        :param velocity_deadzone: скорость (ед./сек), ниже которой экстраполяция плавно
+                                  гасится — чтобы шум неподвижной руки не раскачивал ракетку
+        :param latency_smoothing: коэффициент EMA для оценки задержки конвейера
+        """
+        self.max_extrapolation = max_extrapolation
+        self.velocity_deadzone = velocity_deadzone
+        self.latency_smoothing = latency_smoothing
+        self.latency = None  # оценка задержки: от захвата кадра до получения результата (сек)
+        self.reset()
+
+    def reset(self):
+        self.last_time = None
+
+    def update(self, t, coords, now=None):
+        """
+        :param t: время захвата кадра, по которому получены coords
+        :param coords: (x, y) нормализованные координаты ладони или None
+        :param now: текущее время (для оценки задержки), по умолчанию не учитывается
+        """
+        if coords is None:
+            return
+        if self.last_time is not None and t <= self.last_time:
+            return  # тот же результат повторно
+        if now is not None:
+            sample = now - t
+            if self.latency is None:
+                self.latency = sample
+            else:
+                self.latency += self.latency_smoothing * (sample - self.latency)
+        self._update(t, coords)
+        self.last_time = t
+
+    def predict(self, t):
+        """Позиция (x, y) на момент t или None, если замеров ещё не было."""
+        if self.last_time is None:
+            return None
+        horizon = max(0.0, min(t - self.last_time, self.max_extrapolation))
+        return self._predict(horizon)
+
+    def _extrapolate(self, position, velocity, horizon):
+        """position + velocity * horizon с мягкой мёртвой зоной по скорости."""
+        speed_sq = velocity[0] ** 2 + velocity[1] ** 2
+        gain = speed_sq / (speed_sq + self.velocity_deadzone ** 2) if speed_sq else 0.0
+        return (position[0] + velocity[0] * horizon * gain,
+                position[1] + velocity[1] * horizon * gain)
+
+    def _update(self, t, coords):
+        raise NotImplementedError
+
+    def _predict(self, horizon):
+        raise NotImplementedError
+
+
+class PassthroughFilter(InputFilter):
+    """Без фильтрации — последний замер (поведение до фильтров)."""
+
+    def reset(self):
+        super().reset()
+        self.position = None
+
+    def _update(self, t, coords):
+        self.position = (coords[0], coords[1])
+
+    def _predict(self, horizon):
+        return self.position
+
+
+def _smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter(InputFilter):
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=5.0, **kwargs):
+        """
+        :param min_cutoff: частота среза (Гц) на медленных движениях — меньше значит глаже
+        :param beta: насколько частота среза растёт со скоростью — больше значит меньше лаг
+        :param d_cutoff: частота среза для оценки скорости
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        super().__init__(**kwargs)
+
+    def reset(self):
+        super().reset()
+        self.position = None
+        self.velocity = (0.0, 0.0)
+
+    def _update(self, t, coords):
+        if self.position is None:
+            self.position = (coords[0], coords[1])
+            self.velocity = (0.0, 0.0)
+            return
+        dt = t - self.last_time
+        position = []
+        velocity = []
+        for axis in range(2):
+            raw_velocity = (coords[axis] - self.position[axis]) / dt
+            a_d = _smoothing_factor(dt, self.d_cutoff)
+            v = self.velocity[axis] + a_d * (raw_velocity - self.velocity[axis])
+            cutoff = self.min_cutoff + self.beta * abs(v)
+            a = _smoothing_factor(dt, cutoff)
+            position.append(self.position[axis] + a * (coords[axis] - self.position[axis]))
+            velocity.append(v)
+        self.position = tuple(position)
+        self.velocity = tuple(velocity)
+
+    def _predict(self, horizon):
+        return self._extrapolate(self.position, self.velocity, horizon)
+
+
+class KalmanFilter(InputFilter):
+    def __init__(self, process_noise=50.0, measurement_noise=1e-4, **kwargs):
+        """
+        Модель постоянной скорости, оси независимы.
+        :param process_noise: дисперсия ускорения руки (ед.²/с⁴)
+        :param measurement_noise: дисперсия шума замера (ед.²)
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        super().__init__(**kwargs)
+
+    def reset(self):
+        super().reset()
+        # Для каждой оси: состояние [позиция, скорость] и ковариация 2x2
+        self.state = None
+        self.covariance = None
+
+    def _update(self, t, coords):
+        if self.state is None:
+            self.state = [[coords[0], 0.0], [coords[1], 0.0]]
+            self.covariance = [[self.measurement_noise, 0.0, 0.0, 1.0] for _ in range(2)]
+            return
+        dt = t - self.last_time
+        q = self.process_noise
+        r = self.measurement_noise
+        for axis in range(2):
+            p, v = self.state[axis]
+            p00, p01, p10, p11 = self.covariance[axis]
+            # Прогноз
+            p = p + v * dt
+            p00, p01, p10, p11 = (p00 + dt * (p10 + p01) + dt * dt * p11 + q * dt ** 4 / 4,
+                                  p01 + dt * p11 + q * dt ** 3 / 2,
+                                  p10 + dt * p11 + q * dt ** 3 / 2,
+                                  p11 + q * dt * dt)
+            # Коррекция по замеру позиции
+            s = p00 + r
+            k0, k1 = p00 / s, p10 / s
+            innovation = coords[axis] - p
+            self.state[axis] = [p + k0 * innovation, v + k1 * innovation]
+            self.covariance[axis] = [(1 - k0) * p00, (1 - k0) * p01,
+                                     p10 - k1 * p00, p11 - k1 * p01]
+
+    def _predict(self, horizon):
+        position = (self.state[0][0], self.state[1][0])
+        velocity = (self.state[0][1], self.state[1][1])
+        return self._extrapolate(position, velocity, horizon)
+
+
+class InterpolatingFilter(InputFilter):
+    def __init__(self, delay=0.0, **kwargs):
+        """
+        :param delay: на сколько секунд показ отстаёт от времени кадра — при delay не
+                      меньше интервала замеров ракетка всегда между двумя настоящими
+                      замерами (гладко и точно, но с этой задержкой)
+        """
+        self.delay = delay
+        super().__init__(**kwargs)
+
+    def reset(self):
+        super().reset()
+        self.previous = None  # (t, (x, y)) предыдущего замера
+        self.position = None
+
+    def _update(self, t, coords):
+        if self.position is not None:
+            self.previous = (self.last_time, self.position)
+        self.position = (coords[0], coords[1])
+
+    def predict(self, t):
+        if self.last_time is None:
+            return None
+        t -= self.delay
+        if self.previous is None:
+            return self.position
+        t0, p0 = self.previous
+        # Между замерами — интерполяция, за последним — экстраполяция (не дальше max_extrapolation)
+        offset = max(t0 - self.last_time, min(t - self.last_time, self.max_extrapolation))
+        velocity = ((self.position[0] - p0[0]) / (self.last_time - t0),
+                    (self.position[1] - p0[1]) / (self.last_time - t0))
+        if offset <= 0:
+            return (self.position[0] + velocity[0] * offset, self.position[1] + velocity[1] * offset)
+        return self._extrapolate(self.position, velocity, offset)
+
+
+FILTERS = {
+    "none": PassthroughFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+    "interpolate": InterpolatingFilter,
+}
+
+
+def create_filter(name, **kwargs):
+    """Фильтр по имени: "none", "one_euro", "kalman" или "interpolate"."""
+    if name not in FILTERS:
+        raise ValueError(f"Неизвестный фильтр ввода: {name}")
+    return FILTERS[name](**kwargs)
+
+
+def sine_trajectory(amplitude=0.25, frequency=0.8):
+    """Синтетическая траектория ладони: качание влево-вправо вокруг центра."""
+    def trajectory(t):
+        return (0.5 + amplitude * math.sin(2 * math.pi * frequency * t),
+                0.6 + amplitude / 3 * math.sin(4 * math.pi * frequency * t))
+    return trajectory
+
+
+def evaluate_filter(input_filter, trajectory, duration=5.0, sample_rate=30.0, latency=0.05,
+                    display_rate=60.0, display_delay=1 / 60, noise=0.0, seed=0):
+    """
+    Прогоняет фильтр по траектории так, как это происходит в игре:
+    кадр захватывается в t_k, результат инференса доступен в t_k + latency,
+    кадр игры в момент t показывается в t + display_delay.
+
+    :param trajectory: функция t -> (x, y) — истинная позиция ладони
+    :param noise: СКО шума замера
+    :return: dict с rmse, max_error (по позиции на момент показа), lag (сек)
+             и jitter — СКО покадрового движения ракетки сверх истинного движения
+    """
+    rng = random.Random(seed)
+    input_filter.reset()
+    samples = []
+    t = 0.0
+    while t < duration:
+        x, y = trajectory(t)
+        samples.append((t, (x + rng.gauss(0, noise), y + rng.gauss(0, noise))))
+        t += 1.0 / sample_rate
+
+    outputs = []
+    next_sample = 0
+    frame = 0
+    while True:
+        now = frame / display_rate
+        if now >= duration:
+            break
+        while next_sample < len(samples) and samples[next_sample][0] + latency <= now:
+            sample_t, coords = samples[next_sample]
+            input_filter.update(sample_t, coords, now=now)
+            next_sample += 1
+        shown = now + display_delay
+        predicted = input_filter.predict(shown)
+        if predicted is not None and now > 2 * latency:
+            outputs.append((shown, predicted))
+        frame += 1
+
+    errors = [math.dist(p, trajectory(t)) for t, p in outputs]
+    rmse = math.sqrt(sum(e * e for e in errors) / len(errors))
+
+    # Отставание: сдвиг истинной траектории, при котором ошибка минимальна
+    best_lag, best_error = 0.0, float("inf")
+    for step in range(0, 31):
+        lag = step * 0.005
+        error = sum(math.dist(p, trajectory(t - lag)) ** 2 for t, p in outputs)
+        if error < best_error:
+            best_lag, best_error = lag, error
+
+    jitter_sq = []
+    for (t0, p0), (t1, p1) in zip(outputs, outputs[1:]):
+        true0, true1 = trajectory(t0), trajectory(t1)
+        dx = (p1[0] - p0[0]) - (true1[0] - true0[0])
+        dy = (p1[1] - p0[1]) - (true1[1] - true0[1])
+        jitter_sq.append(dx * dx + dy * dy)
+    jitter = math.sqrt(sum(jitter_sq) / len(jitter_sq))
+
+    return {"rmse": rmse, "max_error": max(errors), "lag": best_lag, "jitter": jitter}
@@ -0,0 +1,481 @@
+import argparse
+import asyncio
+import contextlib
+import copy
+import threading
+import time
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed, WebSocketException
+
+from engine import STEP_TIME, Engine, GameState, Inputs, apply_boss, apply_paddle
+from profiler import RingBuffer, percentile
+from protocol import (MSG_INPUT, MSG_PING, MSG_PONG, MSG_STATE, ROLE_BOTTOM, ROLE_TOP, ROLES,
+                      SnapshotHistory, apply_snapshot, decode_events, decode_hello, decode_input,
+                      decode_ping, decode_state, encode_events, encode_hello, encode_input,
+                      encode_ping, encode_state, quantize_coords, snapshot)
+
+
+'''
+Сетевая игра вдвоём (PvP) по websockets:
+ - PvpServer — авторитетный asyncio-сервер: сам считает Engine(pvp=True), клиенты
+   присылают только ввод. Подключившиеся по очереди игроки объединяются в комнаты
+   по двое: первый — ракетка внизу, второй — босс наверху.
+ - Снимки состояния рассылаются snapshot_rate раз в секунду, дельтой относительно
+   последнего снимка, который подтвердил клиент (protocol.encode_state). Отправляет
+   их писатель игрока (своя задача): комната кладёт снимок в слот и не ждёт сеть,
+   медленный клиент получает только самый свежий — остальные выбрасываются
+   (дельта и так считается от подтверждённого снимка, а не от прошлого отправленного)
+ - PvpClient — клиент: свою ракетку (или босса) двигает сразу, не дожидаясь сервера
+   (предсказание), а при каждом снимке берёт состояние сервера и заново применяет
+   вводы, которые сервер ещё не обработал (согласование).
+ - NetClientThread — PvpClient в фоновом потоке для синхронного игрового цикла game.py.
+Сжатие websockets (permessage-deflate) выключено: сообщения и так по 14–60 байт.
+
+Запуск сервера: python net.py --host 0.0.0.0 --port 8765
+'''
+
+DEFAULT_PORT = 8765
+
+
+class ConnectionStats:
+    def __init__(self):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.messages_received = 0
+
+    def sent(self, data):
+        self.bytes_sent += len(data)
+        self.messages_sent += 1
+
+    def received(self, data):
+        self.bytes_received += len(data)
+        self.messages_received += 1
+
+    def as_dict(self):
+        return {
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "messages_sent": self.messages_sent,
+            "messages_received": self.messages_received,
+        }
+
+
+class _Player:
+    def __init__(self, websocket, role):
+        self.websocket = websocket
+        self.role = role
+        self.coords = None  # последний ввод
+        self.last_input = 0  # номер последнего полученного ввода
+        self.applied_input = 0  # номер последнего ввода, применённого к состоянию
+        self.acked = 0  # последний снимок, подтверждённый клиентом
+        self.outbox = None  # снимок, ещё не отданный писателю (только самый свежий)
+        self.ready = asyncio.Event()
+        self.closing = False
+        self.dropped = 0  # снимков вытеснено более свежими
+
+    def push(self, data):
+        if self.outbox is not None:
+            self.dropped += 1
+        self.outbox = data
+        self.ready.set()
+
+    def close(self):
+        """Закрыть соединение после отправки последнего снимка."""
+        self.closing = True
+        self.ready.set()
+
+    async def writer(self, stats):
+        websocket = self.websocket
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            data, self.outbox = self.outbox, None
+            if data is not None:
+                try:
+                    await websocket.send(data)
+                except ConnectionClosed:
+                    return
+                stats.sent(data)
+            if self.closing:
+                await websocket.close()
+                return
+
+
+class Room:
+    def __init__(self, server, seed=None):
+        self.server = server
+        self.engine = Engine(seed=seed, pvp=True)
+        self.players = {}
+        self.history = SnapshotHistory()
+        self.seq = 0
+        self.events = 0  # события с прошлого снимка (битовая маска)
+        self.task = None
+        self.finished = asyncio.Event()
+
+    @property
+    def full(self):
+        return len(self.players) == 2
+
+    def on_input(self, player, data):
+        seq, ack, coords = decode_input(data)
+        if seq <= player.last_input:
+            return  # устаревший ввод
+        player.last_input = seq
+        player.acked = max(player.acked, ack)
+        if coords is not None:
+            player.coords = coords
+
+    def step(self):
+        bottom = self.players.get(ROLE_BOTTOM)
+        top = self.players.get(ROLE_TOP)
+        inputs = Inputs(bottom.coords if bottom else None,
+                        top.coords[0] if top and top.coords else None)
+        for player in self.players.values():
+            player.applied_input = player.last_input
+        self.events |= encode_events(self.engine.step(inputs))
+
+    def broadcast(self):
+        """Снимок всем игрокам — в их слоты, отправляют писатели (комната не ждёт сеть)."""
+        self.seq += 1
+        values = snapshot(self.engine.state)
+        self.history.add(self.seq, values)
+        for player in list(self.players.values()):
+            baseline = self.history.get(player.acked)
+            data = encode_state(self.seq, values, player.acked, baseline, player.applied_input,
+                                self.events)
+            player.push(data)
+        self.events = 0
+
+    async def run(self):
+        """Цикл комнаты: tick_rate шагов в секунду, снимок каждые send_every шагов."""
+        server = self.server
+        self.engine.reset()
+        dt = 1 / server.tick_rate
+        next_time = time.perf_counter()
+        ticks = 0
+        while self.full:
+            self.step()
+            ticks += 1
+            if ticks % server.send_every == 0:
+                self.broadcast()
+            if self.engine.state.winner is not None:
+                if not server.rematch:
+                    self.broadcast()
+                    break
+                self.engine.reset()
+            next_time += dt
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.25:
+                next_time = time.perf_counter()  # сильно отстали — не догоняем рывком
+            else:
+                await asyncio.sleep(0)
+        for player in list(self.players.values()):
+            player.close()
+        self.finished.set()
+
+
+class PvpServer:
+    def __init__(self, host="localhost", port=DEFAULT_PORT, snapshot_rate=30, seed=None, rematch=False):
+        """
+        Частота шагов — 1 / engine.STEP_TIME (движок считает скорости в шагах по 1/60 сек).
+        :param snapshot_rate: снимков состояния в секунду (делитель частоты шагов)
+        :param rematch: по окончании партии сразу начинать новую (иначе комната закрывается)
+        """
+        tick_rate = round(1 / STEP_TIME)
+        if tick_rate % snapshot_rate:
+            raise ValueError(f"snapshot_rate должен делить частоту шагов ({tick_rate})")
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.snapshot_rate = snapshot_rate
+        self.send_every = tick_rate // snapshot_rate
+        self.seed = seed
+        self.rematch = rematch
+        self.stats = ConnectionStats()
+        self.rooms = []
+        self._waiting = None
+        self._server = None
+
+    async def start(self):
+        self._server = await serve(self.handler, self.host, self.port, compression=None)
+        self.port = self._server.sockets[0].getsockname()[1]  # port=0 — выбран системой
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for room in self.rooms:
+            if room.task is not None:
+                room.task.cancel()
+
+    async def serve_forever(self):
+        await self.start()
+        await self._server.serve_forever()
+
+    def _join(self, websocket):
+        room = self._waiting
+        if room is None:
+            room = self._waiting = Room(self, self.seed)
+            self.rooms.append(room)
+        role = ROLE_BOTTOM if ROLE_BOTTOM not in room.players else ROLE_TOP
+        player = room.players[role] = _Player(websocket, role)
+        if room.full:
+            self._waiting = None
+        return room, player
+
+    async def handler(self, websocket):
+        room, player = self._join(websocket)
+        stats = self.stats
+        hello = encode_hello(player.role, self.snapshot_rate)
+        await websocket.send(hello)
+        stats.sent(hello)
+        writer = asyncio.create_task(player.writer(stats))
+        if room.full and room.task is None:
+            # Оба игрока получили HELLO — снимки пойдут после него
+            room.task = asyncio.create_task(room.run())
+        try:
+            async for data in websocket:
+                stats.received(data)
+                if data[0] == MSG_INPUT:
+                    room.on_input(player, data)
+                elif data[0] == MSG_PING:
+                    pong = encode_ping(MSG_PONG, decode_ping(data))
+                    await websocket.send(pong)
+                    stats.sent(pong)
+        except ConnectionClosed:
+            pass
+        finally:
+            writer.cancel()
+            room.players.pop(player.role, None)
+            if room is self._waiting and not room.players:
+                self._waiting = None
+
+
+class PvpClient:
+    def __init__(self, url, history=64):
+        self.url = url
+        self.role = None
+        self.snapshot_rate = None
+        self.state = GameState()
+        self.history = SnapshotHistory(history)
+        self.stats = ConnectionStats()
+        self.rtt = RingBuffer(600)  # сек
+        self.seq = 0  # номер последнего отправленного ввода
+        self.acked = 0  # номер последнего полученного снимка
+        self.pending = []  # [(номер ввода, координаты)] — ещё не обработаны сервером
+        self.events = []
+        self.last_state_time = None
+        self.corrections = 0  # снимков, где сервер разошёлся с предсказанием
+        self.websocket = None
+        self.closed = False
+
+    async def connect(self):
+        self.websocket = await connect(self.url, compression=None)
+        data = await self.websocket.recv()
+        self.stats.received(data)
+        role, self.snapshot_rate = decode_hello(data)
+        self.role = ROLES[role]
+        return self
+
+    async def close(self):
+        self.closed = True
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    def _predict(self, coords):
+        """Применяет свой ввод к локальному состоянию сразу, не дожидаясь сервера."""
+        if self.role == "bottom":
+            apply_paddle(self.state, coords)
+        elif coords is not None:
+            apply_boss(self.state, coords[0])
+
+    def _own_position(self):
+        return (self.state.paddle_pos[0], self.state.paddle_pos[1]) if self.role == "bottom" \
+            else (self.state.boss_x, 0)
+
+    def input_message(self, coords):
+        """Новый ввод: применяется к локальному состоянию и кодируется для отправки."""
+        self.seq += 1
+        coords = quantize_coords(coords)
+        self.pending.append((self.seq, coords))
+        self._predict(coords)
+        data = encode_input(self.seq, self.acked, coords)
+        self.stats.sent(data)
+        return data
+
+    async def send_input(self, coords):
+        await self.websocket.send(self.input_message(coords))
+
+    async def ping(self):
+        data = encode_ping(MSG_PING, time.perf_counter())
+        await self.websocket.send(data)
+        self.stats.sent(data)
+
+    def on_state(self, data):
+        seq, values, last_input, events = decode_state(data, self.history)
+        if seq <= self.acked:
+            return  # снимок старее уже применённого
+        self.history.add(seq, values)
+        self.acked = seq
+        predicted = self._own_position()
+        apply_snapshot(self.state, values)
+        # Согласование: вводы после last_input сервер ещё не видел — применяем их поверх
+        self.pending = [(n, coords) for n, coords in self.pending if n > last_input]
+        for _, coords in self.pending:
+            self._predict(coords)
+        position = self._own_position()
+        # boss_x приходит как float32 — расхождение меньше пикселя не считается
+        if abs(position[0] - predicted[0]) >= 1 or abs(position[1] - predicted[1]) >= 1:
+            self.corrections += 1
+        self.events.extend(decode_events(events))
+        self.last_state_time = time.perf_counter()
+
+    def on_message(self, data):
+        self.stats.received(data)
+        if data[0] == MSG_STATE:
+            self.on_state(data)
+        elif data[0] == MSG_PONG:
+            self.rtt.add(time.perf_counter() - decode_ping(data))
+
+    async def receive(self, lock=None):
+        """
+        Принимает сообщения сервера до закрытия соединения.
+        :param lock: блокировка, под которой применяется каждое сообщение
+        """
+        lock = lock if lock is not None else contextlib.nullcontext()
+        try:
+            async for data in self.websocket:
+                with lock:
+                    self.on_message(data)
+        except ConnectionClosed:
+            pass
+        self.closed = True
+
+    def drain_events(self):
+        """События (звуки) из полученных снимков с прошлого вызова."""
+        events, self.events = self.events, []
+        return events
+
+    def rtt_stats(self):
+        """{count, p50_ms, p95_ms, p99_ms} по последним замерам RTT"""
+        values = sorted(self.rtt.samples())
+        if not values:
+            return {"count": 0}
+        return {
+            "count": self.rtt.count,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+
+class NetClientThread:
+    def __init__(self, url, ping_interval=1.0):
+        """
+        PvpClient в фоновом потоке со своим event loop:
+            client = NetClientThread("ws://host:8765").start()
+            client.send_input(coords); state = client.latest()
+        """
+        self.client = PvpClient(url)
+        self.ping_interval = ping_interval
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self._connected = threading.Event()
+        self.error = None
+
+    def start(self, timeout=5.0):
+        self.thread.start()
+        if not self._connected.wait(timeout):
+            raise TimeoutError(f"Нет ответа от сервера {self.client.url}")
+        if self.error is not None:
+            raise self.error
+        return self
+
+    @property
+    def role(self):
+        return self.client.role
+
+    @property
+    def closed(self):
+        return self.client.closed
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._main())
+
+    async def _main(self):
+        try:
+            await self.client.connect()
+        except (OSError, WebSocketException) as e:
+            self.error = e
+            self.client.closed = True
+            self._connected.set()
+            return
+        self._connected.set()
+        pinger = asyncio.create_task(self._pinger())
+        # Снимки применяются под блокировкой: игровой цикл не увидит половину снимка
+        await self.client.receive(self.lock)
+        pinger.cancel()
+
+    async def _pinger(self):
+        while not self.client.closed:
+            try:
+                await self.client.ping()
+            except ConnectionClosed:
+                return
+            await asyncio.sleep(self.ping_interval)
+
+    async def _send(self, data):
+        try:
+            await self.client.websocket.send(data)
+        except ConnectionClosed:
+            pass
+
+    def send_input(self, coords):
+        if not self.client.closed:
+            with self.lock:
+                data = self.client.input_message(coords)
+            asyncio.run_coroutine_threadsafe(self._send(data), self.loop)
+
+    def latest(self):
+        """Копия текущего состояния (с предсказанием своего ввода)."""
+        with self.lock:
+            return copy.deepcopy(self.client.state)
+
+    def drain_events(self):
+        with self.lock:
+            return self.client.drain_events()
+
+    def alpha(self, now=None):
+        """Доля интервала между снимками, прошедшая с последнего (для интерполяции)."""
+        if self.client.last_state_time is None:
+            return 1.0
+        now = time.perf_counter() if now is None else now
+        return min(1.0, (now - self.client.last_state_time) * self.client.snapshot_rate)
+
+    def close(self):
+        if self.thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self.client.close(), self.loop)
+            self.thread.join(timeout=2.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер игры вдвоём")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--snapshot-rate", type=int, default=30)
+    parser.add_argument("--rematch", action="store_true", help="новая партия сразу после окончания")
+    args = parser.parse_args(argv)
+    server = PvpServer(args.host, args.port, snapshot_rate=args.snapshot_rate, rematch=args.rematch)
+    print(f"PvP сервер: ws://{args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 import math
 import random
+import struct
+
+import numpy as np
+
+from collision import sweep_box
 
 
 '''
@@ -16,20 +21,39 @@ import random
   - Столкновения:
     - Сетка обрабатывается как зона в середине стола с ограничением по высоте
     - Удары о стол/стенку теряют часть энергии (bounce коэффициент)
+    - continuous=True: столкновения ищутся по всему отрезку движения за шаг
+      (swept, с моментом касания), мяч не пролетает сквозь сетку и стенки
+      даже на огромной скорости или большом dt
 
   - Старт и сброс:
     При сбросе мяч получает случайный начальный удар в сторону стенки
+
+  - BallPhysicsBatch:
+    Та же физика для N мячей сразу: состояния в непрерывных numpy-массивах,
+    столкновения — маскированными векторными операциями (для Монте-Карло и подбора ИИ)
 '''
 
+# Упакованное состояние мяча: x, y, z, vx, vy, vz (double)
+STATE_STRUCT = struct.Struct("<6d")
 
 
 class BallPhysics:
-    def __init__(self, table_width, table_height, net_height):
+    # Максимум касаний за один шаг в continuous-режиме
+    MAX_CONTACTS = 8
+    # Без __dict__: объект компактнее, доступ к полям в update() быстрее
+    __slots__ = ("rng", "continuous", "table_width", "table_height", "net_height",
+                 "x", "y", "z", "vx", "vy", "vz", "gravity", "drag", "bounce")
+
+    def __init__(self, table_width, table_height, net_height, seed=None, continuous=False):
         """
         :param table_width: ширина стола (в пикселях/условных единицах)
         :param table_height: длина стола (от игрока до стенки)
         :param net_height: высота сетки (для проверки удара)
+        :param seed: зерно для случайного удара при сбросе (для детерминированной симуляции)
+        :param continuous: непрерывные (swept) столкновения вместо проверки конечной точки
         """
+        self.rng = random.Random(seed)
+        self.continuous = continuous
         self.table_width = table_width
         self.table_height = table_height
         self.net_height = net_height
@@ -49,30 +73,108 @@ class BallPhysics:
         self.z = 0  # "высота" мяча (псевдо-3D)
         
         # Начальная скорость (случайный легкий удар к стенке)
-        self.vx = random.uniform(-2, 2)
-        self.vy = -random.uniform(8, 10)  # в сторону стены (отрицательное значение)
-        self.vz = random.uniform(5, 7)
+        self.vx = self.rng.uniform(-2, 2)
+        self.vy = -self.rng.uniform(8, 10)  # в сторону стены (отрицательное значение)
+        self.vz = self.rng.uniform(5, 7)
     
     def update(self, dt):
         """
         Обновление позиции мяча с учётом физики
-        :param dt: время с прошлого обновления (для плавности)
+        :param dt: время с прошлого обновления в кадрах по 1/60 сек
+        :return: True, если мяч ударился в сетку (для звукового эффекта)
         """
         # Применяем гравитацию к вертикальной скорости
-        self.vz -= self.gravity
+        self.vz -= self.gravity * dt
         
-        # Движение мяча
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        self.z += self.vz * dt
+        if self.continuous:
+            # Движение со столкновениями по всему отрезку пути
+            net_hit = self._move_swept(dt)
+        else:
+            # Движение мяча
+            self.x += self.vx * dt
+            self.y += self.vy * dt
+            self.z += self.vz * dt
         
-        # Применяем сопротивление воздуха
-        self.vx *= self.drag
-        self.vy *= self.drag
-        self.vz *= self.drag
+        # Применяем сопротивление воздуха (за время dt)
+        drag = self.drag ** dt
+        self.vx *= drag
+        self.vy *= drag
+        self.vz *= drag
         
+        if self.continuous:
+            return net_hit
         # Проверка столкновений
-        self._check_collisions()
+        return self._check_collisions()
+
+    def _surfaces(self):
+        """
+        Поверхности для swept-столкновений: (имя, min, max, ось, направление "внутрь").
+        Стены и стол — полупространства, сетка — бокс в середине стола.
+        """
+        inf = math.inf
+        net_pos = self.table_height * 0.5
+        net_width = self.table_width * 0.1
+        return (
+            ("side", (-inf, -inf, -inf), (0, inf, inf), 0, -1),
+            ("side", (self.table_width, -inf, -inf), (inf, inf, inf), 0, 1),
+            ("wall", (-inf, -inf, -inf), (inf, 0, inf), 1, -1),
+            ("table", (-inf, -inf, -inf), (inf, inf, 0), 2, -1),
+            ("net", (-inf, net_pos - net_width, -inf), (inf, net_pos + net_width, self.net_height), 1, 0),
+        )
+
+    def _move_swept(self, dt):
+        """Движение за dt с поиском первого касания и отскоком в точке касания"""
+        net_hit = False
+        remaining = 1.0
+        for _ in range(self.MAX_CONTACTS):
+            start = (self.x, self.y, self.z)
+            velocity = (self.vx, self.vy, self.vz)
+            delta = tuple(v * dt * remaining for v in velocity)
+
+            first = None
+            for name, box_min, box_max, axis, inward in self._surfaces():
+                hit = sweep_box(start, delta, box_min, box_max)
+                if hit is None:
+                    continue
+                if hit[1] == -1:
+                    # Уже внутри: сетку покидаем, от стен отскакиваем, только если летим вглубь
+                    if inward == 0 or velocity[axis] * inward <= 0:
+                        continue
+                if first is None or hit[0] < first[0]:
+                    first = (hit[0], name)
+
+            if first is None:
+                self.x, self.y, self.z = (p + d for p, d in zip(start, delta))
+                break
+
+            t, name = first
+            self.x, self.y, self.z = (p + d * t for p, d in zip(start, delta))
+            remaining *= 1 - t
+            if self._respond(name):
+                net_hit = True
+        return net_hit
+
+    def _respond(self, name):
+        """Отскок от поверхности (те же правила, что в _check_collisions)"""
+        if name == "side":
+            self.vx = -self.vx * self.bounce
+            self.x = max(0, min(self.table_width, self.x))
+        elif name == "net":
+            self.vx *= -0.5
+            self.vy *= -0.5
+            self.vz *= 0.3
+            return True
+        elif name == "wall":
+            self.vy = -self.vy * self.bounce
+            self.y = 0
+            self.vz *= 0.8
+        elif name == "table":
+            self.z = 0
+            bounce_power = abs(self.vz) * (1 + 0.3 * abs(self.vx)/10)
+            self.vz = bounce_power * self.bounce
+            if abs(self.vz) < 0.1:
+                self.vz = 0
+        return False
         
     def _check_collisions(self):
         """Обработка всех столкновений (стол, сетка, стенка)"""
@@ -143,3 +245,151 @@ class BallPhysics:
     
     def set_state(self, state):
         self.x, self.y, self.z, self.vx, self.vy, self.vz = state
+
+    def write_state(self, buf, offset=0):
+        """
+        Пакует состояние в буфер (bytearray) с байтового смещения offset —
+        без кортежа и float-объектов на каждый снимок (STATE_STRUCT.size байт).
+        """
+        STATE_STRUCT.pack_into(buf, offset, self.x, self.y, self.z, self.vx, self.vy, self.vz)
+
+    def read_state(self, buf, offset=0):
+        """Восстанавливает состояние, записанное write_state()."""
+        self.x, self.y, self.z, self.vx, self.vy, self.vz = STATE_STRUCT.unpack_from(buf, offset)
+
+
+
+class BallPhysicsBatch:
+    def __init__(self, n, table_width, table_height, net_height, seed=None):
+        """
+        N мячей с той же физикой, что и BallPhysics.
+        :param n: количество мячей
+        :param seed: зерно генератора для reset_ball()
+        """
+        self.n = n
+        self.table_width = table_width
+        self.table_height = table_height
+        self.net_height = net_height
+        self.rng = np.random.default_rng(seed)
+
+        # Позиции и скорости: строки (x, y, z) и (vx, vy, vz), каждая непрерывна в памяти
+        self.pos = np.zeros((3, n), dtype=np.float64)
+        self.vel = np.zeros((3, n), dtype=np.float64)
+        self.x, self.y, self.z = self.pos
+        self.vx, self.vy, self.vz = self.vel
+        # Временные буферы для масок (чтобы не выделять память на каждом шаге)
+        self._mask = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=np.float64)
+        self._step = np.empty((3, n), dtype=np.float64)
+
+        self.reset_ball()
+
+        # Физические параметры (как у BallPhysics)
+        self.gravity = 0.2
+        self.drag = 0.99
+        self.bounce = 0.7
+
+    @classmethod
+    def from_balls(cls, balls):
+        """Собирает батч из списка BallPhysics (параметры стола и физики — от первого)."""
+        first = balls[0]
+        batch = cls(len(balls), first.table_width, first.table_height, first.net_height)
+        batch.gravity, batch.drag, batch.bounce = first.gravity, first.drag, first.bounce
+        for i, ball in enumerate(balls):
+            batch.set_state(i, ball.get_state())
+        return batch
+
+    def reset_ball(self, mask=None):
+        """Сброс мячей (всех или по маске) в начальное положение со случайным ударом"""
+        idx = slice(None) if mask is None else mask
+        count = self.n if mask is None else int(np.count_nonzero(mask))
+        self.x[idx] = self.table_width / 2
+        self.y[idx] = self.table_height - 50
+        self.z[idx] = 0
+        self.vx[idx] = self.rng.uniform(-2, 2, count)
+        self.vy[idx] = -self.rng.uniform(8, 10, count)
+        self.vz[idx] = self.rng.uniform(5, 7, count)
+
+    def update(self, dt):
+        """
+        Шаг всех мячей (повторяет BallPhysics.update)
+        :return: маска мячей, ударившихся в сетку на этом шаге
+        """
+        self.vz -= self.gravity * dt
+
+        np.multiply(self.vel, dt, out=self._step)
+        self.pos += self._step
+
+        self.vel *= self.drag ** dt
+
+        return self._check_collisions()
+
+    def _check_collisions(self):
+        """Векторная версия BallPhysics._check_collisions"""
+        x, y, z = self.x, self.y, self.z
+        vx, vy, vz = self.vx, self.vy, self.vz
+        side = self._mask
+
+        # Левая/правая граница стола
+        np.less_equal(x, 0, out=side)
+        side |= x >= self.table_width
+        np.multiply(vx, -self.bounce, out=vx, where=side)
+        np.clip(x, 0, self.table_width, out=x)
+
+        # Сетка: такие мячи дальше не проверяются (в BallPhysics — ранний return)
+        net_pos = self.table_height * 0.5
+        net_width = self.table_width * 0.1
+        net = np.abs(y - net_pos) < net_width
+        net &= z < self.net_height
+        net &= (vx != 0) | (vy != 0)
+        np.multiply(vx, -0.5, out=vx, where=net)
+        np.multiply(vy, -0.5, out=vy, where=net)
+        np.multiply(vz, 0.3, out=vz, where=net)
+        rest = ~net
+
+        # Стенка (дальний край)
+        wall = y <= 0
+        wall &= rest
+        np.multiply(vy, -self.bounce, out=vy, where=wall)
+        y[wall] = 0
+        np.multiply(vz, 0.8, out=vz, where=wall)
+
+        # Стол
+        floor = z <= 0
+        floor &= rest
+        z[floor] = 0
+        bounce_power = self._tmp
+        np.abs(vx, out=bounce_power)
+        bounce_power *= 0.3
+        bounce_power /= 10
+        bounce_power += 1
+        bounce_power *= np.abs(vz)
+        bounce_power *= self.bounce
+        np.copyto(vz, bounce_power, where=floor)
+        floor &= np.abs(vz) < 0.1
+        vz[floor] = 0
+
+        return net
+
+    def is_out(self):
+        """Маска мячей, улетевших за пределы игровой зоны"""
+        return ((self.y > self.table_height * 1.2) |
+                (np.abs(self.x - self.table_width / 2) > self.table_width * 0.6) |
+                (self.z > 50))
+
+    def get_positions(self):
+        """Позиции мячей, массив (N, 3)"""
+        return self.pos.T
+
+    def get_screen_positions(self, perspective_factor=0.5):
+        """2D-координаты для отрисовки, массив (N, 2) — как BallPhysics.get_screen_position"""
+        screen_y = self.table_height - self.y - self.z * perspective_factor
+        return np.stack((self.x, screen_y), axis=1)
+
+    def get_state(self, i):
+        return (float(self.x[i]), float(self.y[i]), float(self.z[i]),
+                float(self.vx[i]), float(self.vy[i]), float(self.vz[i]))
+
+    def set_state(self, i, state):
+        self.pos[:, i] = state[:3]
+        self.vel[:, i] = state[3:]
@@ -0,0 +1,248 @@
+import itertools
+import math
+
+import numpy as np
+
+from swing import LandmarkHistory
+
+
+'''
+Игра вдвоём перед одной камерой: Mediapipe находит до двух рук за один инференс
+(max_num_hands=2), PlayerAssigner закрепляет руки за игроками:
+ - игроки стоят рядом, каждому отведена своя полоса кадра по x ("left" — левая половина,
+   "right" — правая); новая рука достаётся свободному игроку своей полосы
+ - дальше рука ведётся по позиции: прогноз по скорости на время нового кадра, руки
+   раскладываются по игрокам с минимальной суммарной ошибкой прогноза (рук не больше
+   двух — перебор всех вариантов), поэтому при скрещивании рук игроки не меняются местами
+ - handedness Mediapipe ("Left"/"Right") — дополнительная подсказка: у игрока запоминается
+   метка его руки, несовпадение немного штрафуется (метка бывает неустойчивой)
+ - рука, которая скачком оказалась дальше max_jump от прогноза, игроку не отдаётся;
+   пропавший игрок держит место hold_time секунд, потом считается потерянным
+AssignmentStats считает пропуски, потери, скачки и конфликты handedness — по ним
+видно качество на записанных сессиях (sources.py replay --players).
+'''
+
+PLAYERS = ("left", "right")
+
+
+class AssignmentStats:
+    """Счётчики закрепления рук за игроками"""
+
+    def __init__(self):
+        self.frames = 0           # результатов инференса
+        self.hands = 0            # найдено рук
+        self.present = 0          # (игрок, кадр): рука игрока найдена
+        self.dropouts = 0         # (игрок, кадр): игрок ведётся, но руки нет
+        self.acquired = 0         # новых рук закреплено за игроками
+        self.lost = 0             # игрок без руки дольше hold_time
+        self.rejected = 0         # рук, не отданных никому (скачок, чужая полоса, лишняя рука)
+        self.jumps = 0            # рука дальше jump_distance от прогноза (возможная подмена)
+        self.label_conflicts = 0  # handedness руки не совпала с запомненной у игрока
+
+    @property
+    def dropout_rate(self):
+        tracked = self.present + self.dropouts
+        return self.dropouts / tracked if tracked else 0.0
+
+    def as_dict(self):
+        return {
+            "frames": self.frames,
+            "hands": self.hands,
+            "present": self.present,
+            "dropouts": self.dropouts,
+            "dropout_rate": self.dropout_rate,
+            "acquired": self.acquired,
+            "lost": self.lost,
+            "rejected": self.rejected,
+            "jumps": self.jumps,
+            "label_conflicts": self.label_conflicts,
+        }
+
+
+class PlayerSlot:
+    def __init__(self, name, index, count):
+        self.name = name
+        self.index = index
+        self.strip = (index / count, (index + 1) / count)  # полоса кадра по x для новой руки
+        self.history = LandmarkHistory()  # landmarks руки игрока — для взмаха
+        self.reset()
+
+    def reset(self):
+        self.track_id = None  # номер руки (меняется, только если рука потеряна и найдена заново)
+        self.position = None  # (x, y) ладони в последнем результате, где рука была
+        self.velocity = (0.0, 0.0)  # ед./сек
+        self.last_time = None  # время захвата кадра с рукой
+        self.handedness = None
+        self.landmarks = None  # (21, 3) руки игрока в последнем результате или None
+        self.history.clear()
+        self._label_mismatch = 0
+
+    @property
+    def active(self):
+        return self.track_id is not None
+
+    @property
+    def coords(self):
+        """(x, y) ладони игрока в последнем результате или None (руки нет)."""
+        if self.landmarks is None:
+            return None
+        return self.position
+
+    def predict(self, t):
+        if self.last_time is None:
+            return self.position
+        dt = min(max(t - self.last_time, 0.0), 0.2)
+        return (self.position[0] + self.velocity[0] * dt, self.position[1] + self.velocity[1] * dt)
+
+
+class PlayerAssigner:
+    def __init__(self, players=PLAYERS, hold_time=0.5, max_jump=0.25, jump_distance=0.1,
+                 label_weight=0.05, min_label_score=0.8, relabel_after=5):
+        """
+        :param players: имена игроков слева направо (полосы кадра по x)
+        :param hold_time: сколько секунд пропавший игрок держит место за своей рукой
+        :param max_jump: рука дальше от прогноза игрока (нормализованные координаты) ему не отдаётся
+        :param jump_distance: с какого расстояния до прогноза считать скачок (AssignmentStats.jumps)
+        :param label_weight: штраф за несовпадение handedness (умножается на уверенность метки)
+        :param min_label_score: метки с меньшей уверенностью не запоминаются
+        :param relabel_after: после стольких несовпадений подряд метка игрока меняется
+        """
+        self.slots = [PlayerSlot(name, i, len(players)) for i, name in enumerate(players)]
+        self.hold_time = hold_time
+        self.max_jump = max_jump
+        self.jump_distance = jump_distance
+        self.label_weight = label_weight
+        self.min_label_score = min_label_score
+        self.relabel_after = relabel_after
+        self.stats = AssignmentStats()
+        self._next_id = 0
+
+    def reset(self):
+        for slot in self.slots:
+            slot.reset()
+
+    def slot(self, name):
+        return next(slot for slot in self.slots if slot.name == name)
+
+    @property
+    def coords(self):
+        """{игрок: (x, y) или None} по последнему результату."""
+        return {slot.name: slot.coords for slot in self.slots}
+
+    def _costs(self, palms, result, capture_time):
+        """Матрица (рук, игроков): ошибка прогноза + штраф handedness; inf — руку отдать нельзя."""
+        costs = np.full((len(palms), len(self.slots)), np.inf)
+        for j, slot in enumerate(self.slots):
+            if slot.active:
+                predicted = slot.predict(capture_time)
+                distance = np.hypot(palms[:, 0] - predicted[0], palms[:, 1] - predicted[1])
+                for i in range(len(palms)):
+                    if distance[i] > self.max_jump:
+                        continue
+                    penalty = 0.0
+                    if slot.handedness is not None and result.handedness[i] != slot.handedness:
+                        penalty = self.label_weight * result.scores[i]
+                    costs[i, j] = distance[i] + penalty
+            else:
+                # Новая рука — только в полосе игрока; дороже любой ведомой руки
+                left, right = slot.strip
+                inside = (palms[:, 0] >= left) & (palms[:, 0] < right)
+                costs[inside, j] = self.max_jump + np.abs(palms[inside, 0] - (left + right) / 2)
+        return costs
+
+    def _best_assignment(self, costs):
+        """Для каждой руки — номер игрока или -1; минимум суммы (лишняя рука стоит как max_jump * 3)."""
+        hands, players = costs.shape
+        costs = costs.tolist()  # индексация списков быстрее, чем скаляров numpy
+        unassigned = self.max_jump * 3
+        best, best_total = None, math.inf
+        for combo in itertools.product(range(-1, players), repeat=hands):
+            taken = [j for j in combo if j >= 0]
+            if len(taken) != len(set(taken)):
+                continue
+            total = sum(costs[i][j] if j >= 0 else unassigned for i, j in enumerate(combo))
+            if total < best_total:
+                best, best_total = combo, total
+        return best
+
+    def update(self, result, capture_time):
+        """
+        Закрепляет руки нового результата за игроками.
+        :param result: inference.HandResult
+        :param capture_time: время захвата кадра, по которому получен результат (сек)
+        :return: {игрок: (x, y) или None}
+        """
+        stats = self.stats
+        stats.frames += 1
+        stats.hands += result.num_hands
+        palms = result.landmarks[:, 0, :2].astype(np.float64)
+        assignment = self._best_assignment(self._costs(palms, result, capture_time)) if len(palms) else ()
+
+        matched = set()
+        for i, j in enumerate(assignment):
+            if j < 0:
+                stats.rejected += 1
+                continue
+            matched.add(j)
+            self._assign(self.slots[j], result, i, (float(palms[i, 0]), float(palms[i, 1])), capture_time)
+
+        for j, slot in enumerate(self.slots):
+            if j in matched:
+                continue
+            slot.landmarks = None
+            if not slot.active:
+                continue
+            if capture_time - slot.last_time > self.hold_time:
+                stats.lost += 1
+                slot.reset()
+            else:
+                stats.dropouts += 1
+        return self.coords
+
+    def _assign(self, slot, result, i, palm, capture_time):
+        stats = self.stats
+        stats.present += 1
+        label, score = result.handedness[i], result.scores[i]
+        if not slot.active:
+            stats.acquired += 1
+            slot.track_id = self._next_id
+            self._next_id += 1
+            slot.velocity = (0.0, 0.0)
+            slot.handedness = label if score >= self.min_label_score else None
+        else:
+            predicted = slot.predict(capture_time)
+            if math.hypot(palm[0] - predicted[0], palm[1] - predicted[1]) > self.jump_distance:
+                stats.jumps += 1
+            dt = capture_time - slot.last_time
+            if dt > 0:
+                # Скорость — экспоненциальное среднее по соседним результатам
+                vx = (palm[0] - slot.position[0]) / dt
+                vy = (palm[1] - slot.position[1]) / dt
+                slot.velocity = (slot.velocity[0] + 0.5 * (vx - slot.velocity[0]),
+                                 slot.velocity[1] + 0.5 * (vy - slot.velocity[1]))
+            self._check_label(slot, label, score)
+        slot.position = palm
+        slot.last_time = capture_time
+        slot.landmarks = result.landmarks[i]
+        slot.history.push(capture_time, slot.landmarks)
+
+    def _check_label(self, slot, label, score):
+        if score < self.min_label_score:
+            return
+        if slot.handedness is None or label == slot.handedness:
+            slot.handedness = label
+            slot._label_mismatch = 0
+            return
+        self.stats.label_conflicts += 1
+        slot._label_mismatch += 1
+        if slot._label_mismatch >= self.relabel_after:
+            slot.handedness = label
+            slot._label_mismatch = 0
+
+
+def strip_coords(coords, index, count=len(PLAYERS)):
+    """Координаты ладони в полосе игрока index растягиваются по x на весь диапазон 0..1."""
+    if coords is None:
+        return None
+    x = (coords[0] - index / count) * count
+    return (min(max(x, 0.0), 1.0), coords[1])
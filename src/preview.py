@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+import pygame
+
+
+'''
+Превью камеры для окна игры без лишних копий кадра:
+ - кадр уменьшается один раз, сразу в исходном BGR (cv2.resize в заранее выделенный буфер)
+ - BGR -> RGB делается уже на маленьком кадре, тоже в готовый буфер
+ - pygame.Surface создаётся один раз через pygame.image.frombuffer и разделяет
+   память с RGB-буфером: обновили буфер — обновилась и поверхность
+Итого на кадр: ноль новых поверхностей и массивов вместо 5-6 полных копий.
+'''
+
+
+class CameraPreview:
+    def __init__(self, size=(320, 240), visible=True):
+        """
+        :param size: (ширина, высота) превью на экране
+        :param visible: показывать ли превью (если нет — кадр вообще не обрабатывается)
+        """
+        self.size = size
+        self.visible = visible
+        width, height = size
+        self._bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        # Поверхность смотрит прямо в self._rgb — буфер должен жить столько же, сколько она
+        self.surface = pygame.image.frombuffer(self._rgb, size, "RGB")
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def update(self, frame_bgr):
+        """
+        Обновляет превью по кадру камеры (BGR, любого размера).
+        Returns:
+            pygame.Surface (всегда один и тот же объект) или None, если превью скрыто
+        """
+        if not self.visible or frame_bgr is None:
+            return None
+        cv2.resize(frame_bgr, self.size, dst=self._bgr, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self.surface
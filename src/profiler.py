@@ -0,0 +1,196 @@
+import csv
+import json
+import math
+import time
+from array import array
+
+
+'''
+Профайлер кадра по стадиям (захват, конвертация цвета, инференс, рисование landmarks,
+физика, рендер, вывод на экран):
+ - каждая стадия пишет длительность в кольцевой буфер фиксированного размера
+   (последние capacity замеров, память не растёт)
+ - перцентили p50/p95/p99 считаются только по запросу (summary, HUD, дамп)
+ - замер — два вызова time.perf_counter() и запись в массив: ~1 мкс, можно не выключать
+ - ProfilerHud — оверлей с таблицей стадий (клавиша в игре), обновляется пару раз в секунду
+ - dump_json / dump_csv — сводка при выходе
+'''
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = array("d", bytes(8 * capacity))
+        self.count = 0  # сколько значений записано за всё время
+
+    def add(self, value):
+        self.values[self.count % self.capacity] = value
+        self.count += 1
+
+    def samples(self):
+        """Значения, которые сейчас в буфере (порядок не важен)."""
+        return self.values[:min(self.count, self.capacity)]
+
+    def last(self):
+        return self.values[(self.count - 1) % self.capacity] if self.count else None
+
+
+def percentile(sorted_values, q):
+    """Перцентиль методом ближайшего ранга по отсортированной последовательности."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _Measure:
+    """Переиспользуемый контекстный менеджер замера одной стадии."""
+    __slots__ = ("buffer", "start")
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.buffer.add(time.perf_counter() - self.start)
+        return False
+
+
+class _NoMeasure:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_MEASURE = _NoMeasure()
+
+
+class Profiler:
+    def __init__(self, capacity=600, enabled=True):
+        """
+        :param capacity: сколько последних замеров хранить на стадию (600 = 10 сек при 60 FPS)
+        :param enabled: False — все замеры ничего не делают
+        """
+        self.capacity = capacity
+        self.enabled = enabled
+        self.buffers = {}  # стадия -> RingBuffer, в порядке первого замера
+        self._measures = {}
+
+    def buffer(self, name):
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.capacity)
+            self._measures[name] = _Measure(buffer)
+        return buffer
+
+    def measure(self, name):
+        """
+        with profiler.measure("physics"): ...
+        Вложенные замеры одной и той же стадии не поддерживаются.
+        """
+        if not self.enabled:
+            return _NO_MEASURE
+        measure = self._measures.get(name)
+        if measure is None:
+            self.buffer(name)
+            measure = self._measures[name]
+        return measure
+
+    def record(self, name, seconds):
+        """Записывает уже измеренную длительность стадии."""
+        if self.enabled:
+            self.buffer(name).add(seconds)
+
+    def reset(self):
+        self.buffers.clear()
+        self._measures.clear()
+
+    def summary(self):
+        """
+        :return: {стадия: {count, last_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} по буферу
+        """
+        result = {}
+        for name, buffer in self.buffers.items():
+            values = sorted(buffer.samples())
+            if not values:
+                continue
+            result[name] = {
+                "count": buffer.count,
+                "last_ms": buffer.last() * 1000,
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return result
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+    def dump_csv(self, path):
+        fields = ["stage", "count", "last_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for name, row in self.summary().items():
+                writer.writerow({"stage": name, **row})
+
+
+class ProfilerHud:
+    def __init__(self, profiler, font, position=(10, 90), colour=(255, 255, 0),
+                 background=(0, 0, 0, 160), refresh=0.5, visible=False):
+        """
+        Оверлей со сводкой профайлера.
+        :param refresh: как часто (сек) перерисовывать таблицу — текст не рендерится каждый кадр
+        """
+        self.profiler = profiler
+        self.font = font
+        self.position = position
+        self.colour = colour
+        self.background = background
+        self.refresh = refresh
+        self.visible = visible
+        self.surface = None
+        self._updated = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._updated = None
+
+    def lines(self):
+        lines = ["stage        p50    p95    p99 ms"]
+        for name, row in self.profiler.summary().items():
+            lines.append(f"{name:<10} {row['p50_ms']:6.2f} {row['p95_ms']:6.2f} {row['p99_ms']:6.2f}")
+        return lines
+
+    def _render(self):
+        # pygame — только для оверлея: трекер и сервер импортируют профайлер без него
+        import pygame
+        rendered = [self.font.render(line, True, self.colour) for line in self.lines()]
+        width = max(s.get_width() for s in rendered) + 12
+        line_height = self.font.get_linesize()
+        surface = pygame.Surface((width, line_height * len(rendered) + 12), pygame.SRCALPHA)
+        surface.fill(self.background)
+        for i, line in enumerate(rendered):
+            surface.blit(line, (6, 6 + i * line_height))
+        return surface
+
+    def draw(self, surface, now=None):
+        """Рисует оверлей (если он включён); возвращает изменённую область или None."""
+        if not self.visible:
+            return None
+        now = time.perf_counter() if now is None else now
+        if self._updated is None or now - self._updated >= self.refresh:
+            self.surface = self._render()
+            self._updated = now
+        return surface.blit(self.surface, self.position)
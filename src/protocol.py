@@ -0,0 +1,217 @@
+import struct
+from collections import OrderedDict
+
+from engine import BOSS_HIT, OPPONENT_POINT, PADDLE_HIT, PLAYER_POINT
+
+
+'''
+Бинарный протокол сетевой игры вдвоём (PvP): сообщения фиксированного формата
+через struct, little-endian, первый байт — тип сообщения.
+ - HELLO (сервер -> клиент): роль игрока и частота снимков
+ - INPUT (клиент -> сервер): номер ввода, подтверждение последнего полученного снимка,
+   координаты ладони (uint16, нормализованные) — 14 байт
+ - STATE (сервер -> клиент): снимок состояния, дельта-сжатый относительно снимка,
+   который клиент подтвердил (baseline): в сообщении только изменившиеся поля и
+   битовая маска этих полей. baseline = 0 — полный снимок (маска со всеми полями).
+   В заголовке — номер последнего применённого ввода этого клиента (для согласования
+   предсказания) и битовая маска событий с прошлого снимка (звуки).
+ - PING / PONG: время отправки клиента, сервер возвращает его как есть (RTT)
+Номера снимков и вводов — uint32, начинаются с 1 и растут.
+'''
+
+MSG_HELLO = 1
+MSG_INPUT = 2
+MSG_STATE = 3
+MSG_PING = 4
+MSG_PONG = 5
+
+ROLE_BOTTOM = 0  # ракетка внизу (как игрок в одиночной игре)
+ROLE_TOP = 1  # босс наверху
+ROLES = ("bottom", "top")
+
+NO_BASELINE = 0
+
+HELLO = struct.Struct("<BBB")  # тип, роль, снимков в секунду
+INPUT = struct.Struct("<BIIHHB")  # тип, номер ввода, подтверждённый снимок, x, y, флаги
+PING = struct.Struct("<Bd")  # тип (PING/PONG), время клиента
+STATE_HEADER = struct.Struct("<BIIIBH")  # тип, номер снимка, baseline, последний ввод, события, маска
+
+INPUT_HAND = 1  # флаг: рука найдена (иначе координаты не передаются)
+COORD_SCALE = 65535
+
+# Поля снимка в порядке маски: (имя, формат struct)
+SNAPSHOT_FIELDS = (
+    ("tick", "I"),
+    ("ball_x", "f"),
+    ("ball_y", "f"),
+    ("ball_vx", "f"),
+    ("ball_vy", "f"),
+    ("boss_x", "f"),
+    ("paddle_x", "h"),
+    ("paddle_y", "h"),
+    ("paddle_active", "B"),
+    ("player_score", "B"),
+    ("opponent_score", "B"),
+    ("boss_flip_state", "B"),
+    ("boss_rotation_timer", "B"),
+)
+FULL_MASK = (1 << len(SNAPSHOT_FIELDS)) - 1
+SNAPSHOT = struct.Struct("<" + "".join(fmt for _, fmt in SNAPSHOT_FIELDS))
+# Размер полного снимка (заголовок + все поля)
+FULL_STATE_SIZE = STATE_HEADER.size + SNAPSHOT.size
+
+EVENT_BITS = {PADDLE_HIT: 1, BOSS_HIT: 2, PLAYER_POINT: 4, OPPONENT_POINT: 8}
+
+_delta_structs = {}
+
+
+def _delta_struct(mask):
+    """struct для полей маски (кэшируется: различных масок немного)."""
+    packer = _delta_structs.get(mask)
+    if packer is None:
+        packer = _delta_structs[mask] = struct.Struct(
+            "<" + "".join(fmt for i, (_, fmt) in enumerate(SNAPSHOT_FIELDS) if mask >> i & 1))
+    return packer
+
+
+def snapshot(state):
+    """Кортеж значений полей снимка из GameState."""
+    return (
+        state.tick,
+        state.ball_pos[0], state.ball_pos[1],
+        state.ball_velocity[0], state.ball_velocity[1],
+        state.boss_x,
+        state.paddle_pos[0], state.paddle_pos[1],
+        int(state.paddle_active),
+        min(state.player_score, 255), min(state.opponent_score, 255),
+        state.boss_flip_state, state.boss_rotation_timer,
+    )
+
+
+def apply_snapshot(state, values):
+    """Записывает снимок в GameState; прошлые позиции сохраняются для интерполяции."""
+    (state.tick, ball_x, ball_y, vx, vy, boss_x, paddle_x, paddle_y, paddle_active,
+     state.player_score, state.opponent_score, state.boss_flip_state, state.boss_rotation_timer) = values
+    state.prev_ball_pos = list(state.ball_pos)
+    state.prev_boss_x = state.boss_x
+    state.ball_pos = [ball_x, ball_y]
+    state.ball_velocity = [vx, vy]
+    state.ball_direction = -1 if vy > 0 else 1
+    state.boss_x = boss_x
+    state.paddle_pos = [paddle_x, paddle_y]
+    state.paddle_active = bool(paddle_active)
+
+
+def encode_events(events):
+    bits = 0
+    for event in events:
+        bits |= EVENT_BITS[event]
+    return bits
+
+
+def decode_events(bits):
+    return [event for event, bit in EVENT_BITS.items() if bits & bit]
+
+
+def encode_hello(role, snapshot_rate):
+    return HELLO.pack(MSG_HELLO, role, snapshot_rate)
+
+
+def decode_hello(data):
+    """:return: (роль, снимков в секунду)"""
+    _, role, snapshot_rate = HELLO.unpack(data)
+    return role, snapshot_rate
+
+
+def encode_input(seq, ack, coords):
+    """:param coords: (x, y) нормализованные координаты или None (рука не найдена)"""
+    if coords is None:
+        return INPUT.pack(MSG_INPUT, seq, ack, 0, 0, 0)
+    x = round(min(max(coords[0], 0.0), 1.0) * COORD_SCALE)
+    y = round(min(max(coords[1], 0.0), 1.0) * COORD_SCALE)
+    return INPUT.pack(MSG_INPUT, seq, ack, x, y, INPUT_HAND)
+
+
+def quantize_coords(coords):
+    """Координаты такими, какими их получит сервер (для точного предсказания на клиенте)."""
+    if coords is None:
+        return None
+    return tuple(round(min(max(c, 0.0), 1.0) * COORD_SCALE) / COORD_SCALE for c in coords)
+
+
+def decode_input(data):
+    """:return: (номер ввода, подтверждённый снимок, координаты или None)"""
+    _, seq, ack, x, y, flags = INPUT.unpack(data)
+    coords = (x / COORD_SCALE, y / COORD_SCALE) if flags & INPUT_HAND else None
+    return seq, ack, coords
+
+
+def encode_ping(msg_type, timestamp):
+    return PING.pack(msg_type, timestamp)
+
+
+def decode_ping(data):
+    return PING.unpack(data)[1]
+
+
+def encode_state(seq, values, baseline_seq=NO_BASELINE, baseline=None, last_input=0, events=0):
+    """
+    Снимок состояния; с baseline — только поля, отличающиеся от него.
+    :param values: кортеж snapshot()
+    :param baseline: значения снимка baseline_seq (который клиент подтвердил)
+    """
+    if baseline is None:
+        baseline_seq = NO_BASELINE
+        mask = FULL_MASK
+        changed = values
+    else:
+        mask = 0
+        changed = []
+        for i, (value, old) in enumerate(zip(values, baseline)):
+            if value != old:
+                mask |= 1 << i
+                changed.append(value)
+    return STATE_HEADER.pack(MSG_STATE, seq, baseline_seq, last_input, events, mask) + \
+        _delta_struct(mask).pack(*changed)
+
+
+def decode_state(data, history):
+    """
+    :param history: SnapshotHistory полученных снимков (для дельты нужен её baseline)
+    :return: (номер снимка, значения снимка, последний применённый ввод, маска событий)
+    :raises KeyError: baseline уже нет в истории
+    """
+    _, seq, baseline_seq, last_input, events, mask = STATE_HEADER.unpack_from(data)
+    changed = _delta_struct(mask).unpack_from(data, STATE_HEADER.size)
+    if baseline_seq == NO_BASELINE:
+        return seq, changed, last_input, events
+    values = list(history[baseline_seq])
+    fields = iter(changed)
+    for i in range(len(values)):
+        if mask >> i & 1:
+            values[i] = next(fields)
+    return seq, tuple(values), last_input, events
+
+
+class SnapshotHistory:
+    def __init__(self, capacity=64):
+        """Последние capacity снимков по номеру (baseline для дельт)."""
+        self.capacity = capacity
+        self._snapshots = OrderedDict()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __contains__(self, seq):
+        return seq in self._snapshots
+
+    def __getitem__(self, seq):
+        return self._snapshots[seq]
+
+    def get(self, seq):
+        return self._snapshots.get(seq)
+
+    def add(self, seq, values):
+        self._snapshots[seq] = values
+        if len(self._snapshots) > self.capacity:
+            self._snapshots.popitem(last=False)
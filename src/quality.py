@@ -0,0 +1,138 @@
+from profiler import percentile
+
+
+'''
+Адаптивное качество трекинга: на слабом мини-ПК и на мощном десктопе одни и те же
+настройки HandTracker либо не держат 60 FPS, либо не используют запас.
+QualityController смотрит на время работы кадра (без ожидания vsync/tick) и время
+инференса и переключает уровни QUALITY_LEVELS:
+ - разрешение кадра для трекинга (input_scale), инференс на каждом N-м кадре
+   (inference_stride), model_complexity Mediapipe и пороги уверенности
+ - решение — раз в окно из window кадров, по p90 окна
+ - инференс учитывается в пересчёте на кадр: время вызова / inference_stride уровня
+   (вызов Mediapipe каждый третий кадр стоит треть своего времени на кадр)
+ - понижение: p90 кадра выше бюджета или p90 инференса на кадр выше своего бюджета —
+   сразу после окна
+ - повышение: p90 кадра и p90 инференса на кадр ниже headroom * бюджет up_windows
+   окон подряд;
+   если с уровня уже приходилось уходить, ждать вдвое дольше за каждый такой раз
+   (гистерезис: уровень на границе бюджета не "дребезжит")
+ - после переключения одно окно пропускается: замеры ещё старые
+'''
+
+
+class QualityLevel:
+    def __init__(self, name, input_scale, inference_stride, model_complexity,
+                 min_detection_confidence, min_tracking_confidence):
+        self.name = name
+        self.input_scale = input_scale  # доля разрешения камеры для трекинга
+        self.inference_stride = inference_stride  # инференс на каждом N-м кадре
+        self.model_complexity = model_complexity  # 0 — лёгкая модель Mediapipe, 1 — полная
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+
+    def hands_options(self):
+        """Параметры Mediapipe Hands этого уровня."""
+        return {
+            "model_complexity": self.model_complexity,
+            "min_detection_confidence": self.min_detection_confidence,
+            "min_tracking_confidence": self.min_tracking_confidence,
+        }
+
+    def __repr__(self):
+        return (f"{self.name} (x{self.input_scale:g}, каждый {self.inference_stride}-й кадр, "
+                f"model_complexity={self.model_complexity})")
+
+
+# От лучшего к самому лёгкому. Порог трекинга ниже — Mediapipe реже перезапускает
+# детектор ладони (он дороже трекинга)
+QUALITY_LEVELS = (
+    QualityLevel("high", 1.0, 1, 1, 0.7, 0.5),
+    QualityLevel("medium", 0.75, 1, 1, 0.7, 0.5),
+    QualityLevel("low", 0.5, 1, 0, 0.6, 0.4),
+    QualityLevel("lower", 0.5, 2, 0, 0.6, 0.4),
+    QualityLevel("lowest", 0.375, 3, 0, 0.5, 0.3),
+)
+
+
+class QualityController:
+    def __init__(self, levels=QUALITY_LEVELS, level=0, frame_budget=1 / 60, inference_budget=None,
+                 window=30, headroom=0.6, up_windows=4, on_change=None):
+        """
+        :param level: начальный уровень (индекс в levels, 0 — лучший)
+        :param frame_budget: бюджет работы кадра (сек)
+        :param inference_budget: бюджет инференса в пересчёте на кадр (по умолчанию — весь кадр)
+        :param window: кадров в окне решения
+        :param headroom: повышать, только если кадр укладывается в эту долю бюджета
+        :param up_windows: сколько спокойных окон подряд нужно для повышения
+        :param on_change: функция (level_index, QualityLevel, причина) при переключении
+        """
+        self.levels = levels
+        self.level = level
+        self.frame_budget = frame_budget
+        self.inference_budget = frame_budget if inference_budget is None else inference_budget
+        self.window = window
+        self.headroom = headroom
+        self.up_windows = up_windows
+        self.on_change = on_change
+        self.frame_times = []
+        self.inference_times = []
+        self.calm_windows = 0
+        self.skip_window = False
+        self.failures = [0] * len(levels)  # сколько раз уходили с уровня из-за перегрузки
+        self.history = []  # (номер кадра, уровень, причина)
+        self.frames = 0
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def observe(self, frame_time, inference_time=None):
+        """
+        Замер кадра.
+        :param frame_time: время работы кадра (сек, без ожидания tick/vsync)
+        :param inference_time: время вызова инференса, если в этом кадре он был
+        :return: новый QualityLevel, если уровень переключился, иначе None
+        """
+        self.frames += 1
+        self.frame_times.append(frame_time)
+        if inference_time is not None:
+            self.inference_times.append(inference_time / self.current.inference_stride)
+        if len(self.frame_times) < self.window:
+            return None
+        frame_p90 = percentile(sorted(self.frame_times), 90)
+        inference_p90 = percentile(sorted(self.inference_times), 90) if self.inference_times else 0.0
+        self.frame_times.clear()
+        self.inference_times.clear()
+        if self.skip_window:
+            self.skip_window = False
+            return None
+
+        if frame_p90 > self.frame_budget or inference_p90 > self.inference_budget:
+            self.calm_windows = 0
+            if self.level + 1 < len(self.levels):
+                self.failures[self.level] += 1
+                reason = (f"кадр p90 {frame_p90 * 1000:.1f} мс, "
+                          f"инференс p90 {inference_p90 * 1000:.1f} мс")
+                return self._switch(self.level + 1, reason)
+            return None
+
+        if (frame_p90 < self.frame_budget * self.headroom
+                and inference_p90 < self.inference_budget * self.headroom and self.level > 0):
+            self.calm_windows += 1
+            # Уровень выше уже не выдерживал — каждый раз ждём вдвое дольше
+            if self.calm_windows >= self.up_windows * 2 ** self.failures[self.level - 1]:
+                return self._switch(self.level - 1, f"кадр p90 {frame_p90 * 1000:.1f} мс, "
+                                                    f"инференс p90 {inference_p90 * 1000:.1f} мс")
+        else:
+            self.calm_windows = 0
+        return None
+
+    def _switch(self, level, reason):
+        self.level = level
+        self.calm_windows = 0
+        self.skip_window = True
+        self.history.append((self.frames, level, reason))
+        if self.on_change is not None:
+            self.on_change(level, self.current, reason)
+        return self.current
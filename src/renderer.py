@@ -0,0 +1,166 @@
+import time
+
+import pygame
+
+from engine import TABLE_BOTTOM_WIDTH, TABLE_BOTTOM_Y, TABLE_TOP_WIDTH, TABLE_TOP_Y
+
+
+'''
+Рендер сцены слоями:
+ - статический слой (фон, стол, центральная линия, ножки, сетка) рисуется один раз
+   в отдельную поверхность и пересобирается только при смене размера окна;
+   одна сетка — это ~1200 вызовов pygame.draw.rect, теперь они делаются один раз
+ - каждый кадр: статический слой одним blit, поверх — только динамика
+   (превью камеры, босс, тень, мяч, ракетка, счёт, кнопки)
+ - dirty_rects=True: вместо полного blit статического слоя восстанавливаются только
+   места, где динамика была на прошлом кадре, и на экран отправляются только
+   изменившиеся прямоугольники (pygame.display.update(rects) вместо flip)
+RenderStats — время рендера кадра (от begin() до present() включительно).
+'''
+
+TABLE_COLOR = (1, 101, 163)  # Сине-голубой цвет стола
+NET_COLOR = (255, 255, 255)
+LEG_COLOR = (50, 50, 50)  # Тёмно-серый цвет ножек
+NET_Y = TABLE_TOP_Y + int((TABLE_BOTTOM_Y - TABLE_TOP_Y) * 0.38)  # экранная линия сетки
+
+
+def draw_table(surface, background):
+    """Статическая часть сцены: фон, стол, центральная линия, ножки и сетка."""
+    width, height = surface.get_size()
+    if background.get_size() != (width, height):
+        background = pygame.transform.scale(background, (width, height))
+    surface.blit(background, (0, 0))
+
+    # Левая половина стола
+    left_table_points = [
+        (width // 2, TABLE_TOP_Y),
+        (width // 2 - TABLE_TOP_WIDTH // 2, TABLE_TOP_Y),
+        (width // 2 - TABLE_BOTTOM_WIDTH // 2, TABLE_BOTTOM_Y),
+        (width // 2, TABLE_BOTTOM_Y)
+    ]
+    pygame.draw.polygon(surface, TABLE_COLOR, left_table_points)
+
+    # Правая половина стола
+    right_table_points = [
+        (width // 2, TABLE_TOP_Y),
+        (width // 2 + TABLE_TOP_WIDTH // 2, TABLE_TOP_Y),
+        (width // 2 + TABLE_BOTTOM_WIDTH // 2, TABLE_BOTTOM_Y),
+        (width // 2, TABLE_BOTTOM_Y)
+    ]
+    pygame.draw.polygon(surface, TABLE_COLOR, right_table_points)
+
+    # Центральная линия
+    pygame.draw.line(surface, NET_COLOR, (width // 2, TABLE_TOP_Y), (width // 2, TABLE_BOTTOM_Y), 3)
+
+    # --- Ножки стола ---
+    leg_width = 20
+    leg_height = height - TABLE_BOTTOM_Y
+    left_leg_x = width // 2 - TABLE_BOTTOM_WIDTH // 2 + 100
+    pygame.draw.rect(surface, LEG_COLOR, (left_leg_x, TABLE_BOTTOM_Y, leg_width, leg_height))
+    right_leg_x = width // 2 + TABLE_BOTTOM_WIDTH // 2 - leg_width - 100
+    pygame.draw.rect(surface, LEG_COLOR, (right_leg_x, TABLE_BOTTOM_Y, leg_width, leg_height))
+
+    # --- Сетка ---
+    net_width = (TABLE_TOP_WIDTH + (TABLE_BOTTOM_WIDTH - TABLE_TOP_WIDTH) *
+                 ((NET_Y - TABLE_TOP_Y) / (TABLE_BOTTOM_Y - TABLE_TOP_Y))) * 1.07
+    net_half_width = net_width // 2
+    for y in range(NET_Y - 25, NET_Y + 25, 6):
+        for x in range(-int(net_half_width), int(net_half_width), 6):
+            pygame.draw.rect(surface, NET_COLOR, (width // 2 + x, y, 2, 2))
+
+
+class RenderStats:
+    def __init__(self):
+        self.frames = 0
+        self.render_time = 0.0  # суммарное время рендера (сек)
+        self.last_time = 0.0  # время рендера последнего кадра (сек)
+
+    @property
+    def avg_ms(self):
+        return self.render_time / self.frames * 1000 if self.frames else 0.0
+
+    def as_dict(self):
+        return {
+            "frames": self.frames,
+            "avg_ms": self.avg_ms,
+            "last_ms": self.last_time * 1000,
+        }
+
+
+class SceneRenderer:
+    def __init__(self, screen, background, dirty_rects=False, cache_static=True):
+        """
+        :param screen: поверхность окна (pygame.display.set_mode)
+        :param background: фон окна (масштабируется под размер окна)
+        :param dirty_rects: обновлять на экране только изменившиеся прямоугольники
+        :param cache_static: False — рисовать статический слой каждый кадр (как раньше, для замеров)
+        """
+        self.screen = screen
+        self.background = background
+        self.dirty_rects = dirty_rects
+        self.cache_static = cache_static
+        self.stats = RenderStats()
+        self._static = None
+        self._dirty = []  # где рисовали в этом кадре
+        self._previous = []  # где рисовали в прошлом кадре
+        self._full_refresh = True
+        self._frame_start = None
+
+    def static_layer(self):
+        """Закэшированный статический слой (собирается при первом обращении и смене размера)."""
+        size = self.screen.get_size()
+        if self._static is None or self._static.get_size() != size:
+            self._static = pygame.Surface(size).convert()
+            draw_table(self._static, self.background)
+            self._full_refresh = True
+        return self._static
+
+    def resize(self, screen):
+        """Новое окно (после pygame.display.set_mode с другим размером)."""
+        self.screen = screen
+        self._static = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Следующий кадр — целиком (например, после меню, нарисованного поверх всего)."""
+        self._full_refresh = True
+        self._previous = []
+
+    def begin(self):
+        """Начало кадра: под динамическими слоями снова статическая сцена."""
+        self._frame_start = time.perf_counter()
+        if not self.cache_static:
+            draw_table(self.screen, self.background)
+            return
+        static = self.static_layer()
+        if self.dirty_rects and not self._full_refresh:
+            # Стираем динамику прошлого кадра (и уже нарисованную в этом, если begin повторный)
+            for rect in self._previous + self._dirty:
+                self.screen.blit(static, rect, rect)
+        else:
+            self.screen.blit(static, (0, 0))
+
+    def blit(self, surface, dest, area=None):
+        """blit на экран с учётом изменённой области; возвращает pygame.Rect."""
+        return self.mark(self.screen.blit(surface, dest, area))
+
+    def mark(self, rect):
+        """Отмечает область, нарисованную в обход blit (pygame.draw.* возвращает Rect)."""
+        self._dirty.append(pygame.Rect(rect))
+        return rect
+
+    def present(self):
+        """Конец кадра: отправляет изменения на экран."""
+        if self.dirty_rects and not self._full_refresh:
+            pygame.display.update(self._previous + self._dirty)
+        else:
+            pygame.display.flip()
+        self._previous = self._dirty
+        self._dirty = []
+        self._full_refresh = False
+        if self._frame_start is not None:
+            elapsed = time.perf_counter() - self._frame_start
+            self.stats.frames += 1
+            self.stats.render_time += elapsed
+            self.stats.last_time = elapsed
+            self._frame_start = None
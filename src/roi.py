@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+
+
+'''
+Трекинг руки в области интереса (ROI):
+ - Ладонь между кадрами смещается на несколько пикселей, поэтому вместо полного
+   кадра в Mediapipe отправляется квадрат вокруг предсказанной позиции ладони
+ - Размер квадрата растёт со скоростью руки (чтобы быстрая рука не вылетела из ROI)
+ - Вырезанная область уменьшается до фиксированного размера (roi_resolution)
+ - Координаты landmarks переводятся обратно в нормализованные координаты кадра
+ - Если рука потеряна или уверенность упала — поиск по всему кадру (fallback)
+ - Вырезки и полный кадр идут в разные экземпляры Hands: в видеорежиме Mediapipe
+   ищет руку в прямоугольнике с прошлого входа, и общий экземпляр применял бы
+   прямоугольник вырезки к полному кадру и наоборот
+'''
+
+
+class RoiStats:
+    """Счётчики режима ROI"""
+
+    def __init__(self):
+        self.roi_frames = 0    # кадров, обработанных только по ROI
+        self.full_frames = 0   # кадров, обработанных по всему кадру
+        self.fallbacks = 0     # ROI не сработал — пришлось искать по всему кадру
+
+    @property
+    def fallback_rate(self):
+        attempts = self.roi_frames + self.fallbacks
+        return self.fallbacks / attempts if attempts else 0.0
+
+    def as_dict(self):
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallback_rate,
+        }
+
+
+class RoiTracker:
+    def __init__(self, size_ratio=0.45, velocity_margin=3.0, roi_resolution=192, min_score=0.8):
+        """
+        :param size_ratio: сторона ROI в долях от меньшей стороны кадра (при неподвижной руке)
+        :param velocity_margin: на сколько скоростей (за кадр) расширять ROI с каждой стороны
+        :param roi_resolution: сторона квадрата, до которого уменьшается ROI
+        :param min_score: ниже этой уверенности рука считается потерянной
+        """
+        self.size_ratio = size_ratio
+        self.velocity_margin = velocity_margin
+        self.roi_resolution = roi_resolution
+        self.min_score = min_score
+        self.stats = RoiStats()
+        self.reset()
+
+    def reset(self):
+        """Забывает последнюю позицию — следующий кадр ищется целиком."""
+        self.last_coords = None
+        self.velocity = (0.0, 0.0)
+
+    def crop_box(self, frame_shape):
+        """
+        Квадрат (x0, y0, x1, y1) в пикселях вокруг предсказанной позиции ладони
+        или None, если позиция неизвестна.
+        """
+        if self.last_coords is None:
+            return None
+        h, w = frame_shape[:2]
+        vx, vy = self.velocity
+        # Предсказание: ладонь продолжит движение с той же скоростью
+        cx = (self.last_coords[0] + vx) * w
+        cy = (self.last_coords[1] + vy) * h
+
+        half = self.size_ratio * min(w, h) / 2
+        half += self.velocity_margin * max(abs(vx) * w, abs(vy) * h)
+        half = int(min(half, min(w, h) / 2))
+
+        # Сдвигаем квадрат внутрь кадра, не меняя размер
+        x0 = int(np.clip(cx - half, 0, w - 2 * half))
+        y0 = int(np.clip(cy - half, 0, h - 2 * half))
+        return x0, y0, x0 + 2 * half, y0 + 2 * half
+
+    def crop(self, frame_rgb, box):
+        """Вырезает ROI и уменьшает до roi_resolution (если он больше)."""
+        x0, y0, x1, y1 = box
+        roi = frame_rgb[y0:y1, x0:x1]
+        if x1 - x0 > self.roi_resolution:
+            roi = cv2.resize(roi, (self.roi_resolution, self.roi_resolution), interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(roi)
+
+    @staticmethod
+    def map_landmarks(landmarks, box, frame_shape):
+        """Переводит landmarks из нормализованных координат ROI в координаты кадра."""
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        mapped = landmarks.copy()
+        mapped[..., 0] = (x0 + landmarks[..., 0] * (x1 - x0)) / w
+        mapped[..., 1] = (y0 + landmarks[..., 1] * (y1 - y0)) / h
+        # z у Mediapipe в масштабе ширины входного изображения
+        mapped[..., 2] = landmarks[..., 2] * (x1 - x0) / w
+        return mapped
+
+    def is_confident(self, result):
+        return result is not None and result.num_hands > 0 and max(result.scores) >= self.min_score
+
+    def update(self, coords):
+        """Запоминает позицию ладони (нормализованную) и её скорость за кадр."""
+        if coords is None:
+            self.reset()
+            return
+        if self.last_coords is not None:
+            self.velocity = (coords[0] - self.last_coords[0], coords[1] - self.last_coords[1])
+        self.last_coords = coords
+
+    def process(self, frame_rgb, infer, infer_roi=None):
+        """
+        Инференс с ROI и запасным поиском по всему кадру.
+        :param infer: функция frame_rgb -> HandResult для полного кадра
+        :param infer_roi: то же для вырезок — отдельная модель (по умолчанию infer,
+                          годится только для моделей без состояния между вызовами)
+        :return: HandResult в координатах полного кадра
+        """
+        box = self.crop_box(frame_rgb.shape)
+        if box is not None:
+            result = (infer_roi or infer)(self.crop(frame_rgb, box))
+            if self.is_confident(result):
+                self.stats.roi_frames += 1
+                result.landmarks = self.map_landmarks(result.landmarks, box, frame_shape=frame_rgb.shape)
+                return result
+            self.stats.fallbacks += 1
+
+        self.stats.full_frames += 1
+        return infer(frame_rgb)
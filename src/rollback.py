@@ -0,0 +1,132 @@
+import math
+from array import array
+
+from physics import STATE_STRUCT
+
+
+'''
+Снимки состояния и откат (rollback) для BallPhysics:
+ - StateRing — заранее выделенное кольцо последних capacity шагов: состояние мяча
+   на начало шага (struct из 6 double в bytearray) и ввод этого шага
+   (input_size чисел в array('d')). Запись шага — pack_into в готовый буфер,
+   без кортежей и float-объектов.
+ - RollbackSimulation — шаги физики с записью в кольцо; rollback(tick, input) —
+   пришёл опоздавший ввод шага tick: состояние tick восстанавливается, ввод
+   подменяется, и симуляция заново прогоняется до текущего шага с записанными вводами.
+Ввод шага — вектор из input_size чисел (NaN — ввода не было), его применяет
+apply_input(physics, values) перед шагом. По умолчанию ввод — удар по мячу:
+новая скорость (vx, vy, vz).
+Генератор случайностей BallPhysics (reset_ball) в снимок не входит: подача при
+откате должна приходить как ввод, а не из rng.
+'''
+
+NO_INPUT = math.nan
+
+
+def apply_hit(physics, values):
+    """Ввод по умолчанию: удар — мяч получает скорость (vx, vy, vz)."""
+    physics.vx, physics.vy, physics.vz = values
+
+
+class StateRing:
+    def __init__(self, capacity, input_size=3):
+        """
+        :param capacity: сколько последних шагов хранить (глубина отката)
+        :param input_size: чисел во вводе одного шага
+        """
+        self.capacity = capacity
+        self.state_size = STATE_STRUCT.size  # байт на состояние
+        self.input_size = input_size
+        self.states = bytearray(capacity * self.state_size)
+        self.inputs = array("d", [NO_INPUT]) * (capacity * input_size)
+
+    def state_offset(self, tick):
+        """Байтовое смещение состояния шага в states."""
+        return (tick % self.capacity) * self.state_size
+
+    def input_offset(self, tick):
+        return (tick % self.capacity) * self.input_size
+
+    def set_input(self, tick, values=None):
+        """Записывает ввод шага (None — ввода не было)."""
+        offset = self.input_offset(tick)
+        for i in range(self.input_size):
+            self.inputs[offset + i] = NO_INPUT if values is None else values[i]
+
+    def get_input(self, tick):
+        """Ввод шага (кортеж) или None."""
+        offset = self.input_offset(tick)
+        if math.isnan(self.inputs[offset]):
+            return None
+        return tuple(self.inputs[offset:offset + self.input_size])
+
+
+class RollbackSimulation:
+    def __init__(self, physics, capacity=120, dt=1.0, apply_input=apply_hit, input_size=3):
+        """
+        :param physics: BallPhysics
+        :param capacity: глубина отката в шагах (120 = 2 сек при 60 шагах в секунду)
+        :param dt: шаг физики (в кадрах по 1/60 сек)
+        :param apply_input: функция (physics, values) — применяет ввод шага перед ним
+        """
+        self.physics = physics
+        self.dt = dt
+        self.apply_input = apply_input
+        self.ring = StateRing(capacity, input_size)
+        self.tick = 0  # номер следующего шага
+        self.resimulated = 0  # всего шагов, пересчитанных при откатах
+
+    @property
+    def oldest_tick(self):
+        """Самый ранний шаг, к которому ещё можно откатиться."""
+        return max(0, self.tick - self.ring.capacity)
+
+    def _advance(self, values):
+        physics = self.physics
+        if values is not None:
+            self.apply_input(physics, values)
+        physics.update(self.dt)
+
+    def step(self, values=None):
+        """
+        Один шаг: состояние на его начало и ввод пишутся в кольцо, затем физика.
+        :param values: ввод шага или None
+        """
+        ring = self.ring
+        self.physics.write_state(ring.states, ring.state_offset(self.tick))
+        ring.set_input(self.tick, values)
+        self._advance(values)
+        self.tick += 1
+
+    def restore(self, tick):
+        """Возвращает физику в состояние на начало шага tick (следующим будет он)."""
+        if not self.oldest_tick <= tick <= self.tick:
+            raise ValueError(f"Шаг {tick} вне кольца [{self.oldest_tick}, {self.tick}]")
+        if tick < self.tick:
+            self.physics.read_state(self.ring.states, self.ring.state_offset(tick))
+        self.tick = tick
+
+    def rollback(self, tick, values):
+        """
+        Опоздавший ввод шага tick: откат к нему и пересчёт до текущего шага.
+        :return: сколько шагов пересчитано
+        """
+        if tick >= self.tick:
+            raise ValueError(f"Шаг {tick} ещё не выполнен (текущий {self.tick})")
+        target = self.tick
+        self.restore(tick)
+        self.ring.set_input(tick, values)
+        ring = self.ring
+        while self.tick < target:
+            self.physics.write_state(ring.states, ring.state_offset(self.tick))
+            self._advance(ring.get_input(self.tick))
+            self.tick += 1
+        resimulated = target - tick
+        self.resimulated += resimulated
+        return resimulated
+
+    def state_at(self, tick):
+        """Состояние (x, y, z, vx, vy, vz) на начало шага tick."""
+        if not self.oldest_tick <= tick < self.tick:
+            raise ValueError(f"Шаг {tick} вне кольца [{self.oldest_tick}, {self.tick})")
+        return STATE_STRUCT.unpack_from(self.ring.states, self.ring.state_offset(tick))
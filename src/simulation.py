@@ -0,0 +1,95 @@
+'''
+Фиксированный шаг симуляции:
+ - время кадра копится в аккумуляторе, симуляция делает 0..N шагов фиксированной длины
+ - рендер рисует состояние между двумя последними шагами (интерполяция по alpha),
+   поэтому картинка плавная при любом FPS, а игра идёт с одной и той же скоростью
+ - при одинаковом seed и одинаковом потоке ввода (ввод привязан к номеру шага)
+   результат бит в бит одинаков при 30, 60 или 144 FPS
+ - при сильной просадке FPS шаги ограничиваются max_steps за кадр
+   (иначе догоняющая симуляция тормозит ещё сильнее — "спираль смерти")
+'''
+
+
+class FixedTimestep:
+    def __init__(self, step=1 / 60, max_steps=5):
+        """
+        :param step: длина шага симуляции (сек)
+        :param max_steps: максимум шагов за один кадр рендера
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.tick = 0  # номер следующего шага симуляции
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.tick = 0
+
+    def advance(self, frame_time):
+        """
+        Добавляет время кадра и возвращает, сколько шагов симуляции нужно сделать.
+        :param frame_time: время с прошлого кадра рендера (сек)
+        """
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # Не догоняем бесконечно — лишнее время выбрасываем
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        self.tick += steps
+        return steps
+
+    def ticks(self, frame_time):
+        """Номера шагов симуляции, которые нужно выполнить в этом кадре."""
+        steps = self.advance(frame_time)
+        return range(self.tick - steps, self.tick)
+
+    @property
+    def alpha(self):
+        """Доля шага, прошедшая после последнего шага симуляции (0..1) — для интерполяции."""
+        return min(1.0, self.accumulator / self.step)
+
+
+def lerp(a, b, alpha):
+    """Линейная интерполяция чисел или кортежей/списков чисел."""
+    if isinstance(a, (tuple, list)):
+        return type(a)(x + (y - x) * alpha for x, y in zip(a, b))
+    return a + (b - a) * alpha
+
+
+class PhysicsSimulation:
+    def __init__(self, physics, rate=60, max_steps=5):
+        """
+        BallPhysics с фиксированным шагом и интерполяцией для рендера.
+        :param physics: объект BallPhysics (dt в кадрах по 1/60 сек)
+        :param rate: частота симуляции (Гц), может быть ниже частоты рендера
+        """
+        self.physics = physics
+        self.clock = FixedTimestep(1 / rate, max_steps)
+        self.dt = 60 / rate  # длина шага в единицах физики
+        self.previous = physics.get_state()
+
+    def frame(self, frame_time, inputs=None):
+        """
+        Продвигает симуляцию на время кадра.
+        :param inputs: функция tick -> действие над physics перед шагом (или None)
+        :return: сколько шагов выполнено
+        """
+        steps = 0
+        for tick in self.clock.ticks(frame_time):
+            if inputs is not None:
+                inputs(tick, self.physics)
+            self.previous = self.physics.get_state()
+            self.physics.update(self.dt)
+            if self.physics.is_out():
+                self.physics.reset_ball()
+                # Телепорт — интерполировать между старым и новым местом нельзя
+                self.previous = self.physics.get_state()
+            steps += 1
+        return steps
+
+    def interpolated_position(self):
+        """Позиция (x, y, z) мяча для рендера между двумя последними шагами."""
+        return lerp(self.previous[:3], self.physics.get_state()[:3], self.clock.alpha)
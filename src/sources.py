@@ -0,0 +1,395 @@
+import argparse
+import glob
+import os
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from capture import SyntheticCapture
+from inference import HANDEDNESS_LABELS, NUM_LANDMARKS
+
+
+'''
+Источники кадров для HandTracker без веб-камеры и запись/воспроизведение сессий.
+Все источники — с интерфейсом cv2.VideoCapture (isOpened / read / release):
+ - open_source(spec) — веб-камера (номер), видеофайл, папка с кадрами,
+   "synthetic" или файл записи сессии (.npz)
+ - FrameDirectorySource — кадры из папки (*.png, *.jpg) по порядку имён
+ - RecordingSource — кадры из записи сессии, с исходными временными метками
+ - LandmarkReplay — записанные landmarks вместо Mediapipe: источник + hands_factory
+   для HandTracker, инференс не выполняется вовсе
+
+SessionRecorder пишет сессию в один .npz: временные метки, кадры (сжатые в PNG/JPEG)
+и/или landmarks. По умолчанию воспроизведение идёт так быстро, как получается
+(realtime=True — с паузами по записанным меткам), и полностью детерминировано.
+
+Запуск:
+  python sources.py record session.npz --frames 300   — записать сессию с камеры
+  python sources.py replay session.npz [--landmarks]  — скорость и точность трекинга
+  python sources.py record two.npz --source synthetic --hands 2  — сессия игры вдвоём
+  python sources.py replay two.npz --landmarks --players — пропуски и подмены рук игроков
+'''
+
+FRAME_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+class FrameDirectorySource:
+    def __init__(self, path, loop=False):
+        """
+        :param path: папка с кадрами (BGR-изображения, порядок — по именам файлов)
+        :param loop: по окончании начинать сначала
+        """
+        self.files = sorted(f for pattern in FRAME_PATTERNS for f in glob.glob(os.path.join(path, pattern)))
+        if not self.files:
+            raise ValueError(f"В папке нет кадров: {path}")
+        self.loop = loop
+        self.frame_index = 0
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self.frame_index >= len(self.files):
+            if not self.loop:
+                return False, None
+            self.frame_index = 0
+        frame = cv2.imread(self.files[self.frame_index], cv2.IMREAD_COLOR)
+        self.frame_index += 1
+        return frame is not None, frame
+
+    def release(self):
+        self._opened = False
+
+
+class SessionRecorder:
+    def __init__(self, path, frames=True, landmarks=True, frame_format="png", jpeg_quality=90):
+        """
+        :param path: файл записи (.npz)
+        :param frames: записывать кадры (BGR, до отражения — как их отдаёт камера)
+        :param landmarks: записывать результат инференса (HandResult)
+        :param frame_format: "png" (без потерь) или "jpg" (компактнее)
+        """
+        if frame_format not in ("png", "jpg"):
+            raise ValueError(f"Неизвестный формат кадров: {frame_format}")
+        self.path = path
+        self.record_frames = frames
+        self.record_landmarks = landmarks
+        self.frame_format = frame_format
+        self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if frame_format == "jpg" else []
+        self.timestamps = []
+        self._encoded = []
+        self._results = []
+        self.frame_shape = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, timestamp, frame=None, hand_result=None):
+        """Добавляет кадр сессии: время захвата, кадр и/или HandResult (None — рук нет)."""
+        self.timestamps.append(timestamp)
+        if self.record_frames:
+            if frame is None:
+                raise ValueError("Запись кадров включена, а кадр не передан")
+            self.frame_shape = frame.shape
+            ok, data = cv2.imencode("." + self.frame_format, frame, self._encode_params)
+            if not ok:
+                raise RuntimeError("Не удалось закодировать кадр")
+            self._encoded.append(data.reshape(-1))
+        elif frame is not None:
+            self.frame_shape = frame.shape
+        if self.record_landmarks:
+            self._results.append(hand_result)
+
+    def save(self):
+        """Записывает сессию в файл; возвращает путь."""
+        data = {"timestamps": np.asarray(self.timestamps, dtype=np.float64)}
+        if self.frame_shape is not None:
+            data["frame_shape"] = np.asarray(self.frame_shape, dtype=np.int64)
+        if self.record_frames:
+            sizes = [len(e) for e in self._encoded]
+            data["frame_offsets"] = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+            data["frame_data"] = (np.concatenate(self._encoded) if self._encoded
+                                  else np.zeros(0, dtype=np.uint8))
+            data["frame_format"] = np.asarray(self.frame_format)
+        if self.record_landmarks:
+            n = len(self._results)
+            max_hands = max([r.num_hands for r in self._results if r is not None], default=0)
+            landmarks = np.zeros((n, max(max_hands, 1), NUM_LANDMARKS, 3), dtype=np.float32)
+            num_hands = np.zeros(n, dtype=np.int8)
+            handedness = np.zeros((n, max(max_hands, 1)), dtype=np.int8)
+            scores = np.zeros((n, max(max_hands, 1)), dtype=np.float32)
+            for i, result in enumerate(self._results):
+                if result is None or result.num_hands == 0:
+                    continue
+                k = result.num_hands
+                num_hands[i] = k
+                landmarks[i, :k] = result.landmarks
+                handedness[i, :k] = [HANDEDNESS_LABELS.index(label) if label in HANDEDNESS_LABELS else 1
+                                      for label in result.handedness]
+                scores[i, :k] = result.scores
+            data.update(landmarks=landmarks, num_hands=num_hands, handedness=handedness, scores=scores)
+        np.savez_compressed(self.path, **data)
+        return self.path
+
+
+class Recording:
+    def __init__(self, path):
+        """Запись сессии, прочитанная из файла SessionRecorder."""
+        with np.load(path) as data:
+            self.timestamps = data["timestamps"]
+            self.frame_shape = tuple(data["frame_shape"]) if "frame_shape" in data else None
+            self.has_frames = "frame_data" in data
+            if self.has_frames:
+                self._offsets = data["frame_offsets"]
+                self._frame_data = data["frame_data"]
+            self.has_landmarks = "landmarks" in data
+            if self.has_landmarks:
+                self.landmarks = data["landmarks"]
+                self.num_hands = data["num_hands"]
+                self.handedness = data["handedness"]
+                self.scores = data["scores"]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def frame(self, index):
+        """Кадр BGR (декодируется при каждом вызове)."""
+        data = self._frame_data[self._offsets[index]:self._offsets[index + 1]]
+        return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+    def palm(self, index):
+        """(x, y) landmark 0 последней руки (как координаты HandTracker) или None."""
+        k = self.num_hands[index]
+        if k == 0:
+            return None
+        return float(self.landmarks[index, k - 1, 0, 0]), float(self.landmarks[index, k - 1, 0, 1])
+
+
+class RecordingSource:
+    def __init__(self, recording, realtime=False, loop=False):
+        """
+        Кадры записи как камера. Если кадры не записывались — отдаёт пустые кадры
+        записанного размера (для воспроизведения одних landmarks).
+        :param recording: Recording или путь к файлу
+        :param realtime: выдерживать паузы по записанным временным меткам
+        :param loop: по кругу (время захвата продолжает расти)
+        """
+        self.recording = recording if isinstance(recording, Recording) else Recording(recording)
+        self.realtime = realtime
+        self.loop = loop
+        self.frame_index = 0
+        self._time_offset = 0.0  # сдвиг времени для повторов записи (loop)
+        # Время захвата последнего отданного кадра — HandTracker берёт его вместо текущего
+        self.last_timestamp = None
+        self._opened = True
+        self._blank = None
+        self._start = None
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        timestamps = self.recording.timestamps
+        if self.loop and self.frame_index >= len(timestamps) > 0:
+            # Следующий круг — через средний интервал кадров после последнего
+            interval = (timestamps[-1] - timestamps[0]) / max(len(timestamps) - 1, 1)
+            self._time_offset += float(timestamps[-1] - timestamps[0] + interval)
+            self.frame_index = 0
+        if not self._opened or self.frame_index >= len(timestamps):
+            return False, None
+        timestamp = float(timestamps[self.frame_index]) + self._time_offset
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now - timestamp
+            delay = self._start + timestamp - now
+            if delay > 0:
+                time.sleep(delay)
+        if self.recording.has_frames:
+            frame = self.recording.frame(self.frame_index)
+        else:
+            if self._blank is None:
+                self._blank = np.zeros(self.recording.frame_shape or (480, 640, 3), dtype=np.uint8)
+            frame = self._blank
+        self.frame_index += 1
+        self.last_timestamp = timestamp
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+class ReplayHands:
+    def __init__(self, source, **kwargs):
+        """
+        Подмена mp.solutions.hands.Hands: возвращает landmarks, записанные для
+        текущего кадра source (а не считает их). Только для HandTracker без ROI.
+        """
+        self.source = source
+        self.calls = 0
+
+    def process(self, frame_rgb):
+        self.calls += 1
+        recording = self.source.recording
+        index = self.source.frame_index - 1
+        k = int(recording.num_hands[index]) if index >= 0 else 0
+        if k == 0:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        hands = []
+        handedness = []
+        for i in range(k):
+            landmark = [SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                        for x, y, z in recording.landmarks[index, i]]
+            hands.append(SimpleNamespace(landmark=landmark))
+            label = HANDEDNESS_LABELS[recording.handedness[index, i]]
+            handedness.append(SimpleNamespace(classification=[
+                SimpleNamespace(label=label, score=float(recording.scores[index, i]))]))
+        return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+    def close(self):
+        pass
+
+
+class LandmarkReplay:
+    def __init__(self, recording, realtime=False):
+        """
+        Воспроизведение landmarks без Mediapipe:
+            replay = LandmarkReplay("session.npz")
+            tracker = HandTracker(hands_factory=replay.hands_factory)
+            tracker.start_capture(replay.source)
+        """
+        self.source = RecordingSource(recording, realtime)
+        if not self.source.recording.has_landmarks:
+            raise ValueError("В записи нет landmarks")
+
+    def hands_factory(self, **kwargs):
+        return ReplayHands(self.source, **kwargs)
+
+
+def open_source(spec, realtime=False, hands=1):
+    """
+    Источник кадров по описанию:
+     - int или строка из цифр — веб-камера с этим номером
+     - "synthetic" — SyntheticCapture (hands — сколько в нём "рук")
+     - папка — FrameDirectorySource
+     - *.npz — RecordingSource (запись сессии)
+     - иначе — видеофайл через cv2.VideoCapture
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return cv2.VideoCapture(int(spec))
+    if spec == "synthetic":
+        return SyntheticCapture(realtime=realtime, hands=hands)
+    if os.path.isdir(spec):
+        return FrameDirectorySource(spec)
+    if spec.endswith(".npz"):
+        return RecordingSource(spec, realtime=realtime)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(spec)
+    return cv2.VideoCapture(spec)
+
+
+def record_session(path, source=0, frames=300, hands_factory=None, max_num_hands=1, record_frames=True,
+                   **recorder_kwargs):
+    """
+    Записывает frames кадров с источника через HandTracker (кадры и landmarks).
+    :param record_frames: писать кадры (False — только landmarks)
+    """
+    from hand_tracker import HandTracker
+    kwargs = {} if hands_factory is None else {"hands_factory": hands_factory}
+    recorder = SessionRecorder(path, frames=record_frames, **recorder_kwargs)
+    tracker = HandTracker(recorder=recorder, max_num_hands=max_num_hands, **kwargs)
+    tracker.start_capture(source)
+    try:
+        while len(recorder) < frames:
+            frame, _ = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            if frame is None:
+                break
+    finally:
+        tracker.stop_capture()
+    return recorder.save()
+
+
+def replay_benchmark(path, landmarks=False, hands_factory=None, players=False):
+    """
+    Прогоняет запись через HandTracker так быстро, как получается.
+    :param landmarks: True — landmarks из записи (без инференса), иначе кадры через hands_factory
+    :param players: игра вдвоём — две руки, закрепление за игроками (players.PlayerAssigner)
+    :return: dict: frames, fps и mean_error/max_error/misses — расхождение координат
+             ладони с записанными (если в записи есть landmarks); с players —
+             ещё счётчики AssignmentStats с префиксом players_
+    """
+    from hand_tracker import HandTracker
+    from players import PlayerAssigner
+    recording = Recording(path)
+    kwargs = {} if hands_factory is None else {"hands_factory": hands_factory}
+    if players:
+        kwargs.update(max_num_hands=2, assigner=PlayerAssigner())
+    if landmarks:
+        replay = LandmarkReplay(recording)
+        kwargs["hands_factory"] = replay.hands_factory
+        source = replay.source
+    else:
+        source = RecordingSource(recording)
+    tracker = HandTracker(**kwargs)
+    tracker.start_capture(source)
+    errors = []
+    misses = 0
+    start = time.perf_counter()
+    frames = 0
+    try:
+        while True:
+            frame, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            if frame is None:
+                break
+            if recording.has_landmarks:
+                expected = recording.palm(frames)
+                if (expected is None) != (coords is None):
+                    misses += 1
+                elif expected is not None:
+                    errors.append(np.hypot(coords[0] - expected[0], coords[1] - expected[1]))
+            frames += 1
+    finally:
+        tracker.stop_capture()
+    elapsed = time.perf_counter() - start
+    result = {"frames": frames, "fps": frames / elapsed if elapsed else 0.0}
+    if recording.has_landmarks:
+        result.update(mean_error=float(np.mean(errors)) if errors else 0.0,
+                      max_error=float(np.max(errors)) if errors else 0.0,
+                      misses=misses)
+    if players:
+        result.update({"players_" + name: value for name, value in tracker.assigner.stats.as_dict().items()})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение сессий трекинга руки")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="записать сессию")
+    record.add_argument("path")
+    record.add_argument("--source", default="0", help="камера, видео, папка или synthetic")
+    record.add_argument("--frames", type=int, default=300)
+    record.add_argument("--no-frames", action="store_true", help="писать только landmarks")
+    record.add_argument("--format", default="png", choices=("png", "jpg"))
+    record.add_argument("--hands", type=int, default=1, help="сколько рук искать (2 — игра вдвоём)")
+    replay = sub.add_parser("replay", help="прогнать запись через трекер")
+    replay.add_argument("path")
+    replay.add_argument("--landmarks", action="store_true", help="без инференса, landmarks из записи")
+    replay.add_argument("--players", action="store_true", help="игра вдвоём: закрепление рук за игроками")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        path = record_session(args.path, open_source(args.source, realtime=True, hands=args.hands), args.frames,
+                              max_num_hands=args.hands, record_frames=not args.no_frames, frame_format=args.format)
+        print(f"Записано: {path}")
+    else:
+        for name, value in replay_benchmark(args.path, landmarks=args.landmarks, players=args.players).items():
+            print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
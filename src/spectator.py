@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import struct
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from protocol import SNAPSHOT, snapshot
+
+
+'''
+Трансляция матча зрителям (экраны на площадке) по websockets:
+ - игровой цикл вызывает publish(state) на каждом шаге: снимок пакуется в кадр
+   фиксированного размера (struct) и пишется в общую память под seqlock — без
+   ожидания и без блокировок, игровой цикл никогда не ждёт зрителей
+ - сервер работает в отдельном процессе (не делит GIL с игрой); у каждого
+   зрителя — очередь на queue_size кадров: если зритель не успевает, старые
+   кадры выбрасываются и остаются самые свежие (drop-to-latest)
+ - все накопившиеся у зрителя кадры уходят одним websocket-сообщением (пачкой)
+ - отправкой каждому зрителю занимается своя задача: медленный зритель
+   задерживает только себя
+Кадр: FRAME_HEADER (тип, номер, время публикации time.perf_counter()) + protocol.SNAPSHOT.
+
+Запуск отдельно (демо-партия с ботом): python spectator.py --port 8766
+'''
+
+MSG_SPECTATE = 6
+FRAME_HEADER = struct.Struct("<BId")  # тип, номер кадра, время публикации
+FRAME_SIZE = FRAME_HEADER.size + SNAPSHOT.size
+DEFAULT_PORT = 8766
+# Буферы отправки на зрителя (сокет и websockets), байт: пока они не заполнены,
+# send() не ждёт и кадры не выбрасываются — поэтому маленькие (десяток кадров)
+SEND_BUFFER = 4096
+WRITE_LIMIT = 512
+
+
+def encode_frame(seq, values, timestamp):
+    return FRAME_HEADER.pack(MSG_SPECTATE, seq, timestamp) + SNAPSHOT.pack(*values)
+
+
+def decode_frames(data):
+    """Кадры пачки: [(номер, время публикации, значения снимка)]"""
+    frames = []
+    for offset in range(0, len(data), FRAME_SIZE):
+        _, seq, timestamp = FRAME_HEADER.unpack_from(data, offset)
+        frames.append((seq, timestamp, SNAPSHOT.unpack_from(data, offset + FRAME_HEADER.size)))
+    return frames
+
+
+class _Spectator:
+    def __init__(self, websocket, queue_size):
+        self.websocket = websocket
+        self.queue = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def push(self, frame):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1  # самый старый кадр вытесняется
+        self.queue.append(frame)
+        self.ready.set()
+
+    async def writer(self):
+        websocket = self.websocket
+        queue = self.queue
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            if not queue:
+                continue
+            frames = list(queue)
+            queue.clear()
+            try:
+                await websocket.send(frames[0] if len(frames) == 1 else b"".join(frames))
+            except ConnectionClosed:
+                return
+            self.sent += len(frames)
+            self.batches += 1
+
+
+# --- Раскладка управляющего блока в общей памяти (int64) ---
+_CTRL_SEQ = 0          # seqlock кадра: нечётный — идёт запись
+_CTRL_STOP = 1         # флаг остановки сервера
+_CTRL_PORT = 2         # порт, который слушает сервер (для port=0)
+_CTRL_SPECTATORS = 3   # подключено зрителей
+_CTRL_SENT = 4         # кадров отправлено (всего)
+_CTRL_DROPPED = 5      # кадров выброшено у медленных зрителей (всего)
+_CTRL_CPU_NS = 6       # процессорное время процесса сервера
+_CTRL_SIZE = 7
+
+
+def _read_frame(ctrl, buf, last_seq):
+    """Кадр под seqlock: (seq, bytes) или (last_seq, None), если нового нет."""
+    while True:
+        seq = int(ctrl[_CTRL_SEQ])
+        if seq == last_seq:
+            return last_seq, None
+        if seq % 2:
+            continue
+        data = bytes(buf[:FRAME_SIZE])
+        if ctrl[_CTRL_SEQ] == seq:
+            return seq, data
+
+
+class _Broadcaster:
+    """Сторона процесса сервера: websockets и раздача кадров зрителям."""
+
+    def __init__(self, ctrl, buf, frame_event, queue_size):
+        self.ctrl = ctrl
+        self.buf = buf
+        self.frame_event = frame_event
+        self.queue_size = queue_size
+        self.spectators = set()
+        self.frame = None
+        self.last_seq = 0
+        self.sent = 0
+        self.dropped = 0
+
+    async def handler(self, websocket):
+        # Небольшой буфер отправки: отставание медленного зрителя копится не в ядре,
+        # а в его очереди, где старые кадры выбрасываются
+        sock = websocket.transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        spectator = _Spectator(websocket, self.queue_size)
+        if self.frame is not None:
+            spectator.push(self.frame)  # сразу последнее состояние
+        self.spectators.add(spectator)
+        self.ctrl[_CTRL_SPECTATORS] = len(self.spectators)
+        writer = asyncio.create_task(spectator.writer())
+        try:
+            # Зрители ничего не присылают — ждём закрытия соединения
+            async for _ in websocket:
+                pass
+        except ConnectionClosed:
+            pass
+        finally:
+            self.spectators.discard(spectator)
+            self.ctrl[_CTRL_SPECTATORS] = len(self.spectators)
+            writer.cancel()
+            self.sent += spectator.sent
+            self.dropped += spectator.dropped
+
+    def fanout(self):
+        self.last_seq, frame = _read_frame(self.ctrl, self.buf, self.last_seq)
+        if frame is not None:
+            self.frame = frame
+            for spectator in self.spectators:
+                spectator.push(frame)
+        self.update_stats()
+
+    def update_stats(self):
+        ctrl = self.ctrl
+        ctrl[_CTRL_SENT] = self.sent + sum(s.sent for s in self.spectators)
+        ctrl[_CTRL_DROPPED] = self.dropped + sum(s.dropped for s in self.spectators)
+        ctrl[_CTRL_CPU_NS] = time.process_time_ns()
+
+    def wait_frames(self, loop):
+        """
+        Поток ожидания: будит event loop, когда игра опубликовала кадр
+        (без кадров — раз в 0.1 сек обновляет счётчики).
+        """
+        while not self.ctrl[_CTRL_STOP]:
+            if self.frame_event.wait(0.1):
+                self.frame_event.clear()
+                loop.call_soon_threadsafe(self.fanout)
+            else:
+                loop.call_soon_threadsafe(self.update_stats)
+
+    async def serve(self, host, port, ready_event):
+        loop = asyncio.get_running_loop()
+        server = await serve(self.handler, host, port, compression=None, write_limit=WRITE_LIMIT,
+                             close_timeout=1.0)
+        self.ctrl[_CTRL_PORT] = server.sockets[0].getsockname()[1]
+        ready_event.set()
+        await loop.run_in_executor(None, self.wait_frames, loop)
+        server.close()
+        await server.wait_closed()
+
+
+def _server_process(names, host, port, queue_size, frame_event, ready_event):
+    ctrl_shm = shared_memory.SharedMemory(name=names[0])
+    frame_shm = shared_memory.SharedMemory(name=names[1])
+    ctrl = np.ndarray((_CTRL_SIZE,), dtype=np.int64, buffer=ctrl_shm.buf)
+    broadcaster = _Broadcaster(ctrl, frame_shm.buf, frame_event, queue_size)
+    try:
+        asyncio.run(broadcaster.serve(host, port, ready_event))
+    finally:
+        del ctrl, broadcaster
+        ctrl_shm.close()
+        frame_shm.close()
+
+
+class SpectatorServer:
+    def __init__(self, host="localhost", port=DEFAULT_PORT, queue_size=4, start_method="spawn"):
+        """
+        Сервер зрителей в отдельном процессе: игровой поток только пишет кадр
+        в общую память (как кадры в inference.ProcessInference) и будит сервер —
+        сеть и раздача не конкурируют с игрой за GIL.
+        :param queue_size: сколько кадров держать для зрителя, который не успевает
+                           (1 — только самый свежий)
+        """
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.start_method = start_method
+        self.seq = 0
+        self.published = 0
+        self.publish_time = 0.0  # суммарное время publish() в игровом потоке
+        self.publish_cpu = 0.0  # и процессорное время потока на него
+        self._process = None
+
+    def start(self, timeout=10.0):
+        self._ctrl_shm = shared_memory.SharedMemory(create=True, size=_CTRL_SIZE * 8)
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=FRAME_SIZE)
+        self._ctrl = np.ndarray((_CTRL_SIZE,), dtype=np.int64, buffer=self._ctrl_shm.buf)
+        self._ctrl[:] = 0
+        self._frame = self._frame_shm.buf
+        context = multiprocessing.get_context(self.start_method)
+        self._frame_event = context.Event()
+        ready_event = context.Event()
+        self._process = context.Process(
+            target=_server_process,
+            args=((self._ctrl_shm.name, self._frame_shm.name), self.host, self.port, self.queue_size,
+                  self._frame_event, ready_event),
+            name="SpectatorServer",
+            daemon=True,
+        )
+        self._process.start()
+        if not ready_event.wait(timeout):
+            self.stop()
+            raise TimeoutError("Сервер зрителей не запустился")
+        self.port = int(self._ctrl[_CTRL_PORT])
+        return self
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._ctrl[_CTRL_STOP] = 1
+        self._frame_event.set()
+        self._process.join(timeout=5.0)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+        del self._ctrl, self._frame
+        for shm in (self._ctrl_shm, self._frame_shm):
+            shm.close()
+            shm.unlink()
+
+    def publish(self, state):
+        """
+        Из игрового цикла: отправить зрителям текущее состояние (GameState).
+        Не ждёт сети и сервера: кадр пишется в общую память под seqlock
+        (следующий кадр просто перезаписывает предыдущий), сервер будится событием.
+        """
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        self.seq += 1
+        frame = encode_frame(self.seq, snapshot(state), start)
+        ctrl = self._ctrl
+        ctrl[_CTRL_SEQ] += 1  # нечётный: запись началась
+        self._frame[:FRAME_SIZE] = frame
+        ctrl[_CTRL_SEQ] += 1  # чётный: запись закончена
+        self._frame_event.set()
+        self.published += 1
+        self.publish_cpu += time.thread_time() - cpu_start
+        self.publish_time += time.perf_counter() - start
+
+    def cpu_time(self):
+        """Процессорное время процесса сервера на момент последней раздачи (сек)."""
+        return int(self._ctrl[_CTRL_CPU_NS]) / 1e9
+
+    def stats(self):
+        ctrl = self._ctrl
+        return {
+            "spectators": int(ctrl[_CTRL_SPECTATORS]),
+            "published": self.published,
+            "sent": int(ctrl[_CTRL_SENT]),
+            "dropped": int(ctrl[_CTRL_DROPPED]),
+            "publish_us": self.publish_time / self.published * 1e6 if self.published else 0.0,
+            "publish_cpu_us": self.publish_cpu / self.published * 1e6 if self.published else 0.0,
+        }
+
+
+def main(argv=None):
+    from engine import Engine, tracking_player
+
+    parser = argparse.ArgumentParser(description="Трансляция демо-партии зрителям")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    server = SpectatorServer(args.host, args.port).start()
+    print(f"Зрители: ws://{args.host}:{server.port}")
+    engine = Engine()
+    engine.reset()
+    player = tracking_player()
+    try:
+        while True:
+            engine.step(player(engine.state))
+            if engine.state.winner is not None:
+                engine.reset()
+            server.publish(engine.state)
+            time.sleep(1 / 60)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+import pygame
+
+
+'''
+Кэш масштабированных и отражённых спрайтов:
+ - вместо pygame.transform.* на каждый кадр — готовая поверхность из кэша
+ - перспективный масштаб квантуется до фиксированного набора уровней (mip levels),
+   поэтому различных размеров немного и все они попадают в кэш
+ - отражённые варианты (анимация босса) можно посчитать заранее через preload()
+ - кэш ограничен (LRU): самые давно не использованные поверхности вытесняются
+SpriteStats показывает попадания/промахи: в установившемся режиме промахов нет,
+значит, новых поверхностей за кадр не создаётся.
+'''
+
+
+def quantize(value, low, high, levels):
+    """Ближайший из levels равномерных уровней на [low, high] (value обрезается по краям)."""
+    if levels < 2:
+        return high
+    value = max(low, min(high, value))
+    step = (high - low) / (levels - 1)
+    return low + round((value - low) / step) * step
+
+
+def mip_levels(low, high, levels):
+    """Все уровни quantize(..., low, high, levels) по возрастанию."""
+    if levels < 2:
+        return [high]
+    step = (high - low) / (levels - 1)
+    return [low + i * step for i in range(levels)]
+
+
+class SpriteStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0  # = сколько поверхностей создано
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class SpriteCache:
+    def __init__(self, max_entries=64):
+        """
+        :param max_entries: сколько поверхностей держать, прежде чем вытеснять старые
+        """
+        self.max_entries = max_entries
+        self.stats = SpriteStats()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, factory):
+        """Поверхность по ключу; при промахе создаётся factory() и кладётся в кэш."""
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return surface
+        self.stats.misses += 1
+        surface = factory()
+        self._entries[key] = surface
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return surface
+
+    def scaled(self, name, image, size, flip_x=False, smooth=True):
+        """
+        image, приведённая к size (и отражённая по горизонтали при flip_x).
+        :param name: имя исходного изображения — часть ключа кэша
+        :param smooth: smoothscale (качественнее) или scale (быстрее)
+        """
+        size = (int(size[0]), int(size[1]))
+
+        def make():
+            if size == image.get_size():
+                surface = image.copy()
+            elif smooth:
+                surface = pygame.transform.smoothscale(image, size)
+            else:
+                surface = pygame.transform.scale(image, size)
+            return pygame.transform.flip(surface, True, False) if flip_x else surface
+        return self.get((name, size, flip_x), make)
+
+    def preload(self, name, image, sizes, flips=(False,), smooth=True):
+        """Заранее кладёт в кэш все сочетания размеров и отражений."""
+        for size in sizes:
+            for flip_x in flips:
+                self.scaled(name, image, size, flip_x, smooth)
+
+    def clear(self):
+        self._entries.clear()
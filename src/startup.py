@@ -0,0 +1,121 @@
+import threading
+import time
+
+
+'''
+Запуск игры по стадиям: первый кадр (заставка) рисуется сразу, а тяжёлое —
+декодирование звуков, загрузка и масштабирование картинок, загрузка модели
+Mediapipe с пробным инференсом, открытие камеры — идёт в фоновых потоках.
+Главный поток тем временем рисует заставку с прогрессом.
+ - run(name, fn) — задача в своём потоке (daemon: закрытие окна не ждёт камеру)
+ - mark(name) — отметка времени от старта (first_frame, playable)
+ - result(name) — результат задачи; исключение из потока поднимается здесь
+ - report() / format_report() — время каждой задачи и отметок (флаг --startup-report)
+Всё время — от start (по умолчанию — создание Startup; game.py передаёт момент
+самого первого импорта).
+'''
+
+
+class StartupTask:
+    def __init__(self, name, fn, args, start):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.start = start  # время запуска от старта (сек)
+        self.end = None
+        self.value = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name=f"startup-{name}", daemon=True)
+
+    def _run(self):
+        try:
+            self.value = self.fn(*self.args)
+        except BaseException as e:  # поднимется в главном потоке в result()
+            self.error = e
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    @property
+    def duration(self):
+        return None if self.end is None else self.end - self.start
+
+
+class Startup:
+    def __init__(self, start=None, clock=time.perf_counter):
+        """
+        :param start: момент старта по clock (по умолчанию — сейчас)
+        :param clock: часы (подменяются в тестах)
+        """
+        self.clock = clock
+        self.start = clock() if start is None else start
+        self.tasks = {}
+        self.marks = {}
+
+    def elapsed(self):
+        return self.clock() - self.start
+
+    def mark(self, name):
+        """Отметка стадии запуска (сек от старта)."""
+        self.marks[name] = self.elapsed()
+        return self.marks[name]
+
+    def run(self, name, fn, *args):
+        """Запускает задачу в фоновом потоке."""
+        task = StartupTask(name, fn, args, self.elapsed())
+        task.thread.start()
+        self.tasks[name] = task
+        return task
+
+    def poll(self):
+        """Отмечает время окончания завершившихся задач; :return: все ли готовы."""
+        finished = True
+        for task in self.tasks.values():
+            if task.done:
+                if task.end is None:
+                    task.end = self.elapsed()
+            else:
+                finished = False
+        return finished
+
+    def progress(self):
+        """Доля готовых задач (0..1)."""
+        if not self.tasks:
+            return 1.0
+        return sum(task.done for task in self.tasks.values()) / len(self.tasks)
+
+    def pending(self):
+        """Имена задач, которые ещё идут."""
+        return [name for name, task in self.tasks.items() if not task.done]
+
+    def result(self, name):
+        """Ждёт задачу и возвращает её результат (исключение задачи поднимается)."""
+        task = self.tasks[name]
+        task.thread.join()
+        if task.end is None:
+            task.end = self.elapsed()
+        if task.error is not None:
+            raise task.error
+        return task.value
+
+    def report(self):
+        """{"tasks": {имя: {start, end, duration}}, "marks": {имя: сек}} — всё в секундах от старта."""
+        self.poll()
+        return {
+            "tasks": {name: {"start": task.start, "end": task.end, "duration": task.duration}
+                      for name, task in self.tasks.items()},
+            "marks": dict(self.marks),
+        }
+
+    def format_report(self):
+        """Таблица для консоли: задачи и отметки в мс."""
+        report = self.report()
+        lines = [f"{'стадия':<14}{'начало':>10}{'конец':>10}{'длит.':>10}"]
+        for name, task in report["tasks"].items():
+            end = "—" if task["end"] is None else f"{task['end'] * 1000:.0f}"
+            duration = "—" if task["duration"] is None else f"{task['duration'] * 1000:.0f}"
+            lines.append(f"{name:<14}{task['start'] * 1000:>10.0f}{end:>10}{duration:>10}")
+        for name, value in report["marks"].items():
+            lines.append(f"{name:<14}{'':>10}{value * 1000:>10.0f}")
+        return "\n".join(lines)
@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+from inference import NUM_LANDMARKS
+
+
+'''
+Взмах рукой для удара: по истории всех 21 landmarks считается скорость кисти.
+ - LandmarkHistory — кольцевой буфер (capacity, 21, 3) float32 и времена захвата,
+   выделяется один раз; push() копирует landmarks руки в следующую ячейку
+ - velocity() — наклон прямой по методу наименьших квадратов по замерам последних
+   window секунд сразу для всех landmarks (одна операция numpy), скорость кисти —
+   среднее по точкам ладони (запястье и основания пальцев): так дрожание отдельных
+   пальцев почти не влияет
+ - взмах считается, пока история свежая: последний замер не старше 1.5 обычных
+   интервалов между замерами плюс задержка конвейера — при инференсе 10 Гц и 60 Гц
+   порог свой, а пропавшая рука перестаёт бить по мячу через полтора пропуска
+ - Swing — скорость (нормализованные ед./сек), модуль и направление взмаха
+Engine.set_swing() переводит скорость в пиксели за шаг: от неё зависят сила и угол удара.
+'''
+
+# Запястье и основания пальцев — точки, которые двигаются вместе с ракеткой
+PALM_LANDMARKS = (0, 5, 9, 13, 17)
+
+
+class Swing:
+    def __init__(self, vx=0.0, vy=0.0):
+        self.vx = vx  # нормализованные ед. кадра в секунду (y — вниз)
+        self.vy = vy
+
+    @property
+    def speed(self):
+        return math.hypot(self.vx, self.vy)
+
+    @property
+    def angle(self):
+        """Направление взмаха (радианы, atan2 в координатах кадра: -pi/2 — вверх)."""
+        return math.atan2(self.vy, self.vx)
+
+    def __repr__(self):
+        return f"Swing(vx={self.vx:.2f}, vy={self.vy:.2f})"
+
+
+NO_SWING = Swing()
+
+
+class LandmarkHistory:
+    def __init__(self, capacity=16):
+        """:param capacity: сколько последних результатов хранить (16 ≈ 0.5 сек при 30 Гц)"""
+        self.capacity = capacity
+        self.landmarks = np.zeros((capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # сколько замеров записано за всё время
+        self._palm = np.asarray(PALM_LANDMARKS)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        self.count = 0
+
+    @property
+    def last_time(self):
+        return self.times[(self.count - 1) % self.capacity] if self.count else None
+
+    def push(self, t, landmarks):
+        """Добавляет landmarks руки (21, 3), полученные по кадру, захваченному в t."""
+        if self.count and t <= self.last_time:
+            return  # тот же результат ещё раз
+        i = self.count % self.capacity
+        np.copyto(self.landmarks[i], landmarks)
+        self.times[i] = t
+        self.count += 1
+
+    @property
+    def interval(self):
+        """Обычный интервал между замерами истории (медиана, сек) или None, если замеров меньше двух."""
+        n = len(self)
+        if n < 2:
+            return None
+        order = (np.arange(self.count - n, self.count)) % self.capacity
+        return float(np.median(np.diff(self.times[order])))
+
+    def _window(self, window):
+        """Индексы замеров последних window секунд (от последнего замера)."""
+        n = len(self)
+        order = (np.arange(self.count - n, self.count)) % self.capacity
+        return order[self.times[order] >= self.times[order[-1]] - window]
+
+    def velocities(self, window=0.1):
+        """Скорости всех landmarks (21, 3) в ед./сек по замерам последних window секунд (или None)."""
+        if len(self) < 2:
+            return None
+        index = self._window(window)
+        if len(index) < 2:
+            index = (np.arange(self.count - 2, self.count)) % self.capacity
+        t = self.times[index]
+        t = t - t.mean()
+        denominator = float(np.dot(t, t))
+        if denominator <= 0:
+            return None
+        points = self.landmarks[index]
+        # Наклон МНК: sum(t * (p - mean(p))) / sum(t^2) для всех точек сразу
+        return np.tensordot(t, points - points.mean(axis=0), axes=1) / denominator
+
+    def swing(self, window=0.1, now=None, max_age=None, latency=0.0):
+        """
+        Взмах кисти по последним window секундам.
+        :param now: текущее время; если последний замер старше max_age — взмаха нет
+                    (рука потерялась, старая скорость не должна ударить по мячу)
+        :param max_age: по умолчанию — 1.5 * interval + latency
+        :param latency: задержка конвейера: от захвата кадра до результата (сек)
+        """
+        if self.count < 2:
+            return NO_SWING
+        if max_age is None:
+            max_age = 1.5 * self.interval + latency
+        if now is not None and now - self.last_time > max_age:
+            return NO_SWING
+        velocities = self.velocities(window)
+        if velocities is None:
+            return NO_SWING
+        vx, vy = velocities[self._palm, :2].mean(axis=0)
+        return Swing(float(vx), float(vy))
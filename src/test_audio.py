@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from audio import AudioManager, load_sound
+
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "sound")
+LONG_SOUND = os.path.join(SOUND_DIR, "11l.mp3")  # ~8 сек: всё время теста звучит
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAudioManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.mixer.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.mixer.quit()
+
+    def tearDown(self):
+        pygame.mixer.stop()
+
+    def test_events_and_dedupe(self):
+        """Звук только по событию; повтор чаще min_interval отбрасывается"""
+        clock = FakeClock()
+        audio = AudioManager(channels=4, clock=clock)
+        audio.load("hit", LONG_SOUND, min_interval=0.05)
+        audio.bind("paddle_hit", "hit")
+        self.assertIsNone(audio.trigger("no_sound_event"))
+        self.assertIsNotNone(audio.trigger("paddle_hit"))
+        clock.now = 0.01
+        self.assertIsNone(audio.trigger("paddle_hit"))
+        clock.now = 0.1
+        self.assertIsNotNone(audio.trigger("paddle_hit"))
+        self.assertEqual(audio.stats.plays, 2)
+        self.assertEqual(audio.stats.deduped, 1)
+
+    def test_exclusive_plays_once(self):
+        """Звук конца партии при вызове в каждом кадре меню звучит один раз"""
+        clock = FakeClock()
+        audio = AudioManager(channels=4, clock=clock)
+        audio.load("match_lost", LONG_SOUND, exclusive=True)
+        for frame in range(60):
+            clock.now = frame / 60
+            audio.play("match_lost")
+        self.assertEqual(audio.stats.plays, 1)
+        self.assertEqual(audio.busy_channels(), 1)
+        audio.stop("match_lost")
+        self.assertEqual(audio.busy_channels(), 0)
+
+    def test_channel_pool_priorities(self):
+        """Пул из 2 каналов: важный звук вытесняет самый старый неважный, неважный не вытесняет важный"""
+        clock = FakeClock()
+        audio = AudioManager(channels=2, clock=clock)
+        self.assertGreaterEqual(pygame.mixer.get_num_channels(), 2)
+        audio.load("hit", LONG_SOUND, priority=1)
+        audio.load("point", LONG_SOUND, priority=2)
+        first = audio.play("hit")
+        clock.now = 1.0
+        audio.play("hit")
+        clock.now = 2.0
+        self.assertIs(audio.play("point"), first)  # вытеснен самый старый удар
+        self.assertEqual(audio.stats.stolen, 1)
+        clock.now = 3.0
+        audio.play("point")  # вытесняет оставшийся удар
+        clock.now = 4.0
+        self.assertIsNone(audio.play("hit"))
+        self.assertEqual(audio.stats.dropped, 1)
+        self.assertEqual(audio.busy_channels(), 2)
+
+    def test_pcm_cache(self):
+        """Второй запуск берёт PCM из кэша — тот же звук без декодирования mp3"""
+        path = os.path.join(SOUND_DIR, "2.mp3")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            decoded, hit = load_sound(path, cache_dir)
+            self.assertFalse(hit)
+            cached, hit = load_sound(path, cache_dir)
+            self.assertTrue(hit)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertEqual(decoded.get_raw(), cached.get_raw())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
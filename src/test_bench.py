@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from bench import compare, load_baseline, main, regressions, save_json
+
+
+class TestBenchCompare(unittest.TestCase):
+    def test_direction_and_threshold(self):
+        baseline = {"physics": {"steps_per_sec": 1000.0, "ms_per_frame": 2.0}}
+        report = compare({"physics": {"steps_per_sec": 850.0, "ms_per_frame": 2.6}}, baseline, threshold=0.2)
+        self.assertAlmostEqual(report["physics"]["steps_per_sec"]["change"], -0.15)
+        self.assertFalse(report["physics"]["steps_per_sec"]["regression"])
+        self.assertAlmostEqual(report["physics"]["ms_per_frame"]["change"], -0.3)
+        self.assertTrue(report["physics"]["ms_per_frame"]["regression"])
+        self.assertEqual([(s, m) for s, m, _ in regressions(report)], [("physics", "ms_per_frame")])
+
+    def test_faster_is_not_regression(self):
+        report = compare({"render": {"ms_per_frame": 0.5, "frames_per_sec": 900.0}},
+                         {"render": {"ms_per_frame": 1.0, "frames_per_sec": 300.0}})
+        self.assertEqual(regressions(report), [])
+        self.assertGreater(report["render"]["ms_per_frame"]["change"], 0)
+
+    def test_new_metric_and_noise_floor(self):
+        """Метрики без baseline и шум в байтах аллокаций не считаются регрессией"""
+        report = compare({"preview": {"new_per_sec": 1.0, "peak_alloc_bytes": 300}},
+                         {"preview": {"peak_alloc_bytes": 100}})
+        self.assertIsNone(report["preview"]["new_per_sec"]["baseline"])
+        self.assertEqual(regressions(report), [])
+
+    def test_cli_exit_code(self):
+        """Регрессия относительно baseline даёт код выхода 1"""
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            output = os.path.join(tmp, "results.json")
+            args = ["physics", "--quick", "--repeat", "1", "--baseline", baseline, "--output", output]
+            self.assertEqual(main(args + ["--save-baseline"]), 0)
+            results, threshold = load_baseline(baseline)
+            self.assertIn("scalar_steps_per_sec", results["physics"])
+            results["physics"] = {metric: value * 10 for metric, value in results["physics"].items()}
+            save_json(baseline, {"threshold": threshold, "results": results})
+            self.assertEqual(main(args), 1)
+            self.assertTrue(os.path.exists(output))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
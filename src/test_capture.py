@@ -0,0 +1,131 @@
+import threading
+import unittest
+import time
+from capture import ThreadedCapture, SyntheticCapture
+
+
+class SlowCapture(SyntheticCapture):
+    """Камера, которая периодически "зависает" (имитация рывков USB/экспозиции)"""
+
+    def __init__(self, stall_every, stall_time, **kwargs):
+        super().__init__(**kwargs)
+        self.stall_every = stall_every
+        self.stall_time = stall_time
+
+    def read(self):
+        if self.frame_index and self.frame_index % self.stall_every == 0:
+            time.sleep(self.stall_time)
+        return super().read()
+
+
+class TestThreadedCapture(unittest.TestCase):
+    def test_synthetic_capture_limits(self):
+        """Синтетическая камера выдаёт ровно max_frames кадров"""
+        cap = SyntheticCapture(width=64, height=48, max_frames=3, realtime=False)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+        self.assertEqual([f[0, 0, 0] for f in frames], [0, 1, 2])
+
+    def test_latest_frame_wins(self):
+        """Медленный потребитель получает самые свежие кадры, старые считаются пропущенными"""
+        cap = ThreadedCapture(SyntheticCapture(width=64, height=48, fps=500)).start()
+        try:
+            ids = []
+            for _ in range(5):
+                time.sleep(0.02)
+                ret, frame = cap.read()
+                self.assertTrue(ret)
+                ids.append(cap.last_frame_id)
+        finally:
+            cap.release()
+
+        stats = cap.stats
+        print("\nLatest frame wins:", stats.as_dict())
+        self.assertEqual(ids, sorted(ids))
+        self.assertGreater(stats.frames_dropped, 0)
+        # Каждый захваченный кадр либо отдан, либо пропущен (последний может быть не забран)
+        self.assertLessEqual(stats.frames_captured - stats.frames_consumed - stats.frames_dropped, 1)
+
+    def test_read_does_not_block_on_stall(self):
+        """Зависание камеры не блокирует чтение: возвращается последний кадр"""
+        source = SlowCapture(stall_every=2, stall_time=0.2, width=64, height=48, fps=1000)
+        cap = ThreadedCapture(source).start()
+        try:
+            cap.read()  # первый кадр можно подождать
+            start = time.perf_counter()
+            for _ in range(50):
+                ret, frame = cap.read()
+                self.assertTrue(ret)
+            elapsed = time.perf_counter() - start
+        finally:
+            cap.release()
+
+        self.assertLess(elapsed, 0.1)
+        self.assertGreater(cap.stats.frames_reused, 0)
+
+    def test_source_exhausted(self):
+        """После окончания источника и выдачи последнего кадра захват закрывается"""
+        cap = ThreadedCapture(SyntheticCapture(width=32, height=24, max_frames=1, realtime=False)).start()
+        ret, frame = cap.read()
+        self.assertTrue(ret)
+        cap._thread.join(timeout=1.0)
+        self.assertFalse(cap.isOpened())
+        cap.release()
+
+    def test_source_error_stops_capture(self):
+        """read() источника бросил исключение: поток останавливается, владелец видит ошибку"""
+        class BrokenCapture(SyntheticCapture):
+            def read(self):
+                if self.frame_index >= 3:
+                    raise OSError("камера отключена")
+                return super().read()
+
+        cap = ThreadedCapture(BrokenCapture(realtime=False)).start()
+        cap._thread.join(timeout=2.0)
+        self.assertFalse(cap._thread.is_alive())
+        self.assertIsInstance(cap.error, OSError)
+        self.assertTrue(cap.isOpened())  # владелец ещё вызовет read() и получит ошибку
+        with self.assertRaises(RuntimeError):
+            cap.read()
+        cap.release()
+
+    def test_release_while_read_blocked(self):
+        """Поток висит в read() дольше таймаута join: источник освобождает сам поток, после read()"""
+        class BlockingSource(SyntheticCapture):
+            def __init__(self):
+                super().__init__(width=32, height=24, realtime=False)
+                self.unblock = threading.Event()
+                self.events = []
+
+            def read(self):
+                if self.frame_index == 1:
+                    self.unblock.wait()
+                    self.events.append("read_done")
+                return super().read()
+
+            def release(self):
+                self.events.append("release")
+                super().release()
+
+        source = BlockingSource()
+        cap = ThreadedCapture(source).start()
+        cap.read()
+        start = time.perf_counter()
+        cap.release()  # join ждёт 1 сек и сдаётся
+        self.assertGreaterEqual(time.perf_counter() - start, 0.9)
+        self.assertEqual(source.events, [])
+        cap.release()  # повторный вызов не освобождает источник из-под потока
+        self.assertEqual(source.events, [])
+        source.unblock.set()
+        cap._thread.join(timeout=1.0)
+        self.assertEqual(source.events, ["read_done", "release"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
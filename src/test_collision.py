@@ -0,0 +1,78 @@
+import unittest
+
+from collision import point_at, sweep_box, sweep_rect
+from physics import BallPhysics
+
+
+class TestSweep(unittest.TestCase):
+    def test_sweep_box_time_of_impact(self):
+        """Момент касания и грань для отрезка, пролетающего бокс насквозь"""
+        t, axis, normal = sweep_box((0, 5), (100, 0), (40, 0), (60, 10))
+        self.assertAlmostEqual(t, 0.4)
+        self.assertEqual((axis, normal), (0, -1))
+
+    def test_sweep_box_miss_and_inside(self):
+        self.assertIsNone(sweep_box((0, 20), (100, 0), (40, 0), (60, 10)))
+        self.assertIsNone(sweep_box((0, 5), (30, 0), (40, 0), (60, 10)))
+        self.assertEqual(sweep_box((50, 5), (1, 1), (40, 0), (60, 10)), (0.0, -1, 0))
+
+    def test_sweep_rect_with_radius(self):
+        """Мяч радиуса 12 задевает ракетку краем"""
+        rect = (100, 100, 70, 70)
+        hit = sweep_rect((190, 500), (190, -500), rect, radius=12)
+        self.assertIsNone(hit)
+        hit = sweep_rect((180, 1000), (180, -1000), rect, radius=12)
+        self.assertIsNotNone(hit)
+        contact = point_at((180, 1000), (180, -1000), hit[0])
+        self.assertAlmostEqual(contact[1], 100 + 70 + 12)
+
+
+class TestContinuousPhysics(unittest.TestCase):
+    def make_ball(self, state):
+        ball = BallPhysics(800, 600, 50, continuous=True)
+        ball.set_state(state)
+        return ball
+
+    def test_no_tunneling_through_net(self):
+        """Низкий мяч на огромной скорости отскакивает от сетки, а не пролетает её"""
+        for speed in (50, 500, 5000, 50000):
+            ball = self.make_ball((400, 400, 10, 0, -speed, 0))
+            ball.gravity = 0
+            net_hit = ball.update(1)
+            self.assertTrue(net_hit, msg=f"speed={speed}")
+            self.assertGreaterEqual(ball.y, 300 + 80, msg=f"speed={speed}")
+            self.assertGreater(ball.vy, 0)
+
+    def test_discrete_mode_tunnels(self):
+        """Для сравнения: проверка конечной точки пропускает сетку"""
+        ball = BallPhysics(800, 600, 50)
+        ball.set_state((400, 550, 10, 0, -5000, 0))
+        ball.gravity = 0
+        self.assertFalse(ball.update(1))
+        self.assertLess(ball.y, 300 - 80)
+
+    def test_stays_inside_walls_and_above_table(self):
+        """При любых скоростях и больших dt мяч не уходит за стенку, борта и стол"""
+        for vx, vy, vz in ((30000, -1000, -40000), (-25000, -70000, 5000), (1, -90000, -90000)):
+            ball = self.make_ball((400, 250, 100, vx, vy, vz))
+            for _ in range(20):
+                ball.update(10)
+                self.assertTrue(0 <= ball.x <= 800, msg=ball.get_state())
+                self.assertGreaterEqual(ball.y, 0, msg=ball.get_state())
+                self.assertGreaterEqual(ball.z, 0, msg=ball.get_state())
+
+    def test_matches_discrete_at_low_speed(self):
+        """На обычных скоростях без касаний swept-режим совпадает с обычным"""
+        state = (400, 550, 20, 1, -2, 3)
+        discrete = BallPhysics(800, 600, 50)
+        discrete.set_state(state)
+        swept = self.make_ball(state)
+        for _ in range(5):
+            discrete.update(1)
+            swept.update(1)
+        for a, b in zip(discrete.get_state(), swept.get_state()):
+            self.assertAlmostEqual(a, b)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
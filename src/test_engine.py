@@ -0,0 +1,130 @@
+import unittest
+
+from engine import (BALL_TOP_Y, BOSS_HIT, BOSS_WIDTH, OPPONENT_POINT, PADDLE_HIT, PLAYER_POINT,
+                    TABLE_BOTTOM_Y, WIDTH, WIN_SCORE, Engine, Inputs, run_headless, tracking_player)
+
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = Engine(seed=1)
+        self.engine.reset()
+        self.state = self.engine.state
+
+    def test_same_seed_same_game(self):
+        """Одинаковые seed и поток ввода — одинаковая партия"""
+        def play(seed):
+            engine = Engine(seed=seed)
+            engine.reset()
+            player = tracking_player(seed=seed)
+            log = []
+            for _ in range(3000):
+                log.append((tuple(engine.state.ball_pos), engine.state.boss_x,
+                            tuple(engine.step(player(engine.state)))))
+            return log
+        self.assertEqual(play(5), play(5))
+        self.assertNotEqual(play(5), play(6))
+
+    def test_paddle_hit_sends_ball_up(self):
+        s = self.state
+        s.ball_pos = [WIDTH // 2, 580]
+        s.ball_velocity = [0, 6]
+        self.engine.set_paddle((0.5, 0.75))  # ракетка в зоне удара, мяч летит в её центр
+        s.prev_paddle_pos = list(s.paddle_pos)
+        events = []
+        for _ in range(5):
+            events += self.engine.step()
+        self.assertIn(PADDLE_HIT, events)
+        self.assertLess(s.ball_velocity[1], 0)
+
+    def hit_velocity(self, swing):
+        """Скорость мяча после удара в центр ракетки при взмахе swing (нормализованные ед./сек)."""
+        engine = Engine(seed=1)
+        engine.reset()
+        s = engine.state
+        s.ball_pos = [WIDTH // 2, 580]
+        s.ball_velocity = [0, 6]
+        engine.set_paddle((0.5, 0.75))
+        s.prev_paddle_pos = list(s.paddle_pos)
+        for _ in range(5):
+            if PADDLE_HIT in engine.step(Inputs((0.5, 0.75), swing=swing)):
+                return list(s.ball_velocity)
+        self.fail("удара не было")
+
+    def test_swing_sets_power_and_angle(self):
+        """Взмах вверх — удар сильнее (с ограничением), взмах вбок — мяч уходит в ту же сторону"""
+        still = self.hit_velocity((0.0, 0.0))
+        self.assertEqual(still, [0.0, -6 * 1.2])  # без взмаха — как раньше
+        up = self.hit_velocity((0.0, -0.5))
+        self.assertLess(up[1], still[1])
+        self.assertLess(self.hit_velocity((0.0, -1.0))[1], up[1])
+        self.assertAlmostEqual(self.hit_velocity((0.0, -10.0))[1], -6 * 1.2 * 1.5)
+        self.assertGreater(self.hit_velocity((1.0, 0.0))[0], 0)
+        self.assertLess(self.hit_velocity((-1.0, 0.0))[0], 0)
+        self.assertEqual(self.hit_velocity((0.0, 1.0))[1], still[1])  # взмах вниз не ослабляет
+
+    def test_inactive_paddle_does_not_hit(self):
+        s = self.state
+        self.engine.set_paddle((0.5, 0.95))  # ниже зоны удара
+        self.assertFalse(s.paddle_active)
+        s.prev_paddle_pos = list(s.paddle_pos)
+        s.ball_pos = [s.paddle_pos[0] + 70, s.paddle_pos[1] - 10]
+        s.ball_velocity = [0, 6]
+        events = []
+        for _ in range(40):
+            events += self.engine.step()
+        self.assertNotIn(PADDLE_HIT, events)
+        self.assertIn(OPPONENT_POINT, events)
+        self.assertEqual(s.opponent_score, 1)
+
+    def test_boss_hit_or_point(self):
+        """У верхней границы мяч либо отбивает босс, либо игрок получает очко и новая подача"""
+        s = self.state
+        s.boss_x = WIDTH // 2 - BOSS_WIDTH // 2
+        s.ball_pos = [WIDTH // 2, BALL_TOP_Y + 5]
+        s.ball_velocity = [0, -8]
+        self.assertEqual(self.engine.step(), [BOSS_HIT])
+        self.assertGreater(s.ball_velocity[1], 0)
+
+        s.boss_x = WIDTH // 2 - 150
+        s.wall_collision_cooldown = 0
+        s.ball_pos = [WIDTH // 2 + 140, BALL_TOP_Y + 5]
+        s.ball_velocity = [0, -8]
+        self.assertEqual(self.engine.step(Inputs()), [PLAYER_POINT])
+        self.assertEqual(s.player_score, 1)
+        self.assertEqual(s.ball_pos, [WIDTH // 2, BALL_TOP_Y + 100])  # подача
+
+    def test_winner(self):
+        s = self.state
+        self.assertIsNone(s.winner)
+        s.opponent_score = WIN_SCORE
+        self.assertEqual(s.winner, "opponent")
+        self.engine.reset()
+        self.assertIsNone(self.engine.state.winner)
+        self.assertLess(self.engine.state.ball_pos[1], TABLE_BOTTOM_Y)
+
+    def test_pvp_boss_follows_input(self):
+        """В PvP босса двигает ввод второго игрока, а не BossAI"""
+        engine = Engine(seed=1, pvp=True)
+        engine.reset()
+        engine.step(Inputs(boss=0.5))
+        self.assertEqual(engine.state.boss_x, WIDTH // 2 - BOSS_WIDTH // 2)
+        engine.step(Inputs(boss=0.0))
+        left = engine.state.boss_x
+        self.assertLess(left, WIDTH // 2 - BOSS_WIDTH // 2)
+        for _ in range(30):
+            engine.step()
+        self.assertEqual(engine.state.boss_x, left)  # без ввода босс стоит на месте
+
+
+class TestHeadless(unittest.TestCase):
+    def test_run_headless(self):
+        stats = run_headless(rallies=200, seed=0)
+        self.assertEqual(stats["rallies"], 200)
+        events = stats["events"]
+        self.assertEqual(events[PLAYER_POINT] + events[OPPONENT_POINT], 200)
+        self.assertGreater(events[PADDLE_HIT], 0)
+        self.assertGreater(stats["steps_per_sec"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
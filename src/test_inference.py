@@ -0,0 +1,134 @@
+import unittest
+import time
+
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from inference import (HandResult, LocalInference, ProcessInference,
+                       _read_result, _result_size, _write_result)
+
+
+def wait_for_result(inference, frame, timeout=10.0):
+    """Подаёт один и тот же кадр, пока воркер не вернёт результат"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        result = inference.submit(frame)
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    return None
+
+
+class TestInference(unittest.TestCase):
+    def setUp(self):
+        self.source = SyntheticCapture(width=160, height=120, realtime=False)
+        frame = self.source.frame_at(0)
+        self.frame_rgb = frame[:, :, ::-1].copy()
+
+    def test_local_inference(self):
+        """Локальный бэкенд возвращает landmarks массивом (n, 21, 3)"""
+        inference = LocalInference(FakeHands)
+        result = inference.submit(self.frame_rgb)
+        self.assertEqual(result.landmarks.shape, (1, 21, 3))
+        self.assertEqual(result.landmarks.dtype, np.float32)
+        self.assertEqual(result.frame_id, 1)
+        inference.close()
+
+    def test_result_slot_roundtrip(self):
+        """Запись/чтение слота результата под seqlock"""
+        slot = np.zeros(_result_size(2), dtype=np.float64)
+        self.assertEqual(_read_result(slot), (0, None))
+
+        landmarks = np.random.rand(2, 21, 3).astype(np.float32)
+        _write_result(slot, HandResult(landmarks, ["Left", "Right"], [0.9, 0.8], frame_id=7), 2)
+        seq, result = _read_result(slot)
+        self.assertEqual(seq, 2)
+        self.assertEqual(result.frame_id, 7)
+        self.assertEqual(result.handedness, ["Left", "Right"])
+        np.testing.assert_allclose(result.landmarks, landmarks)
+
+    def test_process_inference_matches_local(self):
+        """Процесс-воркер даёт тот же результат, что и локальный инференс"""
+        expected = LocalInference(FakeHands).submit(self.frame_rgb)
+        inference = ProcessInference(self.frame_rgb.shape, hands_factory=FakeHands)
+        try:
+            self.assertTrue(inference.wait_ready(10.0))
+            result = wait_for_result(inference, self.frame_rgb)
+        finally:
+            inference.close()
+
+        self.assertIsNotNone(result)
+        np.testing.assert_allclose(result.landmarks, expected.landmarks)
+
+    def test_submit_never_blocks(self):
+        """submit() не ждёт воркер, даже если кадры идут быстрее инференса"""
+        inference = ProcessInference(self.frame_rgb.shape, hands_factory=FakeHands)
+        try:
+            inference.wait_ready(10.0)
+            start = time.perf_counter()
+            for _ in range(200):
+                inference.submit(self.frame_rgb)
+            elapsed = time.perf_counter() - start
+        finally:
+            inference.close()
+        self.assertLess(elapsed / 200, 0.005)
+
+    def test_result_frame_id_matches_frame(self):
+        """Номер кадра в результате воркера — номер того кадра, по которому считались landmarks"""
+        frames = [self.source.frame_at(i)[:, :, ::-1].copy() for i in range(30)]
+        local = LocalInference(FakeHands)
+        expected = [local.submit(frame).landmarks for frame in frames]
+        inference = ProcessInference(self.frame_rgb.shape, hands_factory=FakeHands)
+        checked = 0
+        try:
+            self.assertTrue(inference.wait_ready(10.0))
+            for i in range(600):
+                result = inference.submit(frames[i % len(frames)])
+                if result is not None and result.num_hands:
+                    index = (result.frame_id - 1) % len(frames)
+                    np.testing.assert_allclose(result.landmarks, expected[index])
+                    checked += 1
+        finally:
+            inference.close()
+        self.assertGreater(checked, 0)
+
+    def test_process_set_options_rebuilds_in_worker(self):
+        """Новые параметры модели применяет тот же воркер, без перезапуска процесса"""
+        inference = ProcessInference(self.frame_rgb.shape, hands_factory=FakeHands)
+        try:
+            self.assertTrue(inference.wait_ready(10.0))
+            self.assertEqual(wait_for_result(inference, self.frame_rgb).num_hands, 1)
+            process = inference._process
+            inference.set_options(threshold=255)  # FakeHands с таким порогом руку не найдёт
+            deadline = time.perf_counter() + 10.0
+            result = inference.submit(self.frame_rgb)
+            while result.num_hands and time.perf_counter() < deadline:
+                time.sleep(0.01)
+                result = inference.submit(self.frame_rgb)
+            self.assertEqual(result.num_hands, 0)
+            self.assertIs(inference._process, process)
+            self.assertTrue(process.is_alive())
+        finally:
+            inference.close()
+
+    def test_tracker_process_mode_contract(self):
+        """HandTracker в process-режиме сохраняет контракт (frame, normalized_coords)"""
+        tracker = HandTracker(inference="process", hands_factory=FakeHands)
+        tracker.start_capture(SyntheticCapture(width=160, height=120, fps=200))
+        try:
+            coords = None
+            deadline = time.perf_counter() + 10.0
+            while coords is None and time.perf_counter() < deadline:
+                frame, coords = tracker.process_frame()
+                self.assertEqual(frame.shape, (120, 160, 3))
+        finally:
+            tracker.stop_capture()
+
+        self.assertIsNotNone(coords)
+        self.assertTrue(0 <= coords[0] <= 1 and 0 <= coords[1] <= 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+import unittest
+
+from input_filter import (InterpolatingFilter, KalmanFilter, OneEuroFilter, PassthroughFilter,
+                          create_filter, evaluate_filter, sine_trajectory)
+
+
+def still_hand(t):
+    return (0.5, 0.5)
+
+
+class TestInputFilter(unittest.TestCase):
+    def test_passthrough_lags_by_pipeline_latency(self):
+        """Без фильтра ракетка отстаёт минимум на задержку конвейера"""
+        metrics = evaluate_filter(PassthroughFilter(), sine_trajectory(), latency=0.05)
+        print("\nPassthrough:", metrics)
+        self.assertGreaterEqual(metrics["lag"], 0.05)
+
+    def test_extrapolation_reduces_lag_and_error(self):
+        """1€ и Калман с экстраполяцией отстают меньше и ошибаются меньше, чем сырые координаты"""
+        baseline = evaluate_filter(PassthroughFilter(), sine_trajectory(), noise=0.005)
+        for input_filter in (OneEuroFilter(), KalmanFilter()):
+            metrics = evaluate_filter(input_filter, sine_trajectory(), noise=0.005)
+            print(f"\n{type(input_filter).__name__}:", metrics)
+            self.assertLess(metrics["lag"], baseline["lag"] / 2)
+            self.assertLess(metrics["rmse"], baseline["rmse"])
+
+    def test_smoothing_reduces_jitter(self):
+        """На неподвижной руке с шумом ракетка дрожит меньше, чем без фильтра"""
+        baseline = evaluate_filter(PassthroughFilter(), still_hand, noise=0.01)
+        for input_filter in (OneEuroFilter(), KalmanFilter()):
+            metrics = evaluate_filter(input_filter, still_hand, noise=0.01)
+            self.assertLess(metrics["jitter"], baseline["jitter"])
+
+    def test_holds_between_results(self):
+        """Без новых замеров позиция плавно экстраполируется, но не дальше max_extrapolation"""
+        input_filter = OneEuroFilter(max_extrapolation=0.1)
+        for i in range(10):
+            input_filter.update(i / 30, (0.3 + i * 0.03, 0.5))  # движение 0.9 ед./сек
+        last = 9 / 30
+        positions = [input_filter.predict(last + k / 60)[0] for k in range(12)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(input_filter.predict(last + 1.0), input_filter.predict(last + 0.1))
+
+    def test_duplicate_samples_ignored(self):
+        """Повторный результат того же кадра не ломает оценку скорости"""
+        input_filter = OneEuroFilter()
+        input_filter.update(0.0, (0.5, 0.5))
+        input_filter.update(0.1, (0.6, 0.5))
+        velocity = input_filter.velocity
+        input_filter.update(0.1, (0.6, 0.5), now=0.2)
+        self.assertEqual(input_filter.velocity, velocity)
+        self.assertIsNone(input_filter.latency)
+
+    def test_interpolation_between_samples(self):
+        """С задержкой в интервал замеров позиция между двумя замерами, без неё — экстраполяция"""
+        input_filter = InterpolatingFilter(delay=0.1)
+        input_filter.update(0.0, (0.2, 0.5))
+        input_filter.update(0.1, (0.4, 0.7))
+        x, y = input_filter.predict(0.15)
+        self.assertAlmostEqual(x, 0.3)
+        self.assertAlmostEqual(y, 0.6)
+        self.assertEqual(input_filter.predict(0.0), (0.2, 0.5))  # не раньше предыдущего замера
+        input_filter.delay = 0.0
+        self.assertAlmostEqual(input_filter.predict(0.15)[0], 0.5, places=1)  # дальше последнего
+
+    def test_interpolation_at_low_sample_rate(self):
+        """Замеры 15 Гц: интерполяция точнее и глаже сырых координат, ценой отставания на интервал"""
+        baseline = evaluate_filter(PassthroughFilter(), sine_trajectory(), sample_rate=15, noise=0.005)
+        metrics = evaluate_filter(InterpolatingFilter(delay=1 / 15), sine_trajectory(),
+                                  sample_rate=15, noise=0.005)
+        print("\nInterpolating 15 Hz:", metrics, "passthrough:", baseline)
+        self.assertLess(metrics["jitter"], baseline["jitter"])
+        self.assertLess(metrics["rmse"], baseline["rmse"])
+
+    def test_create_filter(self):
+        self.assertIsInstance(create_filter("kalman"), KalmanFilter)
+        self.assertEqual(create_filter("interpolate", delay=0.05).delay, 0.05)
+        with self.assertRaises(ValueError):
+            create_filter("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+from net import PvpClient, PvpServer, Room, _Player
+from protocol import ROLE_BOTTOM, ROLE_TOP
+
+
+class RecordingSocket:
+    """Подмена websocket: запоминает отправленное; blocked — send не завершается (клиент не читает)."""
+
+    def __init__(self, blocked=False):
+        self.blocked = blocked
+        self.sent = []
+        self.closed = False
+
+    async def send(self, data):
+        self.sent.append(data)
+        if self.blocked:
+            await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+class TestPvp(unittest.TestCase):
+    def test_two_players(self):
+        """Два клиента на localhost: роли, снимки, предсказание своей ракетки и согласование"""
+        async def scenario():
+            server = await PvpServer("localhost", 0, seed=0, rematch=True).start()
+            url = f"ws://localhost:{server.port}"
+            bottom = await PvpClient(url).connect()
+            top = await PvpClient(url).connect()
+            receivers = [asyncio.create_task(c.receive()) for c in (bottom, top)]
+
+            # Предсказание: ракетка двигается сразу, до ответа сервера
+            await bottom.send_input((0.3, 0.7))
+            predicted = list(bottom.state.paddle_pos)
+            await top.send_input((0.5, 0.1))
+            for _ in range(20):
+                await bottom.send_input((0.3, 0.7))
+                await bottom.ping()
+                await asyncio.sleep(1 / 30)
+            await bottom.close()
+            await top.close()
+            await asyncio.gather(*receivers)
+            await server.close()
+            return server, bottom, top, predicted
+
+        server, bottom, top, predicted = asyncio.run(scenario())
+        self.assertEqual((bottom.role, top.role), ("bottom", "top"))
+        self.assertEqual(bottom.state.paddle_pos, predicted)
+        self.assertGreater(bottom.acked, 5)
+        self.assertGreater(top.state.tick, 10)
+        self.assertEqual(bottom.corrections, 0)
+        self.assertLess(len(bottom.pending), 21)  # подтверждённые сервером вводы отброшены
+        self.assertGreater(bottom.rtt_stats()["count"], 0)
+        self.assertGreater(server.stats.bytes_sent, 0)
+
+    def test_slow_client_does_not_stall_room(self):
+        """Клиент не читает: комната продолжает тикать, второй игрок получает снимки, у медленного — только свежий"""
+        async def scenario():
+            server = PvpServer(snapshot_rate=30)
+            room = Room(server, seed=0)
+            fast = room.players[ROLE_BOTTOM] = _Player(RecordingSocket(), ROLE_BOTTOM)
+            slow = room.players[ROLE_TOP] = _Player(RecordingSocket(blocked=True), ROLE_TOP)
+            writers = [asyncio.create_task(player.writer(server.stats)) for player in (fast, slow)]
+            run = asyncio.create_task(room.run())
+            await asyncio.sleep(0.5)
+            room.players.pop(ROLE_TOP)  # медленный отключился — комната закрывается
+            await asyncio.wait_for(run, 1.0)
+            await asyncio.wait_for(writers[0], 1.0)
+            writers[1].cancel()
+            return room, fast, slow
+
+        room, fast, slow = asyncio.run(scenario())
+        self.assertGreater(room.engine.state.tick, 20)
+        self.assertGreater(len(fast.websocket.sent), 10)
+        self.assertTrue(fast.websocket.closed)
+        self.assertEqual(len(slow.websocket.sent), 1)
+        self.assertGreater(slow.dropped, 5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
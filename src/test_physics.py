@@ -1,6 +1,8 @@
 import unittest
 import math
-from physics import BallPhysics
+import random
+import numpy as np
+from physics import BallPhysics, BallPhysicsBatch
 
 class TestBallPhysics(unittest.TestCase):
     def setUp(self):
@@ -111,6 +113,53 @@ class TestBallPhysics(unittest.TestCase):
         self.assertTrue(self.ball.is_out())
         print("Ball is out (behind player) -", self.ball.get_position())
 
+class TestBallPhysicsBatch(unittest.TestCase):
+    def make_balls(self, count, seed=1):
+        """Мячи в случайных состояниях, включая зоны сетки, стенки и стола"""
+        rng = random.Random(seed)
+        balls = []
+        for _ in range(count):
+            ball = BallPhysics(table_width=800, table_height=600, net_height=50)
+            ball.set_state((rng.uniform(-20, 820), rng.uniform(-20, 700), rng.uniform(0, 60),
+                            rng.uniform(-10, 10), rng.uniform(-12, 12), rng.uniform(-8, 8)))
+            balls.append(ball)
+        return balls
+
+    def test_equivalent_to_scalar(self):
+        """Батч совпадает со скалярной физикой бит в бит"""
+        for dt in (0.1, 1.0):
+            balls = self.make_balls(300)
+            batch = BallPhysicsBatch.from_balls(balls)
+            for step in range(200):
+                for ball in balls:
+                    ball.update(dt)
+                batch.update(dt)
+                expected = np.array([ball.get_state() for ball in balls])
+                actual = np.concatenate((batch.pos, batch.vel)).T
+                np.testing.assert_array_equal(actual, expected, err_msg=f"dt={dt}, step={step}")
+                np.testing.assert_array_equal(batch.is_out(), [ball.is_out() for ball in balls])
+
+    def test_net_hit_mask(self):
+        """update() возвращает маску мячей, попавших в сетку"""
+        batch = BallPhysicsBatch(2, 800, 600, 50)
+        batch.set_state(0, (400, 300, 30, 5, 5, 0))   # в сетке
+        batch.set_state(1, (400, 500, 30, 5, 5, 0))   # далеко от сетки
+        np.testing.assert_array_equal(batch.update(0.1), [True, False])
+        self.assertLess(abs(batch.vx[0]), 5)
+
+    def test_reset_and_is_out(self):
+        """Сброс по маске трогает только вылетевшие мячи"""
+        batch = BallPhysicsBatch(3, 800, 600, 50, seed=0)
+        batch.y[1] = 600 * 1.3
+        out = batch.is_out()
+        np.testing.assert_array_equal(out, [False, True, False])
+        before = batch.get_state(0)
+        batch.reset_ball(out)
+        self.assertFalse(batch.is_out().any())
+        self.assertEqual(batch.get_state(0), before)
+        self.assertEqual(batch.get_screen_positions().shape, (3, 2))
+
+
 '''
 Это позволит вам:
     Видеть как меняются координаты с каждым шагом
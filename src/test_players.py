@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from inference import HandResult
+from players import PlayerAssigner, strip_coords
+
+
+def hands(*palms, labels=None):
+    """HandResult с руками в заданных точках ладони (x, y)."""
+    landmarks = np.zeros((len(palms), 21, 3), dtype=np.float32)
+    for i, palm in enumerate(palms):
+        landmarks[i, :, :2] = palm
+    labels = labels or ["Right"] * len(palms)
+    return HandResult(landmarks, list(labels), [0.95] * len(palms))
+
+
+class TestPlayerAssigner(unittest.TestCase):
+    def test_new_hand_goes_to_its_strip(self):
+        """Рука в правой половине кадра достаётся правому игроку, левый остаётся без руки"""
+        assigner = PlayerAssigner()
+        coords = assigner.update(hands((0.8, 0.5)), 0.0)
+        self.assertIsNone(coords["left"])
+        np.testing.assert_allclose(coords["right"], (0.8, 0.5), rtol=1e-6)
+
+    def test_crossing_hands_keep_players(self):
+        """Руки с одной меткой скрещиваются по x — игроки не меняются местами"""
+        assigner = PlayerAssigner()
+        for frame in range(31):
+            t = frame / 30
+            x = 0.2 + 0.6 * t  # левый игрок уходит вправо, правый — влево
+            # Порядок рук в результате Mediapipe не гарантирован
+            palms = [(x, 0.3), (1 - x, 0.7)] if frame % 2 else [(1 - x, 0.7), (x, 0.3)]
+            coords = assigner.update(hands(*palms), t)
+        self.assertAlmostEqual(coords["left"][0], 0.8, places=5)
+        self.assertAlmostEqual(coords["right"][0], 0.2, places=5)
+        self.assertEqual(assigner.stats.acquired, 2)
+        self.assertEqual(assigner.stats.jumps, 0)
+
+    def test_dropout_holds_then_releases(self):
+        """Пропавшая рука держит место hold_time, потом игрок считается потерянным"""
+        assigner = PlayerAssigner(hold_time=0.5)
+        assigner.update(hands((0.3, 0.5), (0.7, 0.5)), 0.0)
+        right_id = assigner.slot("right").track_id
+        for frame in range(1, 6):
+            coords = assigner.update(hands((0.3, 0.5)), frame / 30)
+            self.assertIsNone(coords["right"])
+        assigner.update(hands((0.3, 0.5), (0.72, 0.5)), 6 / 30)
+        self.assertEqual(assigner.slot("right").track_id, right_id)
+        self.assertEqual(assigner.stats.dropouts, 5)
+
+        assigner.update(hands((0.3, 0.5)), 1.0)
+        self.assertIsNone(assigner.slot("right").track_id)
+        self.assertEqual(assigner.stats.lost, 1)
+
+    def test_handedness_breaks_tie(self):
+        """Руки сошлись в одной точке: разводятся по запомненным меткам"""
+        assigner = PlayerAssigner()
+        assigner.update(hands((0.45, 0.5), (0.55, 0.5), labels=["Right", "Left"]), 0.0)
+        coords = assigner.update(hands((0.5, 0.45), (0.5, 0.55), labels=["Left", "Right"]), 0.1)
+        np.testing.assert_allclose(coords["left"], (0.5, 0.55), rtol=1e-6)
+        np.testing.assert_allclose(coords["right"], (0.5, 0.45), rtol=1e-6)
+
+    def test_strip_coords(self):
+        self.assertEqual(strip_coords((0.75, 0.4), 1), (0.5, 0.4))
+        self.assertEqual(strip_coords((0.75, 0.4), 0), (1.0, 0.4))
+        self.assertIsNone(strip_coords(None, 0))
+
+
+class TestTwoPlayerTracker(unittest.TestCase):
+    def test_synthetic_two_hands(self):
+        """Две руки за один инференс; каждый игрок всё время ведёт свою руку"""
+        tracker = HandTracker(max_num_hands=2, hands_factory=FakeHands, assigner=PlayerAssigner())
+        capture = SyntheticCapture(max_frames=90, realtime=False, hands=2)
+        tracker.start_capture(capture)
+        for index in range(90):
+            tracker.process_frame(draw_point=True, draw_landmarks=False)
+            # Квадрат 0 начинает справа (после отражения — слева): левый игрок
+            for slot, (cx, cy) in zip(tracker.assigner.slots, capture.hand_centers(index)):
+                x, y = slot.coords
+                self.assertAlmostEqual(x, (capture.width - cx) / capture.width, places=2)
+                self.assertAlmostEqual(y, cy / capture.height, places=2)
+        calls = tracker.inference.hands.calls
+        tracker.stop_capture()
+        self.assertEqual(calls, 90)
+        self.assertEqual(tracker.assigner.stats.dropouts, 0)
+
+    def test_roi_needs_single_hand(self):
+        with self.assertRaises(ValueError):
+            HandTracker(max_num_hands=2, hands_factory=FakeHands, roi=True)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,58 @@
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+
+from bench_preview import run_benchmark
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from preview import CameraPreview
+
+
+class TestCameraPreview(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    def test_surface_reused_and_updated(self):
+        """Поверхность создаётся один раз и отражает последний кадр (в RGB)"""
+        preview = CameraPreview((320, 240))
+        first = preview.update(self.frame)
+        second = preview.update(self.frame[::-1].copy())
+        self.assertIs(first, second)
+
+        expected = cv2.resize(self.frame[::-1], (320, 240), interpolation=cv2.INTER_AREA)
+        r, g, b, _ = second.get_at((5, 7))
+        self.assertEqual((r, g, b), tuple(int(c) for c in expected[7, 5, ::-1]))
+
+    def test_hidden_preview(self):
+        """Скрытое превью не обрабатывает кадр"""
+        preview = CameraPreview(visible=False)
+        self.assertIsNone(preview.update(self.frame))
+        preview.toggle()
+        self.assertIsNotNone(preview.update(self.frame))
+        self.assertIsNone(preview.update(None))
+
+    def test_no_per_frame_allocations(self):
+        """На кадр почти ничего не выделяется (микробенчмарк)"""
+        result = run_benchmark(frames=20)
+        print("\nPreview benchmark:", result)
+        self.assertLess(result["preview_peak_alloc_bytes"], 4096)
+        self.assertGreater(result["legacy_peak_alloc_bytes"], 640 * 480 * 3)
+
+    def test_tracker_skips_drawing(self):
+        """Без отрисовки кадр трекера — просто отражённый кадр камеры"""
+        source = SyntheticCapture(width=160, height=120, realtime=False)
+        tracker = HandTracker(hands_factory=FakeHands)
+        tracker.start_capture(source)
+        frame, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+        self.assertIsNotNone(coords)
+        np.testing.assert_array_equal(frame, cv2.flip(source.frame_at(0), 1))
+        tracker.stop_capture()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
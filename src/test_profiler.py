@@ -0,0 +1,109 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from profiler import Profiler, ProfilerHud, RingBuffer, percentile
+
+
+class TestProfiler(unittest.TestCase):
+    def test_ring_buffer_keeps_last_values(self):
+        buffer = RingBuffer(4)
+        for value in range(10):
+            buffer.add(value)
+        self.assertEqual(sorted(buffer.samples()), [6, 7, 8, 9])
+        self.assertEqual(buffer.last(), 9)
+        self.assertEqual(buffer.count, 10)
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+        profiler = Profiler(capacity=100)
+        for ms in values:
+            profiler.record("physics", ms / 1000)
+        row = profiler.summary()["physics"]
+        self.assertAlmostEqual(row["p95_ms"], 95)
+        self.assertAlmostEqual(row["max_ms"], 100)
+
+    def test_measure_and_disabled(self):
+        profiler = Profiler()
+        with profiler.measure("render"):
+            time.sleep(0.002)
+        self.assertGreaterEqual(profiler.summary()["render"]["last_ms"], 2)
+
+        disabled = Profiler(enabled=False)
+        with disabled.measure("render"):
+            pass
+        disabled.record("flip", 0.1)
+        self.assertEqual(disabled.summary(), {})
+
+    def test_low_overhead(self):
+        """Замер стадии — единицы микросекунд"""
+        profiler = Profiler()
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            with profiler.measure("stage"):
+                pass
+        per_call = (time.perf_counter() - start) / n
+        self.assertLess(per_call, 20e-6)
+
+    def test_dump(self):
+        profiler = Profiler()
+        profiler.record("capture", 0.001)
+        profiler.record("inference", 0.010)
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler.dump_json(os.path.join(tmp, "p.json"))
+            profiler.dump_csv(os.path.join(tmp, "p.csv"))
+            with open(os.path.join(tmp, "p.json"), encoding="utf-8") as f:
+                data = json.load(f)
+            with open(os.path.join(tmp, "p.csv"), encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(list(data), ["capture", "inference"])
+        self.assertAlmostEqual(data["inference"]["p50_ms"], 10)
+        self.assertEqual([r["stage"] for r in rows], ["capture", "inference"])
+
+    def test_tracker_stages(self):
+        profiler = Profiler()
+        tracker = HandTracker(hands_factory=FakeHands, profiler=profiler)
+        tracker.start_capture(SyntheticCapture(width=160, height=120, realtime=False))
+        for _ in range(3):
+            tracker.process_frame()
+        tracker.stop_capture()
+        summary = profiler.summary()
+        for stage in ("capture", "convert", "inference", "draw"):
+            self.assertEqual(summary[stage]["count"], 3)
+
+
+class TestProfilerHud(unittest.TestCase):
+    def test_hud_refresh(self):
+        pygame.init()
+        profiler = Profiler()
+        profiler.record("render", 0.001)
+        hud = ProfilerHud(profiler, pygame.font.Font(None, 18), refresh=0.5)
+        screen = pygame.Surface((400, 300))
+        self.assertIsNone(hud.draw(screen, now=0.0))
+        hud.toggle()
+        self.assertIsNotNone(hud.draw(screen, now=0.0))
+        first = hud.surface
+        hud.draw(screen, now=0.1)
+        self.assertIs(hud.surface, first)  # текст не перерисовывается каждый кадр
+        hud.draw(screen, now=0.6)
+        self.assertIsNot(hud.surface, first)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+import unittest
+
+from engine import BOSS_HIT, Engine, GameState, PLAYER_POINT, tracking_player
+from protocol import (FULL_STATE_SIZE, INPUT, SnapshotHistory, apply_snapshot, decode_events, decode_input,
+                      decode_state, encode_events, encode_input, encode_state, quantize_coords, snapshot)
+
+
+class TestProtocol(unittest.TestCase):
+    def test_input_roundtrip(self):
+        data = encode_input(7, 3, (0.25, 0.75))
+        self.assertEqual(len(data), INPUT.size)
+        seq, ack, coords = decode_input(data)
+        self.assertEqual((seq, ack), (7, 3))
+        self.assertEqual(coords, quantize_coords((0.25, 0.75)))
+        self.assertAlmostEqual(coords[0], 0.25, places=4)
+        self.assertIsNone(decode_input(encode_input(8, 3, None))[2])
+
+    def test_events(self):
+        self.assertEqual(decode_events(encode_events([BOSS_HIT, PLAYER_POINT])), [BOSS_HIT, PLAYER_POINT])
+
+    def test_full_snapshot_is_fixed_size(self):
+        engine = Engine(seed=1)
+        engine.reset()
+        data = encode_state(1, snapshot(engine.state))
+        self.assertEqual(len(data), FULL_STATE_SIZE)
+        seq, values, _, _ = decode_state(data, SnapshotHistory())
+        self.assertEqual(seq, 1)
+        state = GameState()
+        apply_snapshot(state, values)
+        self.assertEqual(state.paddle_pos, engine.state.paddle_pos)
+        self.assertAlmostEqual(state.ball_pos[0], engine.state.ball_pos[0], places=3)
+
+    def test_delta_matches_full(self):
+        """Цепочка дельт восстанавливает те же снимки, что и полные, и они меньше полных"""
+        engine = Engine(seed=2)
+        engine.reset()
+        player = tracking_player(seed=2)
+        server = SnapshotHistory()
+        client = SnapshotHistory()
+        acked = 0
+        sizes = []
+        for seq in range(1, 301):
+            engine.step(player(engine.state))
+            values = snapshot(engine.state)
+            server.add(seq, values)
+            data = encode_state(seq, values, acked, server.get(acked), last_input=seq, events=0)
+            sizes.append(len(data))
+            got_seq, got, last_input, _ = decode_state(data, client)
+            client.add(got_seq, got)
+            full = decode_state(encode_state(seq, values), client)[1]
+            self.assertEqual(got, full)
+            self.assertEqual(last_input, seq)
+            if seq % 3:  # клиент подтверждает не каждый снимок
+                acked = seq
+        self.assertEqual(sizes[0], FULL_STATE_SIZE)
+        self.assertLess(sum(sizes) / len(sizes), FULL_STATE_SIZE * 0.8)
+
+    def test_history_evicts_old(self):
+        history = SnapshotHistory(capacity=2)
+        for seq in (1, 2, 3):
+            history.add(seq, (seq,))
+        self.assertNotIn(1, history)
+        self.assertEqual(history[3], (3,))
+        with self.assertRaises(KeyError):
+            decode_state(encode_state(4, snapshot(GameState()), 1, snapshot(GameState())), history)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
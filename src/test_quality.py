@@ -0,0 +1,195 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from quality import QUALITY_LEVELS, QualityController
+from sources import RecordingSource, SessionRecorder
+
+WIDTH, HEIGHT = 320, 240
+
+
+class CostHands(FakeHands):
+    """FakeHands, который записывает размер кадра и model_complexity каждого инференса."""
+
+    def __init__(self, log, model_complexity=1, **kwargs):
+        super().__init__(**kwargs)
+        self.log = log
+        self.model_complexity = model_complexity
+
+    def process(self, frame_rgb):
+        self.log.append((frame_rgb.shape[0] * frame_rgb.shape[1], self.model_complexity))
+        return super().process(frame_rgb)
+
+
+class TestQualityController(unittest.TestCase):
+    def test_down_immediately_up_with_hysteresis(self):
+        controller = QualityController(window=10, up_windows=2)
+        for _ in range(10):
+            controller.observe(0.030)
+        self.assertEqual(controller.level, 1)
+        for _ in range(10):
+            controller.observe(0.030)  # окно сразу после переключения пропускается
+        self.assertEqual(controller.level, 1)
+        # С уровня 0 уже уходили один раз: обратно — через 2 * 2 спокойных окна
+        for _ in range(30):
+            controller.observe(0.005)
+        self.assertEqual(controller.level, 1)
+        for _ in range(10):
+            controller.observe(0.005)
+        self.assertEqual(controller.level, 0)
+
+        # Уровень 0 снова не выдержал: теперь ждать вдвое дольше (8 окон)
+        for _ in range(20):
+            controller.observe(0.030)
+        self.assertEqual(controller.level, 1)
+        for _ in range(10 + 70):
+            controller.observe(0.005)
+        self.assertEqual(controller.level, 1)
+        for _ in range(10):
+            controller.observe(0.005)
+        self.assertEqual(controller.level, 0)
+
+    def test_inference_budget(self):
+        """Кадр укладывается, но инференс дольше своего бюджета — тоже понижение"""
+        controller = QualityController(window=10, inference_budget=0.005)
+        for _ in range(10):
+            controller.observe(0.010, inference_time=0.008)
+        self.assertEqual(controller.level, 1)
+
+    def test_constant_inference_fits_frame(self):
+        """Кадр 12 мс, из них Mediapipe 10 мс в каждом кадре — 60 FPS держится, уровень не меняется"""
+        controller = QualityController(window=10)
+        for _ in range(300):
+            controller.observe(0.012, inference_time=0.010)
+        self.assertEqual(controller.level, 0)
+        self.assertEqual(controller.history, [])
+
+    def test_inference_amortized_over_stride(self):
+        """Вызов 36 мс раз в 3 кадра (в процессе инференса) — 12 мс на кадр: не понижение, но и не повышение"""
+        lowest = len(QUALITY_LEVELS) - 1
+        controller = QualityController(level=lowest, window=9, up_windows=1)
+        for frame in range(270):
+            controller.observe(0.004, 0.036 if frame % 3 == 0 else None)
+        self.assertEqual(controller.level, lowest)
+        controller = QualityController(level=lowest, window=9, up_windows=1)
+        for frame in range(270):
+            controller.observe(0.004, 0.024 if frame % 3 == 0 else None)
+        self.assertLess(controller.level, lowest)  # 8 мс на кадр — запас есть
+
+
+class TestQualityReplay(unittest.TestCase):
+    """Сходимость на записанной сессии: без камеры, время кадра — модель стоимости."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "session.npz")
+        recorder = SessionRecorder(cls.path, landmarks=False)
+        capture = SyntheticCapture(width=WIDTH, height=HEIGHT, max_frames=60, realtime=False)
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            recorder.add(capture.frame_index / capture.fps, frame)
+        recorder.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def run_replay(self, render_ms, inference_ms, level=0, frames=900):
+        """
+        Время работы кадра: render_ms + инференс (inference_ms на полном кадре с
+        model_complexity=1, пропорционально числу пикселей, лёгкая модель — 0.6).
+        :return: (controller, tracker, уровни по кадрам, координаты руки в последнем кадре)
+        """
+        log = []
+        tracker = HandTracker(hands_factory=lambda **kwargs: CostHands(log, **kwargs))
+        controller = QualityController(level=level, on_change=lambda i, q, reason: tracker.apply_quality(q))
+        tracker.apply_quality(controller.current)
+        tracker.start_capture(RecordingSource(self.path, loop=True))
+        levels = []
+        coords = None
+        for _ in range(frames):
+            calls = len(log)
+            _, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            inference_time = None
+            if len(log) > calls:
+                pixels, complexity = log[-1]
+                inference_time = inference_ms / 1000 * pixels / (WIDTH * HEIGHT) * (1.0 if complexity else 0.6)
+            controller.observe(render_ms / 1000 + (inference_time or 0.0), inference_time)
+            levels.append(controller.level)
+        tracker.stop_capture()
+        return controller, tracker, levels, coords
+
+    def test_weak_pc_converges(self):
+        """Слабый ПК: уходит на уровень, который держит 60 FPS, и остаётся на нём"""
+        controller, tracker, levels, coords = self.run_replay(render_ms=8, inference_ms=22)
+        self.assertEqual(controller.current.name, "low")
+        self.assertEqual(len(controller.history), 2)
+        self.assertEqual(set(levels[300:]), {2})
+        self.assertEqual(tracker.hands_kwargs["model_complexity"], 0)
+        self.assertEqual(tracker.input_scale, 0.5)
+        self.assertIsNotNone(coords)  # рука находится и на уменьшенном кадре
+
+    def test_fast_pc_climbs_to_best(self):
+        """Быстрый ПК со старта на самом лёгком уровне поднимается до лучшего"""
+        controller, tracker, levels, coords = self.run_replay(render_ms=3, inference_ms=6,
+                                                              level=len(QUALITY_LEVELS) - 1)
+        self.assertEqual(controller.level, 0)
+        self.assertEqual(tracker.inference_stride, 1)
+        self.assertEqual(levels[-1], 0)
+        self.assertIsNotNone(coords)
+
+    def test_model_rebuilt_off_thread(self):
+        """Новая модель создаётся в фоне: кадры идут через старую, пока новая не готова"""
+        log = []
+        release = threading.Event()
+
+        def factory(**kwargs):
+            if kwargs["model_complexity"] == 0:
+                release.wait(10.0)  # "долгая загрузка" модели Mediapipe
+            return CostHands(log, **kwargs)
+
+        tracker = HandTracker(hands_factory=factory)
+        tracker.start_capture(RecordingSource(self.path, loop=True))
+        try:
+            tracker.apply_quality(QUALITY_LEVELS[2])
+            start = time.perf_counter()
+            for _ in range(5):
+                tracker.process_frame(draw_point=False, draw_landmarks=False)
+            self.assertLess(time.perf_counter() - start, 5.0)
+            self.assertEqual({complexity for _, complexity in log}, {1})
+            release.set()
+            tracker._builder.join(10.0)
+            _, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            self.assertEqual(log[-1][1], 0)
+            self.assertIsNotNone(coords)
+        finally:
+            release.set()
+            tracker.stop_capture()
+
+    def test_inference_rate(self):
+        """Инференс 10 Гц на записи 30 FPS: каждый третий кадр по времени захвата, и после повтора записи"""
+        log = []
+        tracker = HandTracker(hands_factory=lambda **kwargs: CostHands(log, **kwargs), inference_rate=10)
+        tracker.start_capture(RecordingSource(self.path, loop=True))
+        inferred = []
+        for _ in range(150):
+            calls = len(log)
+            tracker.process_frame(draw_point=False, draw_landmarks=False)
+            if len(log) > calls:
+                inferred.append(tracker.last_capture_time)
+        tracker.stop_capture()
+        self.assertEqual(len(inferred), 50)
+        for previous, current in zip(inferred, inferred[1:]):
+            self.assertAlmostEqual(current - previous, 0.1, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
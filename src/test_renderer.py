@@ -0,0 +1,61 @@
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from bench_render import run_benchmark
+from renderer import SceneRenderer, draw_table
+
+
+class TestSceneRenderer(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.screen = pygame.display.set_mode((400, 300))
+        self.background = pygame.Surface((400, 300))
+        self.background.fill((10, 20, 30))
+        self.sprite = pygame.Surface((20, 20))
+        self.sprite.fill((255, 0, 0))
+
+    def test_static_layer_built_once(self):
+        renderer = SceneRenderer(self.screen, self.background)
+        renderer.begin()
+        layer = renderer.static_layer()
+        for _ in range(3):
+            renderer.begin()
+            renderer.present()
+        self.assertIs(renderer.static_layer(), layer)
+        self.assertEqual(renderer.stats.frames, 3)
+
+    def test_cached_matches_legacy(self):
+        """Кадр из кэша пиксель в пиксель как кадр, нарисованный целиком"""
+        expected = pygame.Surface((400, 300))
+        draw_table(expected, self.background)
+        expected.blit(self.sprite, (50, 60))
+        renderer = SceneRenderer(self.screen, self.background)
+        renderer.begin()
+        renderer.blit(self.sprite, (50, 60))
+        for x, y in ((200, 100), (55, 65), (5, 5), (200, 150)):
+            self.assertEqual(self.screen.get_at((x, y)), expected.get_at((x, y)))
+
+    def test_dirty_rects_restore_previous_area(self):
+        renderer = SceneRenderer(self.screen, self.background, dirty_rects=True)
+        renderer.begin()
+        renderer.blit(self.sprite, (50, 60))
+        renderer.present()
+        renderer.begin()
+        # На месте спрайта прошлого кадра снова фон
+        self.assertEqual(self.screen.get_at((55, 65)), renderer.static_layer().get_at((55, 65)))
+        rect = renderer.blit(self.sprite, (100, 60))
+        self.assertEqual(rect, pygame.Rect(100, 60, 20, 20))
+        renderer.present()
+
+    def test_benchmark(self):
+        result = run_benchmark(frames=20)
+        print("\nRender benchmark:", result)
+        self.assertLess(result["cached_ms_per_frame"], result["legacy_ms_per_frame"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
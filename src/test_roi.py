@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from inference import LocalInference
+from roi import RoiTracker
+
+
+class StatefulHands(FakeHands):
+    """
+    Как Mediapipe Hands в видеорежиме: рука ищется в прямоугольнике с прошлого входа,
+    поэтому вход другого размера (вырезка после полного кадра и наоборот) руку теряет.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.last_shape = None
+
+    def process(self, frame_rgb):
+        carried = self.last_shape is not None and self.last_shape != frame_rgb.shape
+        self.last_shape = frame_rgb.shape
+        results = super().process(frame_rgb)
+        if carried:
+            results.multi_hand_landmarks = results.multi_handedness = None
+        return results
+
+
+class TestRoiTracker(unittest.TestCase):
+    def test_map_landmarks_roundtrip(self):
+        """Координаты из ROI переводятся обратно в координаты полного кадра"""
+        box = (100, 50, 300, 250)
+        landmarks = np.array([[[0.5, 0.5, 0.0], [0.0, 1.0, 0.0]]], dtype=np.float32)
+        mapped = RoiTracker.map_landmarks(landmarks, box, (480, 640, 3))
+        np.testing.assert_allclose(mapped[0, 0, :2], [200 / 640, 150 / 480], rtol=1e-6)
+        np.testing.assert_allclose(mapped[0, 1, :2], [100 / 640, 250 / 480], rtol=1e-6)
+
+    def test_crop_box_grows_with_velocity(self):
+        """ROI расширяется с ростом скорости руки и не выходит за кадр"""
+        roi = RoiTracker()
+        self.assertIsNone(roi.crop_box((480, 640, 3)))
+
+        roi.update((0.5, 0.5))
+        roi.update((0.5, 0.5))
+        x0, y0, x1, y1 = roi.crop_box((480, 640, 3))
+        still_size = x1 - x0
+
+        roi.update((0.55, 0.5))
+        x0, y0, x1, y1 = roi.crop_box((480, 640, 3))
+        self.assertGreater(x1 - x0, still_size)
+        self.assertTrue(0 <= x0 and x1 <= 640 and 0 <= y0 and y1 <= 480)
+
+    def test_roi_matches_full_frame(self):
+        """ROI-трекинг даёт те же координаты, что и полный кадр, но дешевле"""
+        full = HandTracker(hands_factory=FakeHands)
+        roi = HandTracker(hands_factory=FakeHands, roi=True)
+        full.start_capture(SyntheticCapture(fps=120, max_frames=60, realtime=False))
+        roi.start_capture(SyntheticCapture(fps=120, max_frames=60, realtime=False))
+
+        for _ in range(60):
+            _, full_coords = full.process_frame()
+            _, roi_coords = roi.process_frame()
+            self.assertIsNotNone(roi_coords)
+            np.testing.assert_allclose(roi_coords, full_coords, atol=0.01)
+
+        stats = roi.roi_stats()
+        full_cost = full.inference.hands.pixels_processed
+        roi_cost = roi.inference.hands.pixels_processed + roi.roi_inference.hands.pixels_processed
+        print(f"\nROI stats: {stats}, cost {roi_cost / full_cost:.2f} of full frame")
+        self.assertLess(roi_cost, full_cost * 0.3)
+        self.assertLess(stats["fallback_rate"], 0.1)
+        full.stop_capture()
+        roi.stop_capture()
+
+    def test_crops_do_not_share_model_state(self):
+        """Модель с состоянием между вызовами: вырезки и полный кадр не сбивают друг друга"""
+        tracker = HandTracker(hands_factory=StatefulHands, roi=True)
+        tracker.start_capture(SyntheticCapture(fps=120, max_frames=60, realtime=False))
+        for _ in range(60):
+            _, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            self.assertIsNotNone(coords)
+        stats = tracker.roi_stats()
+        tracker.stop_capture()
+        self.assertEqual(stats["fallbacks"], 0)
+        self.assertEqual(stats["full_frames"], 1)
+
+    def test_fallback_when_hand_lost(self):
+        """Если рука пропала из ROI, ищем по всему кадру"""
+        roi = RoiTracker()
+        inference = LocalInference(FakeHands)
+        source = SyntheticCapture(realtime=False)
+        frame = source.frame_at(0)[:, :, ::-1].copy()
+
+        roi.update((0.1, 0.9))  # ROI далеко от настоящей руки
+        result = roi.process(frame, inference.submit)
+        self.assertEqual(result.num_hands, 1)
+        self.assertEqual(roi.stats.fallbacks, 1)
+        self.assertEqual(roi.stats.full_frames, 1)
+        self.assertEqual(roi.stats.fallback_rate, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,55 @@
+import unittest
+
+from physics import BallPhysics
+from rollback import RollbackSimulation
+
+
+def make_sim(capacity=120, continuous=False):
+    return RollbackSimulation(BallPhysics(800, 600, 50, seed=3, continuous=continuous), capacity)
+
+
+class TestRollback(unittest.TestCase):
+    def test_slots(self):
+        ball = BallPhysics(800, 600, 50)
+        with self.assertRaises(AttributeError):
+            ball.spin = 1  # у BallPhysics нет __dict__
+
+    def test_late_input_matches_on_time_input(self):
+        """Откат с опоздавшим вводом даёт то же состояние, что и ввод вовремя"""
+        hit = (1.5, -9.0, 6.0)
+        for continuous in (False, True):
+            on_time = make_sim(continuous=continuous)
+            late = make_sim(continuous=continuous)
+            for tick in range(100):
+                on_time.step(hit if tick in (30, 70) else None)
+                late.step(hit if tick == 30 else None)
+            self.assertEqual(late.rollback(70, hit), 30)
+            self.assertEqual(late.tick, 100)
+            self.assertEqual(late.physics.get_state(), on_time.physics.get_state())
+            self.assertEqual(late.state_at(85), on_time.state_at(85))
+            self.assertEqual(late.ring.get_input(30), hit)
+
+    def test_restore(self):
+        sim = make_sim()
+        states = []
+        for _ in range(50):
+            states.append(sim.physics.get_state())
+            sim.step()
+        sim.restore(20)
+        self.assertEqual(sim.physics.get_state(), states[20])
+        self.assertEqual(sim.tick, 20)
+
+    def test_ring_depth(self):
+        sim = make_sim(capacity=16)
+        for _ in range(40):
+            sim.step()
+        self.assertEqual(sim.oldest_tick, 24)
+        with self.assertRaises(ValueError):
+            sim.rollback(23, None)
+        with self.assertRaises(ValueError):
+            sim.rollback(40, None)
+        self.assertEqual(sim.rollback(24, None), 16)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
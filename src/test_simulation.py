@@ -0,0 +1,76 @@
+import unittest
+import random
+
+from physics import BallPhysics
+from simulation import FixedTimestep, PhysicsSimulation, lerp
+
+
+def run_at_fps(fps, ticks, seed=3):
+    """Гоняет симуляцию с рендером fps до заданного шага, возвращает состояния по шагам"""
+    physics = BallPhysics(800, 600, 50, seed=seed)
+    simulation = PhysicsSimulation(physics, rate=60)
+    hits = random.Random(seed)
+    plan = {tick: (hits.uniform(-3, 3), -hits.uniform(6, 9), hits.uniform(3, 6))
+            for tick in range(0, ticks, 45)}
+    states = {}
+
+    def inputs(tick, ball):
+        states[tick] = ball.get_state()
+        if tick in plan:  # "удар ракеткой" из записанного потока ввода
+            ball.vx, ball.vy, ball.vz = plan[tick]
+
+    while simulation.clock.tick < ticks:
+        simulation.frame(1 / fps, inputs)
+    return states
+
+
+class TestFixedTimestep(unittest.TestCase):
+    def test_steps_per_second_independent_of_fps(self):
+        """За секунду делается 60 шагов при любом FPS рендера"""
+        for fps in (30, 60, 144):
+            clock = FixedTimestep(1 / 60)
+            steps = sum(clock.advance(1 / fps) for _ in range(fps))
+            self.assertIn(steps, (59, 60), msg=f"fps={fps}")
+            self.assertTrue(0 <= clock.alpha <= 1)
+
+    def test_max_steps_guard(self):
+        """После долгой паузы симуляция не пытается догнать всё сразу"""
+        clock = FixedTimestep(1 / 60, max_steps=5)
+        self.assertEqual(clock.advance(2.0), 5)
+        self.assertEqual(clock.accumulator, 0.0)
+
+    def test_deterministic_across_fps(self):
+        """При одинаковом seed и вводе состояния бит в бит совпадают при 30/60/144 FPS"""
+        reference = run_at_fps(60, 600)
+        for fps in (30, 144):
+            states = run_at_fps(fps, 600)
+            for tick in range(600):
+                self.assertEqual(states[tick], reference[tick], msg=f"fps={fps}, tick={tick}")
+
+    def test_lower_physics_rate(self):
+        """Физика на 30 Гц летит так же, как на 60 Гц (с точностью интегрирования)"""
+        state = (400, 550, 0, 1.5, -9, 6)
+        fine = BallPhysics(800, 600, 50)
+        coarse = BallPhysics(800, 600, 50)
+        fine.set_state(state)
+        coarse.set_state(state)
+        for _ in range(30):
+            fine.update(1)
+        for _ in range(15):
+            coarse.update(2)
+        for a, b in zip(fine.get_position(), coarse.get_position()):
+            self.assertAlmostEqual(a, b, delta=5)
+
+    def test_interpolation(self):
+        """Позиция для рендера лежит между двумя последними шагами"""
+        physics = BallPhysics(800, 600, 50, seed=1)
+        simulation = PhysicsSimulation(physics, rate=30)
+        simulation.frame(1 / 30 + 1 / 60)
+        self.assertAlmostEqual(simulation.clock.alpha, 0.5)
+        expected = lerp(simulation.previous[:3], physics.get_position(), simulation.clock.alpha)
+        self.assertEqual(simulation.interpolated_position(), expected)
+        self.assertEqual(lerp(0, 10, 0.25), 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from sources import FrameDirectorySource, LandmarkReplay, Recording, RecordingSource, SessionRecorder, \
+    open_source, replay_benchmark
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def record(self, frames=True, count=40):
+        """Записывает сессию: синтетическая камера + FakeHands"""
+        path = os.path.join(self.tmp.name, "session.npz")
+        recorder = SessionRecorder(path, frames=frames)
+        tracker = HandTracker(hands_factory=FakeHands, recorder=recorder)
+        tracker.start_capture(SyntheticCapture(width=160, height=120, max_frames=count, realtime=False))
+        coords = []
+        while True:
+            frame, point = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            if frame is None:
+                break
+            coords.append(point)
+        tracker.stop_capture()
+        recorder.save()
+        return path, coords
+
+    def test_frame_directory(self):
+        for i in range(3):
+            cv2.imwrite(os.path.join(self.tmp.name, f"{i:03d}.png"), np.full((8, 8, 3), i, np.uint8))
+        source = open_source(self.tmp.name)
+        self.assertIsInstance(source, FrameDirectorySource)
+        values = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            values.append(int(frame[0, 0, 0]))
+        self.assertEqual(values, [0, 1, 2])
+
+    def test_frames_roundtrip(self):
+        """Кадры записи совпадают с исходными (PNG без потерь), метки времени сохраняются"""
+        path, _ = self.record(count=10)
+        recording = Recording(path)
+        self.assertEqual(len(recording), 10)
+        self.assertEqual(recording.frame_shape, (120, 160, 3))
+        expected = SyntheticCapture(width=160, height=120, max_frames=10, realtime=False)
+        source = open_source(path)
+        self.assertIsInstance(source, RecordingSource)
+        for i in range(10):
+            _, original = expected.read()
+            ret, frame = source.read()
+            self.assertTrue(ret)
+            np.testing.assert_array_equal(frame, original)
+            self.assertEqual(source.last_timestamp, recording.timestamps[i])
+        self.assertFalse(source.read()[0])
+
+    def test_replay_is_deterministic(self):
+        """Повтор записи через трекер даёт те же координаты, что и при записи"""
+        path, coords = self.record()
+        self.assertTrue(any(c is not None for c in coords))
+        for _ in range(2):
+            tracker = HandTracker(hands_factory=FakeHands)
+            tracker.start_capture(path)
+            replayed = []
+            times = []
+            while True:
+                frame, point = tracker.process_frame(draw_point=False, draw_landmarks=False)
+                if frame is None:
+                    break
+                replayed.append(point)
+                times.append(tracker.last_capture_time)
+            self.assertEqual(replayed, coords)
+            np.testing.assert_array_equal(times, Recording(path).timestamps)
+
+    def test_landmark_replay_without_frames(self):
+        """Запись только landmarks воспроизводится без инференса"""
+        path, coords = self.record(frames=False)
+        self.assertFalse(Recording(path).has_frames)
+        replay = LandmarkReplay(path)
+        tracker = HandTracker(hands_factory=replay.hands_factory)
+        tracker.start_capture(replay.source)
+        replayed = []
+        while True:
+            frame, point = tracker.process_frame(draw_point=False, draw_landmarks=False)
+            if frame is None:
+                break
+            replayed.append(point)
+        self.assertEqual(len(replayed), len(coords))
+        for a, b in zip(replayed, coords):
+            if b is None:
+                self.assertIsNone(a)
+            else:
+                self.assertAlmostEqual(a[0], b[0], places=5)
+                self.assertAlmostEqual(a[1], b[1], places=5)
+
+    def test_replay_benchmark(self):
+        path, _ = self.record()
+        result = replay_benchmark(path, hands_factory=FakeHands)
+        self.assertEqual(result["frames"], 40)
+        self.assertEqual(result["misses"], 0)
+        self.assertLess(result["max_error"], 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
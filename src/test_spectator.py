@@ -0,0 +1,83 @@
+import asyncio
+import time
+import unittest
+
+from websockets.asyncio.client import connect
+
+from engine import Engine
+from protocol import snapshot
+from spectator import FRAME_SIZE, SpectatorServer, _Spectator, decode_frames, encode_frame
+
+
+class TestFrames(unittest.TestCase):
+    def test_batch_roundtrip(self):
+        """Пачка кадров разбирается в номера, время и снимки"""
+        engine = Engine(seed=0)
+        engine.reset()
+        frames = []
+        for seq in (1, 2, 3):
+            engine.step()
+            frames.append(encode_frame(seq, snapshot(engine.state), seq * 0.5))
+        self.assertEqual(len(frames[0]), FRAME_SIZE)
+        decoded = decode_frames(b"".join(frames))
+        self.assertEqual([(seq, t) for seq, t, _ in decoded], [(1, 0.5), (2, 1.0), (3, 1.5)])
+        self.assertEqual(decoded[-1][2][0], engine.state.tick)
+
+
+class TestSpectatorQueue(unittest.TestCase):
+    def test_drop_to_latest(self):
+        """Зритель не успевает: в очереди остаются самые свежие кадры"""
+        spectator = _Spectator(websocket=None, queue_size=2)
+        for frame in (b"1", b"2", b"3", b"4"):
+            spectator.push(frame)
+        self.assertEqual(list(spectator.queue), [b"3", b"4"])
+        self.assertEqual(spectator.dropped, 2)
+
+
+class TestSpectatorServer(unittest.TestCase):
+    def test_broadcast(self):
+        """Два зрителя получают кадры по порядку; publish не ждёт сети"""
+        server = SpectatorServer("localhost", 0).start()
+        engine = Engine(seed=0)
+        engine.reset()
+
+        async def spectate(received):
+            async with connect(f"ws://localhost:{server.port}") as websocket:
+                async for data in websocket:
+                    received.extend(decode_frames(data))
+                    if received[-1][0] >= 30:
+                        return
+
+        async def scenario():
+            received = [[], []]
+            spectators = [asyncio.create_task(spectate(r)) for r in received]
+            while server.stats()["spectators"] < 2:
+                await asyncio.sleep(0.01)
+            for _ in range(30):
+                engine.step()
+                server.publish(engine.state)
+                await asyncio.sleep(1 / 120)
+            await asyncio.wait_for(asyncio.gather(*spectators), 10)
+            return received
+
+        try:
+            received = asyncio.run(scenario())
+            # Счётчики сервер обновляет раз в 0.1 сек
+            deadline = time.perf_counter() + 5
+            while server.stats()["sent"] < 60 and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            stats = server.stats()
+        finally:
+            server.stop()
+        for frames in received:
+            seqs = [seq for seq, _, _ in frames]
+            self.assertEqual(seqs, sorted(seqs))
+            self.assertEqual(seqs[-1], 30)
+            self.assertEqual(frames[-1][2][0], engine.state.tick)
+        self.assertEqual(stats["published"], 30)
+        self.assertEqual(stats["sent"], 60)
+        self.assertEqual(stats["dropped"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
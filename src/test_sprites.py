@@ -0,0 +1,63 @@
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from sprites import SpriteCache, mip_levels, quantize
+
+
+class TestQuantize(unittest.TestCase):
+    def test_levels(self):
+        self.assertEqual(mip_levels(30, 50, 11), list(range(30, 51, 2)))
+        self.assertEqual(quantize(36.9, 30, 50, 11), 36)
+        self.assertEqual(quantize(37.1, 30, 50, 11), 38)
+        self.assertEqual(quantize(10, 30, 50, 11), 30)
+        self.assertEqual(quantize(99, 30, 50, 11), 50)
+        for value in (30.3, 41.7, 49.9):
+            self.assertIn(quantize(value, 30, 50, 11), mip_levels(30, 50, 11))
+
+
+class TestSpriteCache(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.image = pygame.Surface((50, 40), pygame.SRCALPHA)
+        self.image.fill((0, 0, 0, 0))
+        self.image.fill((255, 0, 0, 255), pygame.Rect(0, 0, 10, 40))  # красная полоса слева
+
+    def test_steady_state_has_no_misses(self):
+        """После прогрева кадры берут поверхности только из кэша"""
+        cache = SpriteCache()
+        sizes = [(s, s) for s in mip_levels(30, 50, 11)]
+        cache.preload("ball", self.image, sizes, flips=(False, True))
+        misses = cache.stats.misses
+        self.assertEqual(misses, 22)
+        for frame in range(500):
+            size = quantize(30 + frame % 21, 30, 50, 11)
+            first = cache.scaled("ball", self.image, (size, size), flip_x=frame % 2 == 0)
+            self.assertIs(first, cache.scaled("ball", self.image, (size, size), flip_x=frame % 2 == 0))
+        self.assertEqual(cache.stats.misses, misses)
+        self.assertEqual(cache.stats.hits, 1000)
+
+    def test_flipped_variant(self):
+        cache = SpriteCache()
+        flipped = cache.scaled("img", self.image, (50, 40), flip_x=True)
+        self.assertEqual(flipped.get_at((45, 5)), pygame.Color(255, 0, 0, 255))
+        self.assertEqual(flipped.get_at((5, 5)).a, 0)
+        self.assertIsNot(cache.scaled("img", self.image, (50, 40)), self.image)
+
+    def test_lru_eviction(self):
+        cache = SpriteCache(max_entries=2)
+        cache.get("a", lambda: "A")
+        cache.get("b", lambda: "B")
+        cache.get("a", lambda: "A2")  # "a" свежее, чем "b"
+        cache.get("c", lambda: "C")
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.get("a", lambda: "A3"), "A")
+        self.assertEqual(cache.get("b", lambda: "B2"), "B2")
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,48 @@
+import threading
+import unittest
+
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from startup import Startup
+
+
+class TestStartup(unittest.TestCase):
+    def test_tasks_in_background(self):
+        """Задачи идут в своих потоках, прогресс и отметки считаются от старта"""
+        release = threading.Event()
+        startup = Startup(start=0.0, clock=lambda: 1.5)
+        startup.mark("first_frame")
+        startup.run("fast", lambda x: x * 2, 21)
+        startup.run("slow", release.wait)
+        self.assertEqual(startup.result("fast"), 42)
+        self.assertFalse(startup.poll())
+        self.assertEqual(startup.progress(), 0.5)
+        self.assertEqual(startup.pending(), ["slow"])
+
+        release.set()
+        self.assertTrue(startup.result("slow"))
+        self.assertTrue(startup.poll())
+        report = startup.report()
+        self.assertEqual(report["marks"], {"first_frame": 1.5})
+        self.assertEqual(report["tasks"]["fast"], {"start": 1.5, "end": 1.5, "duration": 0.0})
+        self.assertIn("first_frame", startup.format_report())
+
+    def test_error_raised_in_result(self):
+        def fail():
+            raise RuntimeError("Не удалось открыть веб-камеру")
+
+        startup = Startup()
+        startup.run("tracker", fail)
+        with self.assertRaises(RuntimeError):
+            startup.result("tracker")
+
+    def test_tracker_warm_up(self):
+        """Пробный инференс на заставке — модель загружена до первого кадра игры"""
+        tracker = HandTracker(hands_factory=FakeHands)
+        tracker.warm_up((120, 160, 3))
+        self.assertEqual(tracker.inference.hands.calls, 1)
+        tracker.stop_capture()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
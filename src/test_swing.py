@@ -0,0 +1,95 @@
+import time
+import unittest
+
+import numpy as np
+
+from capture import SyntheticCapture
+from fake_hands import FakeHands
+from hand_tracker import HandTracker
+from swing import LandmarkHistory
+
+
+def hand_at(x, y):
+    """Рука (21, 3): landmarks вокруг ладони (x, y)."""
+    landmarks = np.zeros((21, 3), dtype=np.float32)
+    landmarks[:, 0] = x + np.linspace(-0.02, 0.02, 21)
+    landmarks[:, 1] = y
+    return landmarks
+
+
+class TestLandmarkHistory(unittest.TestCase):
+    def test_velocity_of_linear_motion(self):
+        """Равномерный взмах: скорость каждой точки и кисти — точная, и после переполнения буфера"""
+        history = LandmarkHistory(capacity=8)
+        for i in range(20):
+            t = i / 30
+            history.push(t, hand_at(0.2 + 0.6 * t, 0.8 - 1.2 * t))
+        self.assertEqual(len(history), 8)
+        velocities = history.velocities(window=0.1)
+        np.testing.assert_allclose(velocities[:, 0], 0.6, rtol=1e-3)
+        np.testing.assert_allclose(velocities[:, 1], -1.2, rtol=1e-3)
+        swing = history.swing(now=19 / 30)
+        self.assertAlmostEqual(swing.vx, 0.6, places=3)
+        self.assertAlmostEqual(swing.vy, -1.2, places=3)
+        self.assertAlmostEqual(swing.angle, np.arctan2(-1.2, 0.6), places=3)
+
+    def test_stale_and_duplicate(self):
+        """Повтор того же результата не пишется; старая история — взмаха нет"""
+        history = LandmarkHistory()
+        history.push(0.0, hand_at(0.5, 0.5))
+        self.assertEqual(history.swing().speed, 0.0)  # один замер — скорости нет
+        history.push(0.0, hand_at(0.6, 0.5))
+        self.assertEqual(len(history), 1)
+        history.push(0.1, hand_at(0.6, 0.5))
+        self.assertGreater(history.swing(now=0.1).speed, 0.5)
+        self.assertEqual(history.swing(now=1.0).speed, 0.0)
+
+    def test_max_age_follows_sample_rate(self):
+        """Порог свежести — по интервалу замеров: 10 Гц ждут дольше, 60 Гц — меньше"""
+        slow = LandmarkHistory()
+        fast = LandmarkHistory()
+        for i in range(10):
+            slow.push(i / 10, hand_at(0.1 + 0.05 * i, 0.5))
+            fast.push(i / 60, hand_at(0.1 + 0.01 * i, 0.5))
+        self.assertAlmostEqual(slow.interval, 0.1)
+        # 10 Гц и задержка 50 мс: через 180 мс следующий замер ещё в пути
+        self.assertGreater(slow.swing(now=0.9 + 0.18, latency=0.05).speed, 0.4)
+        self.assertEqual(slow.swing(now=0.9 + 0.21, latency=0.05).speed, 0.0)
+        # 60 Гц: пропущено уже шесть замеров — руки нет
+        self.assertGreater(fast.swing(now=9 / 60 + 0.02).speed, 0.5)
+        self.assertEqual(fast.swing(now=9 / 60 + 0.1).speed, 0.0)
+
+    def test_feature_extraction_cost(self):
+        """Запись в историю и взмах — намного меньше миллисекунды на кадр"""
+        history = LandmarkHistory()
+        landmarks = hand_at(0.5, 0.5)
+        frames = 2000
+        start = time.perf_counter()
+        for i in range(frames):
+            history.push(i / 60, landmarks)
+            history.swing(now=i / 60)
+        per_frame = (time.perf_counter() - start) / frames
+        print(f"\nИстория + взмах: {per_frame * 1e6:.1f} мкс на кадр")
+        self.assertLess(per_frame, 0.0005)
+
+
+class TestTrackerLandmarks(unittest.TestCase):
+    def test_tracker_fills_landmarks_and_history(self):
+        """HandTracker пишет 21 landmark в один и тот же массив и копит историю по времени захвата"""
+        tracker = HandTracker(hands_factory=FakeHands)
+        tracker.start_capture(SyntheticCapture(max_frames=10, realtime=False))
+        landmarks = tracker.landmarks
+        for _ in range(10):
+            _, coords = tracker.process_frame(draw_point=False, draw_landmarks=False)
+        tracker.stop_capture()
+        self.assertIs(tracker.landmarks, landmarks)
+        self.assertEqual(tracker.landmarks.shape, (21, 3))
+        self.assertEqual(tracker.landmarks.dtype, np.float32)
+        self.assertTrue(tracker.hand_found)
+        self.assertAlmostEqual(float(tracker.landmarks[0, 0]), coords[0])
+        self.assertEqual(len(tracker.history), 10)
+        self.assertGreater(tracker.history.swing().speed, 0.0)  # квадрат движется по кругу
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
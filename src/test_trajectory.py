@@ -0,0 +1,98 @@
+import unittest
+import random
+
+from physics import BallPhysics
+from trajectory import BossAI, TrajectoryPredictor
+
+
+def simulate_until(ball, target_y, dt, max_steps=3000):
+    """Пошаговая симуляция до пересечения линии target_y (эталон для прогноза)"""
+    previous = ball.y
+    for step in range(1, max_steps):
+        ball.update(dt)
+        if ball.y <= target_y < previous:
+            return step
+        previous = ball.y
+    return None
+
+
+class TestTrajectoryPredictor(unittest.TestCase):
+    def test_advance_matches_free_flight(self):
+        """Закрытая форма без столкновений совпадает с шагами физики"""
+        ball = BallPhysics(10 ** 6, 10 ** 6, 0)
+        ball.set_state((5e5, 5e5, 1e5, 3.0, -4.0, 2.0))
+        predictor = TrajectoryPredictor.from_physics(ball, dt=0.5)
+        expected = predictor.advance(ball.get_state(), 200)
+        for _ in range(200):
+            ball.update(0.5)
+        for a, b in zip(expected, ball.get_state()):
+            self.assertAlmostEqual(a, b, places=6)
+
+    def test_intercept_matches_simulation(self):
+        """Шаг и точка перехвата совпадают с пошаговой симуляцией (стол, борта, стенка, сетка)"""
+        rng = random.Random(1)
+        matched = 0
+        for i in range(300):
+            ball = BallPhysics(400, 800, 40)
+            ball.set_state((rng.uniform(10, 390), rng.uniform(500, 790), rng.uniform(0, 50),
+                            rng.uniform(-6, 6), -rng.uniform(4, 12), rng.uniform(-3, 8)))
+            dt = rng.choice([0.5, 1.0, 2.0])
+            target_y = rng.uniform(50, 350)
+            hit = TrajectoryPredictor.from_physics(ball, dt=dt).intercept(ball.get_state(), target_y)
+            steps = simulate_until(ball, target_y, dt)
+            if hit is None or steps is None:
+                matched += hit is None and steps is None
+                continue
+            if hit.steps == steps:
+                matched += 1
+                self.assertAlmostEqual(hit.x, ball.x, places=6)
+                self.assertAlmostEqual(hit.z, ball.z, places=6)
+        self.assertGreaterEqual(matched, 297)
+
+    def test_intercept_without_gravity(self):
+        """Плоский мяч игры: прямая без отскоков, время = расстояние / скорость"""
+        predictor = TrajectoryPredictor(800, 600, 0, gravity=0, drag=1.0, side_walls=False)
+        hit = predictor.intercept((400, 500, 0, 3, -5, 0), 175)
+        self.assertEqual(hit.steps, 65)
+        self.assertAlmostEqual(hit.x, 400 + 3 * 65)
+        self.assertEqual(hit.bounces, 0)
+        self.assertIsNone(predictor.intercept((400, 500, 0, 3, 5, 0), 175))
+
+    def test_ball_that_stops_short(self):
+        """Из-за сопротивления воздуха мяч может вообще не долететь"""
+        predictor = TrajectoryPredictor(800, 600, 0, gravity=0, drag=0.9, side_walls=False)
+        self.assertIsNone(predictor.intercept((400, 500, 0, 0, -5, 0), 400))
+        self.assertIsNotNone(predictor.intercept((400, 500, 0, 0, -5, 0), 460))
+
+
+class TestBossAI(unittest.TestCase):
+    def make_ai(self, **kwargs):
+        predictor = TrajectoryPredictor(800, 600, 0, gravity=0, drag=1.0, side_walls=False)
+        return BossAI(predictor, target_y=175, seed=0, **kwargs)
+
+    def test_prediction_cached_until_hit(self):
+        ai = self.make_ai(reaction_delay=3, aim_error=0)
+        state = (400, 500, 0, 3, -5, 0)
+        for _ in range(3):
+            self.assertIsNone(ai.target(state))  # ещё реагирует
+        for _ in range(50):
+            self.assertAlmostEqual(ai.target(state), 595)
+        self.assertEqual(ai.predictions, 1)
+        ai.on_hit()
+        for _ in range(4):
+            ai.target(state)
+        self.assertEqual(ai.predictions, 2)
+
+    def test_aim_error_and_follow(self):
+        ai = self.make_ai(reaction_delay=0, aim_error=20.0, follow=0.5)
+        target = ai.target((400, 500, 0, 3, -5, 0))
+        self.assertNotAlmostEqual(target, 595)
+        self.assertAlmostEqual(ai.move(100, (400, 500, 0, 3, -5, 0)), 100 + (target - 100) * 0.5)
+
+    def test_unknown_difficulty(self):
+        with self.assertRaises(ValueError):
+            BossAI.with_difficulty(None, 175, "impossible")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
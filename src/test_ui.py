@@ -0,0 +1,67 @@
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from ui import Button, DynamicLabel, Label, TextCache
+
+
+class CountingFont:
+    """Обёртка над шрифтом, считающая вызовы render"""
+    def __init__(self, font):
+        self.font = font
+        self.calls = 0
+
+    def render(self, *args):
+        self.calls += 1
+        return self.font.render(*args)
+
+
+class TestUi(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.surface = pygame.Surface((400, 300))
+        self.font = CountingFont(pygame.font.Font(None, 30))
+        self.text_cache = TextCache()
+
+    def test_text_rendered_once(self):
+        first = self.text_cache.render(self.font, "Меню", (255, 255, 255))
+        for _ in range(10):
+            self.assertIs(self.text_cache.render(self.font, "Меню", (255, 255, 255)), first)
+        self.text_cache.render(self.font, "Меню", (0, 0, 0))
+        self.assertEqual(self.font.calls, 2)
+        self.assertEqual(self.text_cache.stats.hits, 10)
+
+    def test_button_hit_without_drawing(self):
+        button = Button((20, 20, 150, 50), "Меню", self.font, (0, 255, 0), (50, 50, 50), (255, 255, 255),
+                        text_offset=(20, 5))
+        self.assertTrue(button.hit((30, 30)))
+        self.assertFalse(button.hit((200, 30)))
+        self.assertEqual(self.font.calls, 0)
+
+    def test_button_hover_colour(self):
+        button = Button((20, 20, 150, 50), "Начать", self.font, (0, 255, 0), (50, 50, 50), (255, 255, 255))
+        area = button.draw(self.surface, self.text_cache, mouse_pos=(300, 300))
+        self.assertTrue(area.contains(button.rect))
+        self.assertEqual(self.surface.get_at((22, 22)), pygame.Color(0, 255, 0))
+        button.draw(self.surface, self.text_cache, mouse_pos=(30, 30))
+        self.assertEqual(self.surface.get_at((22, 22)), pygame.Color(50, 50, 50))
+        self.assertEqual(self.font.calls, 1)
+
+    def test_score_rendered_on_change(self):
+        label = DynamicLabel(self.font, (255, 255, 255), (200, 50))
+        for text in ["0:0"] * 5 + ["1:0"] * 5 + ["1:1"]:
+            label.draw(self.surface, text)
+        self.assertEqual(label.renders, 3)
+        self.assertEqual(label.rect.center, (200, 50))
+
+    def test_label_centered(self):
+        label = Label("ПОБЕДА!", self.font, (0, 255, 0), (200, 100))
+        rect = label.draw(self.surface, self.text_cache)
+        self.assertEqual(rect.center, (200, 100))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,286 @@
+import math
+import random
+
+from physics import BallPhysics
+
+
+'''
+Предсказание траектории мяча без пошаговой симуляции:
+ - между столкновениями шаг BallPhysics (гравитация, движение, сопротивление) —
+   линейная рекуррентная формула, её n-й шаг считается в закрытой форме
+   (геометрические суммы по r = drag ** dt)
+ - номер шага ближайшего события (стол, стенка, борт, сетка, целевая линия)
+   находится по формуле (x, y монотонны) или двоичным поиском (z — унимодальна)
+ - в момент события применяется ровно BallPhysics._check_collisions,
+   и дальше прыгаем к следующему событию ("bounce-segment jumping")
+Стоимость — O(число отскоков * log), а не O(число шагов).
+Сетка учитывается в момент входа мяча в её зону (как в дискретной физике на этом шаге).
+
+BossAI планирует перехват по прогнозу: прогноз считается один раз после удара
+(с задержкой реакции и ошибкой прицеливания) и кэшируется до следующего удара.
+'''
+
+
+class Intercept:
+    def __init__(self, steps, state, bounces):
+        """
+        :param steps: через сколько шагов мяч пересечёт целевую линию
+        :param state: состояние мяча (x, y, z, vx, vy, vz) на этом шаге
+        :param bounces: сколько столкновений было по пути
+        """
+        self.steps = steps
+        self.state = state
+        self.bounces = bounces
+
+    @property
+    def x(self):
+        return self.state[0]
+
+    @property
+    def z(self):
+        return self.state[2]
+
+
+class TrajectoryPredictor:
+    def __init__(self, table_width, table_height, net_height, gravity=0.2, drag=0.99, bounce=0.7,
+                 dt=1.0, side_walls=True, max_events=256):
+        """
+        :param dt: шаг симуляции, для которого делается прогноз (в единицах BallPhysics)
+        :param side_walls: отскакивает ли мяч от бортов x=0 и x=table_width
+        :param max_events: сколько столкновений просматривать, прежде чем сдаться
+        """
+        self.table_width = table_width
+        self.table_height = table_height
+        self.net_height = net_height
+        self.gravity = gravity
+        self.drag = drag
+        self.bounce = bounce
+        self.dt = dt
+        self.side_walls = side_walls
+        self.max_events = max_events
+        self.r = drag ** dt
+
+        # Правила столкновений берём у настоящей физики, чтобы прогноз с ней совпадал
+        self._collider = BallPhysics(table_width, table_height, net_height)
+        self._collider.gravity, self._collider.drag, self._collider.bounce = gravity, drag, bounce
+
+    @classmethod
+    def from_physics(cls, physics, dt=1.0, **kwargs):
+        return cls(physics.table_width, physics.table_height, physics.net_height,
+                   physics.gravity, physics.drag, physics.bounce, dt, **kwargs)
+
+    # --- Закрытая форма без столкновений ---
+
+    def _geometric(self, n):
+        """Сумма r^k для k < n"""
+        if self.r == 1:
+            return n
+        return (1 - self.r ** n) / (1 - self.r)
+
+    def _z_terms(self, vz):
+        """a_k = vz_k - g*dt удовлетворяет a_{k+1} = r*a_k - g*dt; возвращает (a0, a*)"""
+        a0 = vz - self.gravity * self.dt
+        if self.r == 1:
+            return a0, None
+        return a0, -self.gravity * self.dt / (1 - self.r)
+
+    def advance(self, state, n):
+        """Состояние через n шагов без учёта столкновений."""
+        x, y, z, vx, vy, vz = state
+        dt = self.dt
+        s = self._geometric(n)
+        rn = self.r ** n
+        a0, a_inf = self._z_terms(vz)
+        if a_inf is None:
+            z_n = z + dt * (n * a0 - self.gravity * dt * n * (n - 1) / 2)
+            vz_n = a0 - self.gravity * dt * (n - 1) if n else vz
+        else:
+            z_n = z + dt * (n * a_inf + (a0 - a_inf) * s)
+            vz_n = self.r * (a_inf + (a0 - a_inf) * self.r ** (n - 1)) if n else vz
+        return (x + dt * vx * s, y + dt * vy * s, z_n, vx * rn, vy * rn, vz_n)
+
+    def _steps_to_cross(self, p, v, target):
+        """
+        Первый шаг n >= 1, на котором координата (с затуханием r) дойдёт до target,
+        или None. Координата монотонна: p_n = p + dt*v*S(n).
+        """
+        if v == 0 or (target - p) * v < 0:
+            return None
+        need = (target - p) / (self.dt * v)  # нужная сумма S(n)
+        if self.r == 1:
+            n = math.ceil(need)
+        else:
+            limit = 1 / (1 - self.r)
+            if need >= limit:
+                return None  # затухнет раньше, чем долетит
+            n = math.ceil(math.log(1 - need * (1 - self.r)) / math.log(self.r))
+        n = max(1, n)
+        # Поправка на ошибки округления в логарифмах
+        while n > 1 and (p + self.dt * v * self._geometric(n - 1) - target) * v >= 0:
+            n -= 1
+        while (p + self.dt * v * self._geometric(n) - target) * v < 0:
+            n += 1
+        return n
+
+    def _steps_to_level(self, state, level=0.0, strict=False):
+        """
+        Первый шаг n >= 1, на котором z_n <= level (z_n < level при strict), или None.
+        z унимодальна (вверх, потом вниз), поэтому — галоп и двоичный поиск.
+        """
+        a0, a_inf = self._z_terms(state[5])
+        if a0 >= 0 and (a_inf is None and self.gravity <= 0 or a_inf is not None and a_inf >= 0):
+            # Мяч не снижается: событие только если он уже ниже уровня (лежащий на столе — не событие)
+            return 1 if state[2] + self.dt * a0 < level else None
+
+        def below(n):
+            z = self.advance(state, n)[2]
+            return z < level if strict else z <= level
+
+        hi = 1
+        while not below(hi):
+            hi *= 2
+            if hi > 1 << 30:
+                return None
+        # На (hi/2, hi] шаги "ниже уровня" идут сплошным хвостом: z там сначала
+        # растёт (и выше уровня, раз на hi/2 была выше), потом только падает
+        lo = hi // 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if below(mid):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+    def _next_event(self, state):
+        """Шаг ближайшего столкновения или None."""
+        x, y, z, vx, vy, vz = state
+        candidates = [self._steps_to_level(state), self._steps_to_cross(y, vy, 0)]
+        if self.side_walls:
+            candidates.append(self._steps_to_cross(x, vx, 0))
+            candidates.append(self._steps_to_cross(x, vx, self.table_width))
+        if self.net_height > 0:
+            candidates.append(self._net_event(state))
+        candidates = [n for n in candidates if n is not None]
+        return min(candidates) if candidates else None
+
+    def _net_event(self, state):
+        """
+        Шаг, на котором может сработать сетка: вход в её зону, а внутри зоны —
+        момент, когда мяч опустится ниже её верха (пока не вылетел из зоны).
+        """
+        y, vy = state[1], state[4]
+        net_pos = self.table_height * 0.5
+        net_width = self.table_width * 0.1
+
+        def inside(n):
+            return abs(self.advance(state, n)[1] - net_pos) < net_width
+
+        if abs(y - net_pos) >= net_width:
+            edge = net_pos + net_width if y > net_pos else net_pos - net_width
+            n = self._steps_to_cross(y, vy, edge)
+            if n is not None and not inside(n):
+                n += 1  # ровно на границе зона ещё не началась
+            return n
+        n_drop = self._steps_to_level(state, self.net_height, strict=True)
+        if n_drop is None:
+            return None
+        n_exit = None
+        if vy != 0:
+            edge = net_pos + net_width if vy > 0 else net_pos - net_width
+            n_exit = self._steps_to_cross(y, vy, edge)
+        if n_exit is None or n_drop < n_exit or n_drop == n_exit and inside(n_drop):
+            return n_drop
+        return None
+
+    def _collide(self, state):
+        self._collider.set_state(state)
+        self._collider._check_collisions()
+        return self._collider.get_state()
+
+    # --- Прогноз ---
+
+    def intercept(self, state, target_y):
+        """
+        Когда и где мяч пересечёт линию y = target_y.
+        :param state: (x, y, z, vx, vy, vz) как у BallPhysics.get_state()
+        :return: Intercept или None, если мяч туда не долетит
+        """
+        steps = 0
+        bounces = 0
+        for _ in range(self.max_events):
+            n_target = self._steps_to_cross(state[1], state[4], target_y)
+            n_event = self._next_event(state)
+            if n_target is not None and (n_event is None or n_target < n_event):
+                return Intercept(steps + n_target, self.advance(state, n_target), bounces)
+            if n_event is None:
+                return None
+            state = self._collide(self.advance(state, n_event))
+            steps += n_event
+            bounces += 1
+            if n_target == n_event:
+                return Intercept(steps, state, bounces)
+        return None
+
+
+# Уровни сложности босса: задержка реакции (шаги), СКО ошибки прицеливания, скорость следования
+DIFFICULTY = {
+    "easy": {"reaction_delay": 20, "aim_error": 60.0, "follow": 0.06},
+    "normal": {"reaction_delay": 12, "aim_error": 30.0, "follow": 0.1},
+    "hard": {"reaction_delay": 4, "aim_error": 8.0, "follow": 0.2},
+}
+
+_NOT_PLANNED = object()
+
+
+class BossAI:
+    def __init__(self, predictor, target_y, reaction_delay=12, aim_error=30.0, follow=0.1, seed=None):
+        """
+        :param predictor: TrajectoryPredictor
+        :param target_y: линия, на которой босс отбивает мяч
+        :param reaction_delay: сколько шагов после удара босс "не замечает" новую траекторию
+        :param aim_error: СКО ошибки в точке перехвата (ед. x)
+        :param follow: доля расстояния до цели, проходимая за шаг
+        """
+        self.predictor = predictor
+        self.target_y = target_y
+        self.reaction_delay = reaction_delay
+        self.aim_error = aim_error
+        self.follow = follow
+        self.rng = random.Random(seed)
+        self.predictions = 0  # сколько раз реально считался прогноз (для отладки кэша)
+        self.on_hit()
+
+    @classmethod
+    def with_difficulty(cls, predictor, target_y, difficulty="normal", seed=None):
+        if difficulty not in DIFFICULTY:
+            raise ValueError(f"Неизвестная сложность: {difficulty}")
+        return cls(predictor, target_y, seed=seed, **DIFFICULTY[difficulty])
+
+    def on_hit(self):
+        """Удар, отскок или подача: старый прогноз больше не верен."""
+        self._plan = _NOT_PLANNED
+        self._wait = self.reaction_delay
+
+    def target(self, state):
+        """
+        Куда бить по x, вызывается раз в шаг симуляции.
+        :param state: (x, y, z, vx, vy, vz) мяча
+        :return: x точки перехвата (с ошибкой) или None, пока босс ещё реагирует
+                 или мяч до линии не долетит
+        """
+        if self._wait > 0:
+            self._wait -= 1
+            return None
+        if self._plan is _NOT_PLANNED:
+            self.predictions += 1
+            hit = self.predictor.intercept(state, self.target_y)
+            self._plan = None if hit is None else hit.x + self.rng.gauss(0, self.aim_error)
+        return self._plan
+
+    def move(self, current_x, state):
+        """Новая позиция босса (по x центра): к точке перехвата, а до неё — за мячом."""
+        target = self.target(state)
+        if target is None:
+            target = state[0]
+        return current_x + (target - current_x) * self.follow
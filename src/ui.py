@@ -0,0 +1,102 @@
+import pygame
+
+from sprites import SpriteCache
+
+
+'''
+Небольшой UI-слой для меню и игровых кнопок:
+ - виджеты раскладываются один раз (прямоугольники создаются при создании виджета)
+ - текст рендерится через TextCache: повторный font.render для той же
+   (шрифт, строка, цвет) не вызывается
+ - попадание мышью (hit) проверяется без отрисовки — обработчику событий
+   не нужно рисовать сцену, чтобы узнать, где кнопки
+ - DynamicLabel (счёт) перерендеривает текст, только когда он изменился
+draw() рисует виджет на поверхности и возвращает изменённую область (pygame.Rect) —
+её можно передать в SceneRenderer.mark().
+'''
+
+
+class TextCache:
+    def __init__(self, max_entries=128):
+        self.cache = SpriteCache(max_entries)
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def render(self, font, text, colour):
+        """font.render(text, True, colour), но один раз на (font, text, colour)."""
+        return self.cache.get((font, text, tuple(colour)), lambda: font.render(text, True, colour))
+
+
+class Label:
+    def __init__(self, text, font, colour, center):
+        """Неизменяемая надпись с центром в точке center."""
+        self.text = text
+        self.font = font
+        self.colour = colour
+        self.center = center
+        self.rect = None  # известен после первой отрисовки
+
+    def draw(self, surface, text_cache):
+        text = text_cache.render(self.font, self.text, self.colour)
+        if self.rect is None:
+            self.rect = text.get_rect(center=self.center)
+        return surface.blit(text, self.rect)
+
+
+class DynamicLabel:
+    def __init__(self, font, colour, center):
+        """Надпись, которая меняется (например, счёт): рендер только при смене текста."""
+        self.font = font
+        self.colour = colour
+        self.center = center
+        self.text = None
+        self.surface = None
+        self.rect = None
+        self.renders = 0  # сколько раз реально вызывался font.render
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.colour)
+            self.rect = self.surface.get_rect(center=self.center)
+            self.renders += 1
+
+    def draw(self, surface, text=None):
+        if text is not None:
+            self.set_text(text)
+        return surface.blit(self.surface, self.rect)
+
+
+class Button:
+    def __init__(self, rect, text, font, colour, hover_colour, text_colour, text_offset=None):
+        """
+        :param rect: (x, y, w, h) кнопки
+        :param text_offset: смещение текста от левого верхнего угла; None — текст по центру
+        """
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.font = font
+        self.colour = colour
+        self.hover_colour = hover_colour
+        self.text_colour = text_colour
+        self.text_offset = text_offset
+        self._text_rect = None
+
+    def hit(self, pos):
+        """Попадает ли точка (например, клик мыши) в кнопку."""
+        return self.rect.collidepoint(pos)
+
+    def draw(self, surface, text_cache, mouse_pos=None):
+        """Рисует кнопку (подсвеченную, если над ней мышь); возвращает изменённую область."""
+        colour = self.hover_colour if mouse_pos is not None and self.hit(mouse_pos) else self.colour
+        pygame.draw.rect(surface, colour, self.rect)
+        text = text_cache.render(self.font, self.text, self.text_colour)
+        if self._text_rect is None:
+            if self.text_offset is None:
+                self._text_rect = text.get_rect(center=self.rect.center)
+            else:
+                self._text_rect = text.get_rect(topleft=self.rect.move(self.text_offset).topleft)
+        text_rect = surface.blit(text, self._text_rect)
+        return self.rect.union(text_rect)